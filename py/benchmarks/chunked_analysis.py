@@ -0,0 +1,107 @@
+"""Benchmark of chunked analysis: peak memory and wall time of analyzing synthetic chats
+whole and in chunks, checking both give identical results"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import typer
+from typing_extensions import Annotated
+
+from py.benchmarks.suite import synthetic_chat_file
+from py.benchmarks.synthetic_chat import SyntheticChat
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.models.analysis_config import AnalysisConfig, ChatKeywords
+from py.utils.directories import FileData
+from py.utils.profiler import max_rss
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def peak_memory() -> float | None:
+    """Peak resident memory (MiB) of this process and its finished worker processes, None
+    on platforms that do not report it"""
+    peaks = [peak for peak in [max_rss(), max_rss(children=True)] if peak is not None]
+    return max(peaks, default=None)
+
+
+def measure_analysis(  # pylint: disable=too-many-arguments
+    config: AnalysisConfig,
+    chat_path: Path,
+    engine: AnalysisEngine,
+    chunk_size: int | None,
+    chunk_workers: int,
+) -> tuple[dict[str, Any], float, float | None]:
+    """Compute member stats, return the results, the time taken (s) and the peak
+    resident memory (MiB)"""
+    start = time.perf_counter()
+    analysis = Analysis(
+        config, chat_path, engine, chunk_size=chunk_size, chunk_workers=chunk_workers
+    )
+    analysis.get_member_stats()
+    elapsed = time.perf_counter() - start
+    return analysis.results().model_dump(), elapsed, peak_memory()
+
+
+def main(
+    size: Annotated[
+        list[int] | None,
+        typer.Option(help="Number of messages of a benchmarked chat, may be repeated"),
+    ] = None,
+    chunk_size: Annotated[
+        int, typer.Option(help="Number of messages of each chunk")
+    ] = 10_000,
+    chunk_workers: Annotated[
+        int, typer.Option(help="Number of processes analyzing chunks at once")
+    ] = 1,
+    engine: Annotated[
+        AnalysisEngine, typer.Option(help="Engine used to compute member stats")
+    ] = AnalysisEngine.PYTHON,
+    seed: Annotated[int, typer.Option(help="Random seed of the synthetic chats")] = 0,
+):
+    """Compare peak memory and wall time of whole and chunked analysis of synthetic
+    chats, each analysis is run in a fresh process so its peak memory includes imports"""
+    typer.echo(
+        f"{'messages':>10}  {'analysis':<10}{'wall (s)':>10}{'peak (MiB)':>12}  results"
+    )
+    mismatches = 0
+    for messages in size or DEFAULT_SIZES:
+        chat = SyntheticChat(messages=messages, seed=seed)
+        chat_path = synthetic_chat_file(chat, FileData.benchmark_dir / "chats")
+        config = AnalysisConfig(
+            chat_name=f"Synthetic {messages}",
+            output_folder=str(FileData.benchmark_dir / "outputs" / str(messages)),
+            chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+            timezone="UTC",
+        )
+        reference = None
+        for name, chunks in [("whole", None), ("chunked", chunk_size)]:
+            with ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                results, elapsed, peak = executor.submit(
+                    measure_analysis, config, chat_path, engine, chunks, chunk_workers
+                ).result()
+            if reference is None:
+                reference = results
+                status = ""
+            else:
+                different = [
+                    key for key, value in results.items() if value != reference[key]
+                ]
+                status = (
+                    "identical" if not different else f"differs in {', '.join(different)}"
+                )
+                mismatches += len(different)
+            peak_text = "n/a" if peak is None else f"{peak:.1f}"
+            typer.echo(
+                f"{messages:>10}  {name:<10}{elapsed:>10.3f}{peak_text:>12}  {status}"
+            )
+    if mismatches:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
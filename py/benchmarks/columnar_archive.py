@@ -0,0 +1,57 @@
+"""Benchmark of the binary columnar archive against the json chat archive"""
+
+import time
+
+import typer
+from typing_extensions import Annotated
+
+from py.data_processing.chat_reader import ChatArchive
+from py.data_processing.columnar import ChatColumns
+from py.data_processing.columnar_archive import ColumnarArchive, convert_chat
+from py.utils.directories import FileData
+from py.utils.utility import validate_json_input
+
+
+def main(
+    chat_json: Annotated[str, typer.Option(help="Name of json chat file to convert")],
+):
+    """Compare the size and load time of a json chat and its columnar archive"""
+    chat_path = FileData.raw_output_dir / validate_json_input(chat_json)
+    archive_path = chat_path.with_suffix(FileData.columnar_suffix)
+
+    start = time.perf_counter()
+    convert_chat(chat_path, archive_path)
+    convert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    json_columns = ChatColumns.from_messages(ChatArchive(chat_path))
+    json_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ColumnarArchive(archive_path) as archive:
+        archive_columns = archive.load()
+        archive_time = time.perf_counter() - start
+        start = time.perf_counter()
+        archive.column("created_at")
+        column_time = time.perf_counter() - start
+        texts_time = time.perf_counter()
+        sum(1 for _ in archive_columns.texts)
+        texts_time = time.perf_counter() - texts_time
+
+    json_size = chat_path.stat().st_size / 2**20
+    archive_size = archive_path.stat().st_size / 2**20
+    typer.echo(f"messages                  {json_columns.num_messages}")
+    typer.echo(f"json size                 {json_size:.2f} MiB")
+    typer.echo(
+        f"archive size              {archive_size:.2f} MiB "
+        f"({json_size / archive_size:.1f}x smaller)"
+    )
+    typer.echo(f"conversion                {convert_time:.3f} s")
+    typer.echo(f"load columns from json    {json_time:.3f} s")
+    typer.echo(f"load columns from archive {archive_time:.3f} s")
+    typer.echo(f"load created_at only      {column_time:.4f} s")
+    typer.echo(f"decode all message texts  {texts_time:.3f} s")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,51 @@
+"""Check that analysis engines produce identical stats and compare their run times"""
+
+import time
+from pathlib import Path
+from typing import Any
+
+import typer
+from typing_extensions import Annotated
+
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.models.analysis_config import read_analysis_config
+from py.utils.directories import FileData
+from py.utils.utility import validate_json_input
+
+
+def engine_results(
+    analysis_config: str | None, chat_path: Path, engine: AnalysisEngine
+) -> tuple[dict[str, Any], float]:
+    """Compute member stats with `engine`, return the results and the time taken (s)"""
+    start = time.perf_counter()
+    analysis = Analysis(read_analysis_config(analysis_config), chat_path, engine)
+    analysis.get_member_stats()
+    elapsed = time.perf_counter() - start
+    return analysis.results().model_dump(), elapsed
+
+
+def main(
+    chat_json: Annotated[str, typer.Option(help="Name of json chat file to analyze")],
+    analysis_config: Annotated[
+        str | None, typer.Option(help="json file with analysis parameters")
+    ] = None,
+):
+    """Run every analysis engine on a chat and report any differences from the python engine"""
+    chat_path = FileData.raw_output_dir / validate_json_input(chat_json)
+    reference, elapsed = engine_results(analysis_config, chat_path, AnalysisEngine.PYTHON)
+    typer.echo(f"{AnalysisEngine.PYTHON.value:<12}{elapsed:>10.3f} s")
+    mismatches = 0
+    for engine in AnalysisEngine:
+        if engine == AnalysisEngine.PYTHON:
+            continue
+        results, elapsed = engine_results(analysis_config, chat_path, engine)
+        different = [key for key, value in results.items() if value != reference[key]]
+        status = "identical" if not different else f"differs in {', '.join(different)}"
+        typer.echo(f"{engine.value:<12}{elapsed:>10.3f} s  {status}")
+        mismatches += len(different)
+    if mismatches:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
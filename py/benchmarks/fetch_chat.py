@@ -0,0 +1,78 @@
+"""Benchmark of chat fetch throughput and resilience against the local mock GroupMe API"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import typer
+from typing_extensions import Annotated
+
+from py.data_processing.chat_reader import iter_message_dicts
+from py.groupme_api.fetch_chat import FetchChat
+from py.groupme_api.mock_server import Faults, MessageStore, MockGroupMeServer
+from py.models.analysis_config import AnalysisConfig
+from py.utils.directories import FileData
+from py.utils.utility import validate_json_input
+
+
+def main(  # pylint: disable=too-many-arguments
+    chat_json: Annotated[str, typer.Option(help="Name of json chat file to serve")],
+    latency: Annotated[float, typer.Option(help="Delay of each response (s)")] = 0.0,
+    throttle_rate: Annotated[
+        float, typer.Option(help="Fraction of requests throttled")
+    ] = 0.0,
+    error_rate: Annotated[
+        float, typer.Option(help="Fraction of requests failing with a server error")
+    ] = 0.0,
+    drop_rate: Annotated[
+        float, typer.Option(help="Fraction of requests dropped without a response")
+    ] = 0.0,
+    requests_per_second: Annotated[
+        float, typer.Option(help="Request rate limit of the fetch")
+    ] = 100.0,
+    seed: Annotated[int, typer.Option(help="Random seed of faults")] = 0,
+):
+    """Fetch a chat from the mock API and report throughput, retries and completeness"""
+    store = MessageStore.from_archive(
+        FileData.raw_output_dir / validate_json_input(chat_json)
+    )
+    faults = Faults(
+        latency=latency,
+        throttle_rate=throttle_rate,
+        error_rate=error_rate,
+        drop_rate=drop_rate,
+        retry_after=0.0,
+        seed=seed,
+    )
+    config = AnalysisConfig(
+        message_request_limit=100,
+        requests_per_second=requests_per_second,
+        max_retries=20,
+        retry_backoff=0.01,
+        retry_backoff_max=0.1,
+    )
+    with tempfile.TemporaryDirectory() as work_dir, MockGroupMeServer(
+        store, faults
+    ) as server:
+        output_file = Path(work_dir) / "chat.json"
+        fetcher = FetchChat(
+            "benchmark", "token", output_file, config, api_base_url=server.base_url
+        )
+        start = time.perf_counter()
+        fetcher.fetch_chat()
+        elapsed = time.perf_counter() - start
+        fetched = [str(message["id"]) for message in iter_message_dicts(output_file)]
+
+    expected = [str(message["id"]) for message in store.messages]
+    typer.echo(f"messages fetched    {len(fetched)} of {len(expected)}")
+    typer.echo(f"complete and exact  {fetched == expected}")
+    typer.echo(f"wall time           {elapsed:.3f} s")
+    typer.echo(f"messages / s        {len(fetched) / elapsed:.0f}")
+    typer.echo(f"retries             {fetcher.scheduler.retries}")
+    typer.echo(f"responses           {dict(sorted(server.responses.items()))}")
+    if fetched != expected:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,75 @@
+"""Benchmark of reading a chat archive: full json load against the streaming reader, with
+validated and unvalidated message decoding"""
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import typer
+from typing_extensions import Annotated
+
+from py.data_processing.chat_reader import ChatArchive, is_json_array
+from py.models.message_template import ChatMessage
+from py.utils.directories import FileData
+from py.utils.utility import validate_json_input
+
+
+def read_full_json(chat_path: Path) -> int:
+    """Read chat by loading the whole file and validating each re-serialized message, a
+    file of one message per line is loaded whole then decoded line by line"""
+    with open(chat_path, encoding="utf-8") as json_file:
+        if is_json_array(chat_path):
+            loaded = json.load(json_file)
+        else:
+            loaded = [json.loads(line) for line in json_file.read().splitlines() if line]
+        messages = [
+            ChatMessage.model_validate_json(json.dumps(message)) for message in loaded
+        ]
+    return len(messages)
+
+
+def read_streaming_strict(chat_path: Path) -> int:
+    """Read chat one validated message at a time"""
+    return sum(1 for _ in ChatArchive(chat_path, strict=True))
+
+
+def read_streaming(chat_path: Path) -> int:
+    """Read chat one message record at a time, without validation"""
+    return sum(1 for _ in ChatArchive(chat_path))
+
+
+def measure(reader: Callable[[Path], int], chat_path: Path) -> tuple[int, float, float]:
+    """Return the message count, wall time (s) and peak traced memory (MiB) of `reader`"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = reader(chat_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak / 2**20
+
+
+def main(
+    chat_json: Annotated[str, typer.Option(help="Name of json chat file to read")],
+):
+    """Compare wall time and peak memory of chat reading strategies"""
+    chat_path = FileData.raw_output_dir / validate_json_input(chat_json)
+    typer.echo(
+        f"{'reader':<18}{'messages':>10}{'wall (s)':>12}{'messages/s':>12}"
+        f"{'peak (MiB)':>12}"
+    )
+    for name, reader in [
+        ("full json", read_full_json),
+        ("streaming strict", read_streaming_strict),
+        ("streaming", read_streaming),
+    ]:
+        count, elapsed, peak = measure(reader, chat_path)
+        typer.echo(
+            f"{name:<18}{count:>10}{elapsed:>12.3f}{count / elapsed:>12.0f}{peak:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,168 @@
+"""Benchmark suite timing each analysis stage on synthetic chats of increasing size"""
+
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import typer
+from typing_extensions import Annotated
+
+from py.benchmarks.synthetic_chat import SyntheticChat, write_synthetic_chat
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.models.analysis_config import AnalysisConfig, ChatKeywords
+from py.utils.directories import FileData
+from py.utils.utility import date_as_string
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Output stages of `Analysis.analyze_chat`, in the order they are run
+OUTPUT_STAGES = [
+    "calculate_superlatives",
+    "superlative_plots",
+    "reaction_heat_maps",
+    "time_distribution",
+    "member_summary",
+    "chat_summary",
+    "keyword_plots",
+    "most_popular_messages",
+    "period_tables",
+    "monthly_plots",
+    "activity_calendar",
+    "year_over_year",
+]
+
+
+def timed(stage: Callable[[], Any]) -> float:
+    """Run `stage` and return the time it took (s)"""
+    start = time.perf_counter()
+    stage()
+    return time.perf_counter() - start
+
+
+def git_commit() -> str | None:
+    """Commit the benchmarked code was checked out at, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def synthetic_chat_file(chat: SyntheticChat, chat_dir: Path) -> Path:
+    """Synthetic chat json with the parameters of `chat`, generated if not already"""
+    chat_dir.mkdir(parents=True, exist_ok=True)
+    chat_path = chat_dir / f"synthetic_{chat.messages}_{chat.seed}.json"
+    if not chat_path.exists():
+        typer.echo(f"Generating {chat.messages} messages to {chat_path}")
+        write_synthetic_chat(chat, chat_path)
+    return chat_path
+
+
+def benchmark_chat(
+    chat: SyntheticChat, chat_path: Path, engine: AnalysisEngine, plot_workers: int
+) -> dict[str, float]:
+    """Time reading, member stats, each output stage and the whole analysis of a chat"""
+    config = AnalysisConfig(
+        chat_name=f"Synthetic {chat.messages}",
+        output_folder=str(FileData.benchmark_dir / "outputs" / str(chat.messages)),
+        chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+        timezone="UTC",
+    )
+    timings: dict[str, float] = {}
+
+    analysis = Analysis(config, chat_path, engine)
+    analysis.archive_size = chat_path.stat().st_size
+    timings["read_chat_json"] = timed(
+        lambda: sum(1 for _ in analysis.read_chat_json())
+    )
+    timings["get_member_stats"] = timed(analysis.get_member_stats)
+    # Figures are rendered as they are submitted, so each stage includes its rendering
+    with analysis.plot_pool:
+        for stage in OUTPUT_STAGES:
+            timings[stage] = timed(getattr(analysis, stage))
+
+    analysis = Analysis(config, chat_path, engine, plot_workers=plot_workers)
+    # Outputs were just written by the stages, so force the whole analysis to rerun them
+    timings["analyze_chat"] = timed(lambda: analysis.analyze_chat(force=True))
+    return timings
+
+
+def compare(results: list[dict[str, Any]], baseline_file: Path):
+    """Print the time of each stage relative to a previous benchmark"""
+    with open(baseline_file, encoding="utf-8") as file:
+        baseline = {
+            (result["messages"], result["stage"]): result["seconds"]
+            for result in json.load(file)["results"]
+        }
+    typer.echo(f"\nRelative to {baseline_file}")
+    for result in results:
+        before = baseline.get((result["messages"], result["stage"]))
+        if before:
+            typer.echo(
+                f"{result['stage']:<24}{result['messages']:>10}"
+                f"{result['seconds'] / before:>10.2f}x"
+            )
+
+
+def main(  # pylint: disable=too-many-arguments
+    size: Annotated[
+        list[int] | None,
+        typer.Option(help="Number of messages of a benchmarked chat, may be repeated"),
+    ] = None,
+    engine: Annotated[
+        AnalysisEngine, typer.Option(help="Engine used to compute member stats")
+    ] = AnalysisEngine.PYTHON,
+    plot_workers: Annotated[
+        int, typer.Option(help="Processes rendering figures in the full analysis")
+    ] = 1,
+    seed: Annotated[int, typer.Option(help="Random seed of the synthetic chats")] = 0,
+    output: Annotated[
+        Path | None, typer.Option(help="json file to write results to")
+    ] = None,
+    baseline: Annotated[
+        Path | None, typer.Option(help="Results of a previous run to compare against")
+    ] = None,
+):
+    """Time every analysis stage on synthetic chats and write the results as json"""
+    results: list[dict[str, Any]] = []
+    typer.echo(f"{'stage':<24}{'messages':>10}{'wall (s)':>12}{'messages/s':>14}")
+    for messages in size or DEFAULT_SIZES:
+        chat = SyntheticChat(messages=messages, seed=seed)
+        chat_path = synthetic_chat_file(chat, FileData.benchmark_dir / "chats")
+        for stage, seconds in benchmark_chat(
+            chat, chat_path, engine, plot_workers
+        ).items():
+            typer.echo(
+                f"{stage:<24}{messages:>10}{seconds:>12.3f}{messages / seconds:>14.0f}"
+            )
+            results.append({"messages": messages, "stage": stage, "seconds": seconds})
+
+    output = output or FileData.benchmark_dir / f"benchmark_{date_as_string()}.json"
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "engine": engine.value,
+                "plot_workers": plot_workers,
+                "seed": seed,
+                "results": results,
+            },
+            file,
+            indent=4,
+        )
+    typer.echo(f"Results written to {output}")
+    if baseline is not None:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,244 @@
+"""Generate synthetic chat archives in the format written by `FetchChat.fetch_chat`"""
+
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import typer
+from typing_extensions import Annotated
+
+from py.utils.directories import FileData
+from py.utils.utility import validate_json_input
+
+# Messages generated with each batch of random draws
+BATCH_SIZE = 10_000
+GROUP_ID = "100000001"
+# Reaction codes given, as sent by GroupMe, and how often each is given relative to the
+# others
+REACTION_CODES = [
+    ("\u2764\ufe0f", 0.45),
+    ("\U0001f44d", 0.2),
+    ("\U0001f525", 0.1),
+    ("\U0001f44e", 0.08),
+    ("\u2753", 0.07),
+    ("\U0001f602", 0.1),
+]
+WORDS = (
+    "the a to and of it is that you we for on at this was be with have just so what "
+    "when get go like know think time good see now out up about one new night game "
+    "week tomorrow today work call later back really right make come still going"
+).split()
+
+
+@dataclass
+class SyntheticChat:  # pylint: disable=too-many-instance-attributes
+    """Parameters of a synthetic chat archive"""
+
+    messages: int = 10_000
+    members: int = 20
+    # Mean number of members who react to a message
+    reaction_density: float = 1.5
+    # Fraction of messages with each attachment type
+    image_rate: float = 0.08
+    poll_rate: float = 0.01
+    video_rate: float = 0.01
+    mention_rate: float = 0.05
+    # Fraction of messages that contain one of `keywords`
+    keyword_hit_rate: float = 0.05
+    keywords: list[str] = field(default_factory=lambda: ["twitter", "meme", "lol"])
+    # Fraction of messages posted by GroupMe itself
+    system_rate: float = 0.01
+    # Time of the oldest message and mean seconds between messages
+    start: int = 1_672_531_200
+    mean_gap: float = 300.0
+    seed: int = 0
+
+
+class ChatGenerator:
+    """Write the messages of a `SyntheticChat`, newest first, one json message per line"""
+
+    def __init__(self, chat: SyntheticChat):
+        self.chat = chat
+        self.draws = np.random.default_rng(chat.seed)
+        self.samples = random.Random(chat.seed)
+        self.user_ids = [str(10_000_000 + member) for member in range(chat.members)]
+        self.names = [f"Member{member} Last{member}" for member in range(chat.members)]
+        codes, weights = zip(*REACTION_CODES)
+        self.codes = list(codes)
+        self.code_weights = np.array(weights) / sum(weights)
+
+    def attachments(self, kind: int, index: int) -> list[dict[str, Any]]:
+        """Attachments of message `index` with attachment `kind`"""
+        if kind == 1:
+            return [{"type": "image", "url": f"https://i.groupme.com/{index}.jpeg"}]
+        if kind == 2:
+            return [{"type": "poll", "poll_id": str(index)}]
+        if kind == 3:
+            return [
+                {
+                    "type": "video",
+                    "url": f"https://v.groupme.com/{index}.mp4",
+                    "preview_url": f"https://v.groupme.com/{index}.jpeg",
+                }
+            ]
+        if kind == 4:
+            mentioned = self.samples.randrange(self.chat.members)
+            return [
+                {
+                    "type": "mentions",
+                    "user_ids": [self.user_ids[mentioned]],
+                    "loci": [[0, 8]],
+                }
+            ]
+        return []
+
+    def text(self, words: int, keyword: bool) -> str:
+        """Message text of `words` words, containing a keyword if `keyword`"""
+        text = self.samples.choices(WORDS, k=words)
+        if keyword:
+            text[self.samples.randrange(words)] = self.samples.choice(self.chat.keywords)
+        return " ".join(text)
+
+    def reactions(self, reacters: int) -> tuple[list[str], list[dict[str, Any]] | None]:
+        """Favorites and reactions of `reacters` random members"""
+        if reacters == 0:
+            return [], None
+        favorited_by = self.samples.sample(self.user_ids, reacters)
+        groups: dict[str, list[str]] = {}
+        for user_id, code in zip(
+            favorited_by,
+            self.draws.choice(len(self.codes), reacters, p=self.code_weights).tolist(),
+        ):
+            groups.setdefault(self.codes[code], []).append(user_id)
+        return favorited_by, [
+            {"type": "unicode", "code": code, "user_ids": user_ids}
+            for code, user_ids in groups.items()
+        ]
+
+    def batch(self, first: int, size: int, created_at: int) -> tuple[list[str], int]:
+        """Json lines of `size` messages, the newest numbered `first` and posted at
+        `created_at`, and the time of the message before the batch"""
+        chat = self.chat
+        draws = self.draws
+        posters = draws.integers(chat.members, size=size).tolist()
+        system = (draws.random(size) < chat.system_rate).tolist()
+        kinds = draws.choice(
+            5,
+            size=size,
+            p=[
+                1 - chat.image_rate - chat.poll_rate - chat.video_rate - chat.mention_rate,
+                chat.image_rate,
+                chat.poll_rate,
+                chat.video_rate,
+                chat.mention_rate,
+            ],
+        ).tolist()
+        reacters = np.minimum(
+            draws.poisson(chat.reaction_density, size=size), chat.members
+        ).tolist()
+        keyword = (draws.random(size) < chat.keyword_hit_rate).tolist()
+        words = (draws.geometric(1 / 8, size=size)).tolist()
+        gaps = np.ceil(draws.exponential(chat.mean_gap, size=size)).astype(int).tolist()
+
+        lines = []
+        for offset in range(size):
+            index = first - offset
+            if system[offset]:
+                user_id, name = "system", "GroupMe"
+            else:
+                user_id = self.user_ids[posters[offset]]
+                name = self.names[posters[offset]]
+            attachments = self.attachments(kinds[offset], index)
+            favorited_by, reactions = self.reactions(reacters[offset])
+            message: dict[str, Any] = {
+                "attachments": attachments,
+                "avatar_url": None,
+                "created_at": created_at,
+                "favorited_by": favorited_by,
+                "group_id": GROUP_ID,
+                "id": str(10**17 + index),
+                "name": name,
+                "sender_id": user_id,
+                "sender_type": "system" if user_id == "system" else "user",
+                "source_guid": f"{index:032x}",
+                "system": user_id == "system",
+                "text": (
+                    None
+                    if kinds[offset] == 1 and not keyword[offset]
+                    else self.text(words[offset], keyword[offset])
+                ),
+                "user_id": user_id,
+                "platform": "gm",
+            }
+            if reactions is not None:
+                message["reactions"] = reactions
+            lines.append(json.dumps(message) + "\n")
+            created_at -= gaps[offset]
+        return lines, created_at
+
+    def write(self, output_file: Path):
+        """Write the chat to `output_file`"""
+        chat = self.chat
+        created_at = chat.start + int(chat.messages * chat.mean_gap)
+        with open(output_file, "w", encoding="utf-8") as file:
+            for first in range(chat.messages - 1, -1, -BATCH_SIZE):
+                lines, created_at = self.batch(
+                    first, min(BATCH_SIZE, first + 1), created_at
+                )
+                file.write("".join(lines))
+
+
+def write_synthetic_chat(chat: SyntheticChat, output_file: Path):
+    """Write the messages of `chat` to `output_file`, as `FetchChat.fetch_chat` does"""
+    ChatGenerator(chat).write(output_file)
+
+
+def main(  # pylint: disable=too-many-arguments
+    chat_json: Annotated[str, typer.Option(help="Name of json file to write the chat to")],
+    messages: Annotated[int, typer.Option(help="Number of messages")] = 10_000,
+    members: Annotated[int, typer.Option(help="Number of chat members")] = 20,
+    reaction_density: Annotated[
+        float, typer.Option(help="Mean number of members who react to a message")
+    ] = 1.5,
+    image_rate: Annotated[
+        float, typer.Option(help="Fraction of messages with an image")
+    ] = 0.08,
+    poll_rate: Annotated[float, typer.Option(help="Fraction of messages with a poll")] = 0.01,
+    video_rate: Annotated[
+        float, typer.Option(help="Fraction of messages with a video")
+    ] = 0.01,
+    mention_rate: Annotated[
+        float, typer.Option(help="Fraction of messages with a mention")
+    ] = 0.05,
+    keyword_hit_rate: Annotated[
+        float, typer.Option(help="Fraction of messages that contain a keyword")
+    ] = 0.05,
+    keyword: Annotated[
+        list[str] | None, typer.Option(help="Keyword to include, may be repeated")
+    ] = None,
+    seed: Annotated[int, typer.Option(help="Random seed")] = 0,
+):
+    """Write a synthetic chat to the raw output directory"""
+    chat = SyntheticChat(
+        messages=messages,
+        members=members,
+        reaction_density=reaction_density,
+        image_rate=image_rate,
+        poll_rate=poll_rate,
+        video_rate=video_rate,
+        mention_rate=mention_rate,
+        keyword_hit_rate=keyword_hit_rate,
+        seed=seed,
+    )
+    if keyword:
+        chat.keywords = keyword
+    output_file = FileData.raw_output_dir / validate_json_input(chat_json)
+    write_synthetic_chat(chat, output_file)
+    typer.echo(f"Wrote {messages} messages to {output_file}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,114 +1,478 @@
 """Module for groupme chat analysis"""
 
-import json
+import hashlib
 import logging
+from array import array
+from collections import defaultdict
+from contextlib import nullcontext
+from enum import Enum
+from functools import partial
 from pathlib import Path
-from datetime import datetime
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
 
 from py.models.analysis_config import AnalysisConfig
-from py.models.message_template import ChatMessage
+from py.models.message_template import Message, MessageRecord
 from py.utils.utility import remove_unicode_characters
 from py.models.message_template import AttachmentType, LIKES, DISLIKES
 from py.models.member_stats import MemberStats, member_summary_table, HOURS, DAYS
-from py.models.message_superlative import MessageSuperlative, popular_message_table
+from py.models.message_superlative import (
+    MessageSuperlative,
+    grouped_popular_message_table,
+    popular_message_table,
+)
 from py.models.chat_stats import ChatStats, chat_summary_table
+from py.models.analysis_results import RESULTS_VERSION, AnalysisResults, AnalysisState
+from py.models.period_stats import (
+    Period,
+    PeriodStats,
+    keyword_series,
+    period_table,
+    year_over_year_tables,
+)
+from py.models.reaction_matrices import ReactionMatrices
 from py.data_processing.plots import (
+    PlotPool,
+    activity_heat_map,
+    calendar_heat_map,
     reaction_heat_map,
     histograms,
     plot_superlatives,
     plot_keyword_occurances,
+    plot_time_series,
 )
+from py.data_processing.chat_reader import ChatArchive, read_message
+from py.data_processing.chunked import ArchiveChunks, map_chunks, reduce_chunks
+from py.data_processing.columnar import ChatColumns, ColumnarStats
+from py.data_processing.columnar_archive import ColumnarArchive
+from py.data_processing.dataframe import ChatFrames, DataFrameStats
+from py.data_processing.keyword_matcher import KeywordMatcher
+from py.data_processing.member_registry import MemberRegistry
+from py.data_processing.result_cache import ResultCache
+from py.data_processing.stage_graph import Stage, StageGraph
+from py.data_processing.top_messages import MessageRanking
 from py.utils.directories import FileData
+from py.utils.profiler import Profiler
+from py.utils.time_buckets import TimeBuckets, local_datetime, month_labels
 
 LOG = logging.getLogger(__name__)
 
-GROUPME_NAMES = ["system", "calendar"]
+
+class AnalysisEngine(str, Enum):
+    """Engines available to compute member stats"""
+
+    PYTHON = "python"
+    COLUMNAR = "columnar"
+    DATAFRAME = "dataframe"
+
+
+class AnalysisOutput(str, Enum):
+    """Outputs that can be requested from an analysis, named after the stage writing them"""
+
+    SUPERLATIVE_PLOTS = "superlative_plots"
+    REACTION_HEAT_MAPS = "reaction_heat_maps"
+    TIME_DISTRIBUTION = "time_distribution"
+    MEMBER_SUMMARY = "member_summary"
+    CHAT_SUMMARY = "chat_summary"
+    KEYWORD_PLOTS = "keyword_plots"
+    MOST_POPULAR_MESSAGES = "most_popular_messages"
+    PERIOD_TABLES = "period_tables"
+    MONTHLY_PLOTS = "monthly_plots"
+    ACTIVITY_CALENDAR = "activity_calendar"
+    YEAR_OVER_YEAR = "year_over_year"
 
 
 class Analysis:
     """Class to handle analaysis of GroupMe chat data"""
 
-    def __init__(
-        self, analysis_config: AnalysisConfig, chat_path: Path
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        analysis_config: AnalysisConfig,
+        chat_path: Path,
+        engine: AnalysisEngine = AnalysisEngine.PYTHON,
+        result_cache: ResultCache | None = None,
+        plot_workers: int | None = 1,
+        strict_validation: bool = False,
+        profiler: Profiler | None = None,
+        chunk_size: int | None = None,
+        chunk_workers: int | None = 1,
     ):
         self.config = analysis_config
         self.chat_path = chat_path
+        self.engine = engine
+        self.strict_validation = strict_validation
+        self.chunk_size = chunk_size
+        self.chunk_workers = chunk_workers
+        self.result_cache = result_cache
+        self.profiler = profiler or Profiler(enabled=False)
+        self.plot_pool = PlotPool(plot_workers)
+        self.keyword_matcher = KeywordMatcher(analysis_config.chat_keywords or [])
+        self.message_ranking = MessageRanking(analysis_config.num_messages_rank)
         self.output_dir = FileData.results_dir / analysis_config.output_folder
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Read chat
-        self.messages = self.read_chat_json()
+        # Chat, read by `read_chat`
+        self.messages = ChatArchive(chat_path)
+        self.columns: ChatColumns | None = None
+        self.columnar_archive: ColumnarArchive | None = None
+        self.frames: ChatFrames | None = None
 
-        # Member Names
+        # Bytes of the chat archive read
+        self.archive_size = 0
+
+        # Member Names, resolved from the registry once the chat has been read
+        self.registry = MemberRegistry()
         self.id_to_names: dict[str, list[str]] = {}
         self.id_to_name: dict[str, str] = {}
         self.chat_member_names: list[str] = []
-        self.map_id_to_name()
-        self.process_member_names()
 
         # Results
         self.chat_stats = ChatStats()
         self.keyword_map: dict[str, dict[str, int]] = {}
         self.member_stats: dict[str, MemberStats] = {}
-        self.initialize_results_dicts()
+        self.reaction_matrices = ReactionMatrices()
         self.best_messages: list[MessageSuperlative] = []
+        self.best_messages_by_member: dict[str, list[MessageSuperlative]] = {}
+        self.best_messages_by_month: dict[str, list[MessageSuperlative]] = {}
+        self.period_stats = PeriodStats()
+
+        # Counts by interned user id, accumulated while the chat is read
+        self.user_stats: defaultdict[int, MemberStats] = defaultdict(MemberStats)
+        self.user_reactions = ReactionMatrices()
+        # Columns of every post, in archive order, as int64 arrays. The likers of a post
+        # end at its offset in `candidate_likers`
+        self.post_users = array("q")
+        self.post_times = array("q")
+        self.post_words = array("q")
+        self.post_likers_end = array("q")
+        self.candidate_likers = array("q")
+        # Post index, message id and archive offset of each post with reactions. Only
+        # ids and offsets are kept, the text of the most liked messages is read again
+        # once they have been ranked
+        self.candidate_posts = array("q")
+        self.candidate_ids = array("q")
+        self.candidate_offsets = array("q")
+        # Post index and keyword index of each keyword found
+        self.hit_posts = array("q")
+        self.hit_keywords = array("q")
+
+    def analyze_chat(
+        self,
+        incremental: bool = False,
+        outputs: Iterable[str] | None = None,
+        force: bool = False,
+    ) -> list[str]:
+        """Method to run the chat analyses that the requested `outputs` need, all if None,
+        return the names of the stages run
 
-    def analyze_chat(self):
-        """Method to run all chat analyses"""
-        self.get_member_stats()
-        self.calculate_superlatives()
-        self.reaction_heat_maps()
-        self.time_distribution()
-        self.member_summary()
-        self.chat_summary()
-        self.keyword_plots()
-        self.most_popular_messages()
-
-    def map_id_to_name(self):
-        """Map user id numbers to member names"""
-
-        for message in self.messages:
-            name = message.name
-            split_name = name.split(" ")
-            if "James" in name and len(split_name) > 1:
-                name = "James " + split_name[-1][0]
+        Outputs newer than the chat and the analysis config are not written again unless
+        `force`, the chat is not analyzed if every requested output is up to date or
+        disabled by the analysis config
+        """
+        graph = self.stage_graph(incremental)
+        plan = graph.plan(outputs, [self.chat_path, self.config_stamp()], force)
+        if not plan:
+            requested = graph.outputs if outputs is None else list(outputs)
+            if len(graph.disabled) == len(requested):
+                LOG.info("Every requested output is disabled, nothing was written")
+            elif graph.disabled:
+                LOG.info("Every requested output is up to date or disabled")
             else:
-                name = split_name[0]
-            try:
-                if name not in self.id_to_names[message.user_id]:
-                    self.id_to_names[message.user_id] += [name]
-            except KeyError:
-                if message.user_id not in GROUPME_NAMES:
-                    self.id_to_names[message.user_id] = [name]
-
-    def process_member_names(self):
-        """Use most recent name of each member and remove unicode characters"""
-        self.id_to_name = {
-            key: remove_unicode_characters(value[-1])
-            for key, value in self.id_to_names.items()
-        }
-        for name in self.id_to_name.values():
-            if name == "Copilot" and self.config.exclude_copilot:
-                continue
-            self.chat_member_names += [name]
+                LOG.info("Every requested output is up to date")
+            return []
+        with self.plot_pool:
+            for stage in plan:
+                submitted = self.plot_pool.submitted
+                with self.profiler.stage(stage.name) as metrics:
+                    items = stage.run()
+                    metrics.items = items or self.plot_pool.submitted - submitted or None
+            with self.profiler.stage("render_figures") as metrics:
+                metrics.items = len(self.plot_pool.futures)
+                self.plot_pool.close()
+        return [stage.name for stage in plan]
+
+    def stage_graph(self, incremental: bool = False) -> StageGraph:
+        """Stages of the analysis, with the stages they require and the files they write"""
+        superlative_dir = self.output_dir / FileData.superlative_folder
+        heatmap_dir = self.output_dir / FileData.heatmap_folder
+        histogram_dir = self.output_dir / FileData.post_frequency_folder
+        period_dir = self.output_dir / FileData.period_folder
+        chat_name = self.config.chat_name
+        return StageGraph(
+            [
+                Stage("member_stats", lambda: self.member_stats_stage(incremental)),
+                Stage(
+                    "calculate_superlatives",
+                    self.calculate_superlatives,
+                    requires=["member_stats"],
+                ),
+                Stage(
+                    AnalysisOutput.SUPERLATIVE_PLOTS.value,
+                    self.superlative_plots,
+                    requires=["calculate_superlatives"],
+                    outputs=[
+                        superlative_dir / FileData.ranked_by_message,
+                        superlative_dir / FileData.like_pos_ratio,
+                        superlative_dir / FileData.word_count,
+                        superlative_dir / FileData.images_ranked,
+                        superlative_dir / FileData.polls_ranked,
+                    ],
+                ),
+                Stage(
+                    AnalysisOutput.REACTION_HEAT_MAPS.value,
+                    self.reaction_heat_maps,
+                    requires=["member_stats"],
+                    outputs=[
+                        heatmap_dir / FileData.reaction_heatmap,
+                        heatmap_dir / FileData.hearts_heatmap,
+                        heatmap_dir / FileData.dislikes_heatmap,
+                    ],
+                ),
+                Stage(
+                    AnalysisOutput.TIME_DISTRIBUTION.value,
+                    self.time_distribution,
+                    requires=["member_stats"],
+                    # Member histograms are written with the chat histograms
+                    outputs=[
+                        histogram_dir / f"{chat_name}{suffix}.png"
+                        for suffix in [
+                            FileData.daily,
+                            FileData.weekly,
+                            FileData.day_and_hour,
+                        ]
+                    ],
+                ),
+                Stage(
+                    AnalysisOutput.MEMBER_SUMMARY.value,
+                    self.member_summary,
+                    requires=["calculate_superlatives"],
+                    outputs=[self.output_dir / FileData.member_summary],
+                ),
+                Stage(
+                    AnalysisOutput.CHAT_SUMMARY.value,
+                    self.chat_summary,
+                    requires=["calculate_superlatives"],
+                    outputs=[self.output_dir / FileData.chat_summary],
+                ),
+                Stage(
+                    AnalysisOutput.KEYWORD_PLOTS.value,
+                    self.keyword_plots,
+                    requires=["member_stats"],
+                    outputs=[self.output_dir / FileData.chat_keywords],
+                    enabled=bool(self.config.chat_keywords),
+                ),
+                Stage(
+                    AnalysisOutput.MOST_POPULAR_MESSAGES.value,
+                    self.most_popular_messages,
+                    requires=["member_stats"],
+                    outputs=[
+                        self.output_dir / FileData.popular_messages,
+                        self.output_dir / FileData.popular_messages_by_member,
+                        self.output_dir / FileData.popular_messages_by_month,
+                    ],
+                ),
+                Stage(
+                    AnalysisOutput.PERIOD_TABLES.value,
+                    self.period_tables,
+                    requires=["member_stats"],
+                    outputs=[
+                        period_dir / FileData.period_table.format(period.value)
+                        for period in Period
+                    ],
+                ),
+                Stage(
+                    AnalysisOutput.MONTHLY_PLOTS.value,
+                    self.monthly_plots,
+                    requires=["member_stats"],
+                    outputs=[period_dir / FileData.monthly_activity]
+                    + (
+                        [period_dir / FileData.monthly_keywords]
+                        if self.config.chat_keywords
+                        else []
+                    ),
+                ),
+                Stage(
+                    AnalysisOutput.ACTIVITY_CALENDAR.value,
+                    self.activity_calendar,
+                    requires=["member_stats"],
+                    outputs=[period_dir / FileData.activity_calendar],
+                ),
+                Stage(
+                    AnalysisOutput.YEAR_OVER_YEAR.value,
+                    self.year_over_year,
+                    requires=["member_stats"],
+                    outputs=[
+                        period_dir / FileData.year_over_year,
+                        period_dir / FileData.messages_by_month_and_year,
+                    ],
+                ),
+            ]
+        )
+
+    def config_stamp(self) -> Path:
+        """File holding the analysis config the outputs were written with, rewritten only
+        when the config changes so its modification time marks the change"""
+        stamp = self.output_dir / FileData.config_stamp
+        config = self.config.model_dump_json(indent=4)
+        if not stamp.exists() or stamp.read_text(encoding="utf-8") != config:
+            stamp.write_text(config, encoding="utf-8")
+        return stamp
+
+    def member_stats_stage(self, incremental: bool = False) -> int:
+        """Get member stats, return the number of messages analyzed"""
+        if incremental:
+            self.get_incremental_member_stats()
+        else:
+            self.get_cached_member_stats()
+        return self.chat_stats.num_messages
+
+    def read_chat(self, start: int = 0, end: int | None = None):
+        """Read chat, from byte offset `start` to `end` or the end of the archive, member
+        names are collected as the messages are analyzed"""
+        self.archive_size = self.chat_path.stat().st_size if end is None else end
+        if self.chat_path.suffix == FileData.columnar_suffix:
+            self.engine = AnalysisEngine.COLUMNAR
+            self.columns = self.read_columnar_archive()
+        else:
+            self.messages = self.read_chat_json(start)
+            if self.engine == AnalysisEngine.COLUMNAR:
+                self.columns = ChatColumns.from_messages(self.messages)
+            elif self.engine == AnalysisEngine.DATAFRAME:
+                self.frames = ChatFrames.from_messages(self.messages)
+
+    def get_cached_member_stats(self):
+        """Get member stats from the result cache, computing and caching them on a miss"""
+        if self.result_cache is None:
+            self.get_member_stats()
+            return
+        key = self.result_cache.key(self.chat_path, self.config)
+        results = self.result_cache.load(key)
+        if results is None:
+            self.get_member_stats()
+            self.result_cache.save(key, self.results())
+            return
+        self.use_results(results)
+
+    def get_incremental_member_stats(self):
+        """Get member stats by folding the messages appended since the last analysis into its
+        saved state, or from the whole chat when the state cannot be reused
+
+        Reactions added to messages after they were analyzed are not counted until the
+        state is rebuilt, by deleting it or changing the analysis config
+        """
+        state_file = self.output_dir / FileData.analysis_state
+        config_hash = hashlib.sha256(
+            (RESULTS_VERSION + self.config.model_dump_json()).encode("utf-8")
+        ).hexdigest()
+        state = AnalysisState.load(state_file)
+        if (
+            state is None
+            or state.config_hash != config_hash
+            or not self.fold_new_messages(state)
+        ):
+            LOG.info("Analyzing every message of %s", self.chat_path)
+            self.get_member_stats()
+        AnalysisState(
+            **dict(self.results()),
+            config_hash=config_hash,
+            id_to_names=self.id_to_names,
+            archive_size=self.archive_size,
+            archive_tail=AnalysisState.tail_hash(self.chat_path, self.archive_size),
+        ).save(state_file)
 
-    def read_chat_json(self) -> list[ChatMessage]:
-        """Read chat messages from json file"""
+    def fold_new_messages(self, state: AnalysisState) -> bool:
+        """Analyze messages appended after the `state` was saved and merge them into it
+
+        Returns False, without changing any results, if the chat was not only appended to
+        or the new messages add a member or change a member's name, since earlier messages
+        would then be counted differently
+        """
+        if self.chat_path.suffix == FileData.columnar_suffix or not state.appended_to(
+            self.chat_path
+        ):
+            return False
+        delta = Analysis(
+            self.config,
+            self.chat_path,
+            self.engine,
+            strict_validation=self.strict_validation,
+        )
+        delta.registry = MemberRegistry(state.id_to_names)
+        delta.read_chat(start=state.archive_size)
+        delta.compute_member_stats()
+        if delta.id_to_names != state.id_to_names:
+            LOG.info("New messages add or rename members")
+            return False
+        LOG.info(
+            "Folding %d new messages into the saved analysis state",
+            delta.chat_stats.num_messages,
+        )
+
+        results = AnalysisResults(**dict(state))
+        results.merge(delta.results(), self.config.num_messages_rank)
+        self.use_results(results)
+        self.id_to_names = delta.id_to_names
+        self.id_to_name = delta.id_to_name
+        self.chat_member_names = delta.chat_member_names
+        self.archive_size = delta.archive_size
+        return True
+
+    def results(self) -> AnalysisResults:
+        """Aggregated results of the analysis"""
+        return AnalysisResults(
+            member_stats=self.member_stats,
+            chat_stats=self.chat_stats,
+            reaction_matrices=self.reaction_matrices,
+            keyword_map=self.keyword_map,
+            best_messages=self.best_messages,
+            best_messages_by_member=self.best_messages_by_member,
+            best_messages_by_month=self.best_messages_by_month,
+            period_stats=self.period_stats,
+        )
+
+    def use_results(self, results: AnalysisResults):
+        """Take aggregated results computed elsewhere as the results of the analysis"""
+        self.member_stats = results.member_stats
+        self.chat_stats = results.chat_stats
+        self.reaction_matrices = results.reaction_matrices
+        self.keyword_map = results.keyword_map
+        self.best_messages = results.best_messages
+        self.best_messages_by_member = results.best_messages_by_member
+        self.best_messages_by_month = results.best_messages_by_month
+        self.period_stats = results.period_stats
+
+    def resolve_members(self) -> np.ndarray:
+        """Resolve chat members from the registry and initialize results, return the
+        member index of each interned user, -1 for users who are not chat members"""
+        members = self.registry.resolve(self.config.exclude_copilot)
+        self.id_to_names = members.id_to_names
+        self.id_to_name = members.id_to_name
+        self.chat_member_names = members.chat_member_names
+        self.initialize_results_dicts()
+        return members.member_of_user
+
+    def read_chat_json(self, start: int = 0) -> ChatArchive:
+        """Read chat messages from json file, messages are streamed on each pass"""
         LOG.info("Reading chat from %s", self.chat_path)
-        with open(self.chat_path, encoding="utf-8") as json_file:
-            messages = json.load(json_file)
+        return ChatArchive(
+            self.chat_path, start, self.archive_size, self.strict_validation
+        )
 
-            return [
-                ChatMessage.model_validate_json(json.dumps(message))
-                for message in messages
-            ]
+    def read_columnar_archive(self) -> ChatColumns:
+        """Read chat columns from a memory mapped binary archive, string columns are
+        decoded on access so the archive stays open until member stats are computed"""
+        LOG.info("Reading columnar chat archive from %s", self.chat_path)
+        self.columnar_archive = ColumnarArchive(self.chat_path)
+        return self.columnar_archive.load()
 
     def initialize_results_dicts(self):
         """Initialize results dictionaries"""
         # Results
         for name in self.chat_member_names:
             self.member_stats[name] = MemberStats()
-            self.member_stats[name].initialize_dicts(self.chat_member_names)
+        self.reaction_matrices = ReactionMatrices(members=list(self.member_stats))
         if self.config.chat_keywords is not None:
             for keyword in self.config.chat_keywords:
                 self.keyword_map[keyword.name] = {}
@@ -117,142 +481,397 @@ class Analysis:
 
     def get_member_stats(self):
         """Get stats for each group chat member, populate fields in `MemberStats` class"""
+        if self.chunk_size is not None:
+            if self.chat_path.suffix != FileData.columnar_suffix:
+                self.get_chunked_member_stats(self.chunk_size)
+                return
+            LOG.info("Columnar archives are memory mapped and not analyzed in chunks")
+        self.read_chat()
+        self.compute_member_stats()
+
+    def get_chunked_member_stats(self, chunk_size: int):
+        """Get stats for each group chat member by analyzing the chat in chunks of
+        `chunk_size` messages and merging the results of each chunk
+
+        The chat is read twice, once to find the chunks and chat members, then to analyze
+        each chunk with the members of the whole chat. At most one chunk of messages is
+        held in memory by each of the `chunk_workers` processes
+        """
+        self.archive_size = self.chat_path.stat().st_size
+        chunks = ArchiveChunks.scan(self.chat_path, chunk_size)
+        LOG.info(
+            "Analyzing %s in %d chunks of %d messages",
+            self.chat_path,
+            len(chunks.ranges),
+            chunk_size,
+        )
+        self.registry = MemberRegistry(chunks.id_to_names)
+        self.resolve_members()
+        self.period_stats = PeriodStats(
+            keywords={keyword.name: [] for keyword in self.config.chat_keywords or []}
+        )
+        results = reduce_chunks(
+            self.results(),
+            map_chunks(
+                partial(
+                    analyze_chunk,
+                    self.config,
+                    self.chat_path,
+                    self.engine,
+                    chunks.id_to_names,
+                    self.strict_validation,
+                ),
+                chunks.ranges,
+                self.chunk_workers,
+            ),
+            self.config.num_messages_rank,
+        )
+        self.use_results(results)
+
+    def compute_member_stats(self):
+        """Compute member stats from the chat that has been read
+
+        Stats are counted by interned user id in a single pass over the messages, then
+        added to the stats of chat members. Messages posted by users who are not chat
+        members, and reactions they gave, are not counted
+        """
+        if self.columns is not None:
+            with self.columnar_archive or nullcontext():
+                self.get_member_stats_columnar(self.columns)
+            return
+        if self.frames is not None:
+            self.get_member_stats_dataframe(self.frames)
+            return
 
         # Loop through each message
-        for message in self.messages:
-            try:
-                poster = self.id_to_name[message.user_id]
-                self.increment_vals(poster, message)
-                self.add_stats_for_reaction(poster, message)
-                self.add_stats_for_like_and_dislike(poster, message)
-                if self.config.chat_keywords is not None:
-                    self.keyword_increment(poster, message)
-                self.update_message_superlative(poster, message)
-            except KeyError:
-                # Ignore posts made by groupme bots
+        for message, offset in self.messages.with_offsets():
+            poster = self.registry.observe_poster(message.user_id, message.name)
+            self.increment_vals(poster, message)
+            self.add_stats_for_reaction(poster, message)
+            likers = self.add_stats_for_like_and_dislike(poster, message)
+            if self.config.chat_keywords is not None:
+                self.keyword_increment(message)
+            self.update_message_superlative(message, offset, likers)
+            self.post_likers_end.append(len(self.candidate_likers))
+
+        member_of_user = self.resolve_members()
+        self.fold_user_stats(member_of_user)
+        self.count_post_times(member_of_user)
+        self.rank_candidates(member_of_user)
+
+    def get_member_stats_columnar(self, columns: ChatColumns):
+        """Get stats for each group chat member from chat columns with array operations"""
+        user_of_column = self.registry.intern_all(columns.user_ids)
+        for user_id, name in columns.posters():
+            self.registry.observe_poster(user_id, name)
+        member_of_user = self.resolve_members()[user_of_column]
+        stats = ColumnarStats(
+            columns, member_of_user, list(self.member_stats), self.config.zone
+        )
+        stats.fill_stats(self.member_stats, self.chat_stats, self.reaction_matrices)
+        if self.config.chat_keywords is not None:
+            stats.fill_keywords(
+                self.keyword_map, self.config.chat_keywords, self.keyword_matcher
+            )
+        self.period_stats = stats.period_stats(
+            self.config.chat_keywords or [], self.keyword_matcher
+        )
+        for message, likes, month in stats.superlative_candidates():
+            self.message_ranking.add(
+                likes,
+                int(columns.message_id[message]),
+                stats.member_names[stats.poster[message]],
+                month,
+                message,
+            )
+        self.rank_best_messages(
+            lambda message: self.superlative(
+                stats.member_names[stats.poster[message]],
+                int(columns.message_id[message]),
+                int(columns.created_at[message]),
+                columns.texts[message],
+                columns.image_urls[message],
+                stats.likers(message),
+            )
+        )
+
+    def get_member_stats_dataframe(self, frames: ChatFrames):
+        """Get stats for each group chat member from chat frames with group by
+        operations"""
+        for user_id, name in frames.posters():
+            self.registry.observe_poster(user_id, name)
+        member_of_user = self.resolve_members()
+        stats = DataFrameStats(
+            frames,
+            pd.Series(member_of_user, index=self.registry.user_ids),
+            list(self.member_stats),
+            self.config.zone,
+        )
+        stats.fill_stats(self.member_stats, self.chat_stats, self.reaction_matrices)
+        keywords = self.config.chat_keywords or []
+        hits = stats.keyword_hits(self.keyword_matcher if keywords else None)
+        if self.config.chat_keywords is not None:
+            stats.fill_keywords(self.keyword_map, keywords, hits)
+        self.period_stats = stats.period_stats(keywords, hits)
+        (
+            self.best_messages,
+            self.best_messages_by_member,
+            self.best_messages_by_month,
+        ) = stats.rank_messages(self.config.num_messages_rank, self.superlative)
+
+    def fold_user_stats(self, member_of_user: np.ndarray):
+        """Add the counts of each user to the stats of their chat member and derive the
+        chat totals"""
+        members = list(self.member_stats)
+        for user, stats in self.user_stats.items():
+            member = member_of_user[user]
+            if member >= 0:
+                self.member_stats[members[member]].merge(stats)
+
+        matrices = self.reaction_matrices
+        matrices.reactions.merge(self.user_reactions.reactions, member_of_user)
+        matrices.hearts.merge(self.user_reactions.hearts, member_of_user)
+        matrices.dislikes.merge(self.user_reactions.dislikes, member_of_user)
+        size = len(members)
+        for stats, *counts in zip(
+            self.member_stats.values(),
+            matrices.reactions.row_sums(size),
+            matrices.reactions.transpose().row_sums(size),
+            matrices.hearts.row_sums(size),
+            matrices.hearts.transpose().row_sums(size),
+            matrices.dislikes.transpose().row_sums(size),
+        ):
+            (
+                stats.reactions_received,
+                stats.reactions_given,
+                stats.hearts_received,
+                stats.hearts_given,
+                stats.dislikes_given,
+            ) = counts
+
+        member_stats = self.member_stats.values()
+        self.chat_stats.num_messages = sum(stats.messages_sent for stats in member_stats)
+        self.chat_stats.average_word_count = float(
+            sum(stats.word_count for stats in member_stats)
+        )
+        self.chat_stats.total_reactions = matrices.reactions.total()
+        self.chat_stats.total_likes = matrices.hearts.total()
+        self.chat_stats.total_dislikes = matrices.dislikes.total()
+        self.chat_stats.total_image_attachments = sum(
+            stats.images_sent for stats in member_stats
+        )
+        self.chat_stats.total_polls = sum(stats.polls_made for stats in member_stats)
+
+        keywords = self.config.chat_keywords or []
+        hit_members = member_of_user[
+            np.frombuffer(self.post_users, dtype=np.int64)[
+                np.frombuffer(self.hit_posts, dtype=np.int64)
+            ]
+        ]
+        counted = hit_members >= 0
+        counts = np.bincount(
+            np.frombuffer(self.hit_keywords, dtype=np.int64)[counted] * size
+            + hit_members[counted],
+            minlength=len(keywords) * size,
+        ).reshape(len(keywords), size)
+        for keyword, keyword_counts in zip(keywords, counts.tolist()):
+            for name, count in zip(members, keyword_counts):
+                self.keyword_map[keyword.name][name] += count
+
+    def count_post_times(self, member_of_user: np.ndarray):
+        """Count the posts of each member by weekday and hour, and the daily activity of
+        the chat, in the configured time zone"""
+        buckets = TimeBuckets.from_timestamps(
+            np.frombuffer(self.post_times, dtype=np.int64), self.config.zone
+        )
+        post_members = member_of_user[np.frombuffer(self.post_users, dtype=np.int64)]
+        posts_by_day_and_hour = buckets.day_and_hour_counts(
+            post_members, len(self.member_stats)
+        )
+        for stats, posts in zip(self.member_stats.values(), posts_by_day_and_hour):
+            stats.set_post_times(posts)
+
+        # Likes of each post, by members
+        likers = np.frombuffer(self.candidate_likers, dtype=np.int64)
+        liked = np.concatenate([[0], np.cumsum(member_of_user[likers] >= 0)])
+        likers_end = np.frombuffer(self.post_likers_end, dtype=np.int64)
+        likes = liked[likers_end] - liked[np.concatenate([[0], likers_end[:-1]])]
+        valid = post_members >= 0
+        hit_posts = np.frombuffer(self.hit_posts, dtype=np.int64)
+        hit_valid = valid[hit_posts]
+        self.period_stats = PeriodStats.from_days(
+            buckets.day[valid],
+            np.frombuffer(self.post_words, dtype=np.int64)[valid],
+            np.repeat(buckets.day[valid], likes[valid]),
+            [keyword.name for keyword in self.config.chat_keywords or []],
+            np.frombuffer(self.hit_keywords, dtype=np.int64)[hit_valid],
+            buckets.day[hit_posts[hit_valid]],
+        )
+
+    def rank_candidates(self, member_of_user: np.ndarray):
+        """Rank the messages of chat members by the number of members who liked them,
+        then read the ranked messages again to build their superlatives"""
+        members = list(self.member_stats)
+        liker_members = member_of_user[
+            np.frombuffer(self.candidate_likers, dtype=np.int64)
+        ]
+        liked = np.concatenate([[0], np.cumsum(liker_members >= 0)])
+        likers_end = np.frombuffer(self.post_likers_end, dtype=np.int64)
+        posts = np.frombuffer(self.candidate_posts, dtype=np.int64)
+        starts = np.concatenate([[0], likers_end[:-1]])[posts].tolist()
+        ends = likers_end[posts].tolist()
+        posters = member_of_user[
+            np.frombuffer(self.post_users, dtype=np.int64)[posts]
+        ].tolist()
+        buckets = TimeBuckets.from_timestamps(
+            np.frombuffer(self.post_times, dtype=np.int64)[posts], self.config.zone
+        )
+        for candidate, (poster, start, end, month) in enumerate(
+            zip(posters, starts, ends, month_labels(buckets.month))
+        ):
+            if poster < 0:
                 continue
+            self.message_ranking.add(
+                int(liked[end] - liked[start]),
+                self.candidate_ids[candidate],
+                members[poster],
+                month,
+                candidate,
+            )
 
-    def update_message_superlative(self, poster: str, message: ChatMessage):
-        """Update the message superlative list with `message`"""
+        def build(candidate: int) -> MessageSuperlative:
+            message = MessageRecord(
+                read_message(self.chat_path, self.candidate_offsets[candidate])
+            )
+            likers = liker_members[starts[candidate] : ends[candidate]]
+            return self.superlative(
+                members[posters[candidate]],
+                message.id,
+                message.created_at,
+                message.text,
+                self.image_attachment(message),
+                [members[member] for member in likers.tolist() if member >= 0],
+            )
+
+        self.rank_best_messages(build)
+
+    def update_message_superlative(
+        self, message: Message, offset: int, likers: list[int]
+    ):
+        """Keep `message`, read from byte `offset` of the archive, and its `likers` as a
+        candidate for the most liked messages"""
         if message.reactions is None:
             return
-        total_likes = 0
-        likers: list[str] = []
-        image_attachment: str | None = None
-        for reaction in message.reactions:
-            if reaction.code in LIKES:
-                total_likes += len(reaction.user_ids)
-                likers += [self.id_to_name[name] for name in reaction.user_ids]
+        self.candidate_likers.extend(likers)
+        self.candidate_posts.append(len(self.post_times) - 1)
+        self.candidate_ids.append(message.id)
+        self.candidate_offsets.append(offset)
+
+    @staticmethod
+    def image_attachment(message: Message) -> str | None:
+        """Url of the first image attached to `message`, None if there is none"""
         for attachment in message.attachments:
             if attachment.type == AttachmentType.IMAGE:
-                image_attachment = attachment.url
-                break
-        text = (
-            message.text
-            if message.text is None
-            else remove_unicode_characters(message.text)
-        )
-        new_message = MessageSuperlative(
+                return attachment.url
+        return None
+
+    def superlative(  # pylint: disable=too-many-arguments
+        self,
+        poster: str,
+        message_id: int,
+        created_at: int,
+        text: str | None,
+        image_attachment: str | None,
+        likers: list[str],
+    ) -> MessageSuperlative:
+        """Build the superlative of a message"""
+        return MessageSuperlative(
             poster=poster,
-            created_at=datetime.fromtimestamp(message.created_at),
-            text=text,
+            created_at=local_datetime(created_at, self.config.zone),
+            text=text if text is None else remove_unicode_characters(text),
             image_attachment=image_attachment,
             likers=likers,
             total_likes=len(likers),
+            message_id=message_id,
         )
-        for i, top_message in enumerate(self.best_messages):
-            if total_likes > top_message.total_likes:
-                self.best_messages.insert(i, new_message)
-                self.best_messages = self.best_messages[:-1]
-                break
-        if (
-            len(self.best_messages) < self.config.num_messages_rank
-            and new_message not in self.best_messages
-        ):
-            self.best_messages += [new_message]
 
-    def keyword_increment(self, poster: str, message: ChatMessage):
-        """Increment the number of times a keyword occurs"""
-        keywords = self.config.chat_keywords
-        assert keywords is not None, "No keywords specified in config file"
+    def rank_best_messages(self, build: Callable[[Any], MessageSuperlative]):
+        """Build superlatives of the most liked messages, overall, by member and by month"""
+        (
+            self.best_messages,
+            self.best_messages_by_member,
+            self.best_messages_by_month,
+        ) = self.message_ranking.materialize(build)
 
-        for keyword in keywords:
-            for alias in keyword.aliases:
-                if message.text is not None and alias in message.text.lower():
-                    self.keyword_map[keyword.name][poster] += 1
-                    break
+    def keyword_increment(self, message: Message):
+        """Increment the number of times a keyword occurs"""
+        for index in self.keyword_matcher.matches(message.text):
+            self.hit_posts.append(len(self.post_times) - 1)
+            self.hit_keywords.append(index)
 
-    def increment_vals(self, poster: str, message: ChatMessage):
+    def increment_vals(self, poster: int, message: Message):
         """Increment stat values from message"""
+        stats = self.user_stats[poster]
         # Increment Message
-        self.member_stats[poster].messages_sent += 1
-        self.chat_stats.num_messages += 1
+        stats.messages_sent += 1
 
         # Increment Attachments
         for attachment in message.attachments:
             if attachment.type == AttachmentType.POLL:
-                self.member_stats[poster].polls_made += 1
-                self.chat_stats.total_polls += 1
+                stats.polls_made += 1
             elif attachment.type == AttachmentType.IMAGE:
-                self.member_stats[poster].images_sent += 1
-                self.chat_stats.total_image_attachments += 1
+                stats.images_sent += 1
 
         # Word Count
-        if message.text is not None:
-            self.member_stats[poster].word_count += len(message.text.split(" "))
-            self.chat_stats.average_word_count += len(message.text.split(" "))
+        words = 0 if message.text is None else len(message.text.split(" "))
+        stats.word_count += words
 
-        # Time posted
-        date_posted = datetime.fromtimestamp(message.created_at)
-        self.member_stats[poster].hours_posted += [date_posted.hour]
-        self.member_stats[poster].days_posted += [date_posted.weekday()]
+        # Time posted, bucketed once every message has been read
+        self.post_users.append(poster)
+        self.post_times.append(message.created_at)
+        self.post_words.append(words)
 
-    def add_stats_for_reaction(self, poster: str, message: ChatMessage):
+    def add_stats_for_reaction(self, poster: int, message: Message):
         """Add stats for reactions"""
-
-        self.member_stats[poster].reactions_received += len(message.favorited_by)
-        self.chat_stats.total_reactions += len(message.favorited_by)
         for reacter in message.favorited_by:
-            reacter = self.id_to_name[reacter]
-            self.member_stats[reacter].reactions_given += 1
-            self.member_stats[poster].reactions_received_by_sender[reacter] += 1
-
-    def add_stats_for_like_and_dislike(self, poster: str, message: ChatMessage):
-        """Add stats for likes and dislikes"""
+            self.user_reactions.reactions.add(poster, self.registry.intern(reacter))
 
+    def add_stats_for_like_and_dislike(self, poster: int, message: Message) -> list[int]:
+        """Add stats for likes and dislikes, return the users who liked the message"""
+        likers: list[int] = []
         if message.reactions is not None:
             for reaction in message.reactions:
                 if reaction.code in LIKES:
-                    self.member_stats[poster].hearts_received += len(reaction.user_ids)
-                    self.chat_stats.total_likes += len(reaction.user_ids)
                     for reacter in reaction.user_ids:
-                        reacter = self.id_to_name[reacter]
-                        self.member_stats[reacter].hearts_given += 1
-                        self.member_stats[poster].hearts_received_by_sender[
-                            reacter
-                        ] += 1
-                        self.member_stats[reacter].hearts_given_by_receiver[poster] += 1
+                        reacter_id = self.registry.intern(reacter)
+                        likers.append(reacter_id)
+                        self.user_reactions.hearts.add(poster, reacter_id)
                 elif reaction.code in DISLIKES:
-                    self.member_stats[poster].dislikes_received += 1
-                    self.chat_stats.total_dislikes += len(reaction.user_ids)
+                    self.user_stats[poster].dislikes_received += 1
                     for reacter in reaction.user_ids:
-                        reacter = self.id_to_name[reacter]
-                        self.member_stats[poster].dislikes_received_by_sender[
-                            reacter
-                        ] += 1
-                        self.member_stats[reacter].dislikes_given += 1
+                        self.user_reactions.dislikes.add(
+                            poster, self.registry.intern(reacter)
+                        )
+        return likers
 
     def calculate_superlatives(self):
         """Calculate surperaltives from member stats"""
-        LOG.info("Calculating and plotting chat superlatives")
+        LOG.info("Calculating chat superlatives")
         self.chat_stats.average_word_count = (
             self.chat_stats.average_word_count / self.chat_stats.num_messages
         )
-        for member in self.member_stats.values():
+        for member, biggest_fan, biggest_supporter_of in zip(
+            self.member_stats.values(),
+            self.reaction_matrices.biggest_fans(),
+            self.reaction_matrices.biggest_supported(),
+        ):
             member.post_time_modes()
             member.get_verbosity()
-            member.get_reaction_superlatives()
+            member.get_reaction_superlatives(biggest_fan, biggest_supporter_of)
 
+    def superlative_plots(self):
+        """Plot members ranked by each superlative"""
+        LOG.info("Plotting chat superlatives")
         superlative_dir = self.output_dir / FileData.superlative_folder
         superlative_dir.mkdir(exist_ok=True)
 
@@ -260,7 +879,8 @@ class Analysis:
         superlative = {
             name: member.messages_sent for name, member in self.member_stats.items()
         }
-        plot_superlatives(
+        self.plot_pool.submit(
+            plot_superlatives,
             superlative,
             f"{self.config.chat_name}: Messages Posted by User",
             "Number of messages",
@@ -272,7 +892,8 @@ class Analysis:
             name: member.heart_message_ratio
             for name, member in self.member_stats.items()
         }
-        plot_superlatives(
+        self.plot_pool.submit(
+            plot_superlatives,
             superlative,
             f"{self.config.chat_name}: Average Likes per post",
             "Like / Post ratio",
@@ -284,7 +905,8 @@ class Analysis:
             name: member.average_word_count
             for name, member in self.member_stats.items()
         }
-        plot_superlatives(
+        self.plot_pool.submit(
+            plot_superlatives,
             superlative,
             f"{self.config.chat_name}: Average Word Count, by Member",
             "Word Count",
@@ -295,7 +917,8 @@ class Analysis:
         superlative = {
             name: member.images_sent for name, member in self.member_stats.items()
         }
-        plot_superlatives(
+        self.plot_pool.submit(
+            plot_superlatives,
             superlative,
             f"{self.config.chat_name}: Number of Images Posted, by Member",
             "Image Attachments",
@@ -306,7 +929,8 @@ class Analysis:
         superlative = {
             name: member.polls_made for name, member in self.member_stats.items()
         }
-        plot_superlatives(
+        self.plot_pool.submit(
+            plot_superlatives,
             superlative,
             f"{self.config.chat_name}: Number of Polls Made, by Member",
             "Polls",
@@ -324,79 +948,104 @@ class Analysis:
         LOG.info("Create a table of the most popular messages")
         output_file = self.output_dir / FileData.popular_messages
         popular_message_table(self.best_messages, output_file)
+        grouped_popular_message_table(
+            self.best_messages_by_member,
+            "member",
+            self.output_dir / FileData.popular_messages_by_member,
+        )
+        grouped_popular_message_table(
+            self.best_messages_by_month,
+            "month",
+            self.output_dir / FileData.popular_messages_by_month,
+        )
 
     def time_distribution(self):
         """Create histograms for monthly and yearly posts"""
         LOG.info("Calculating and plotting chat activity")
-        histogram_dir = self.output_dir / "post_frequency"
+        histogram_dir = self.output_dir / FileData.post_frequency_folder
         histogram_dir.mkdir(exist_ok=True)
 
-        all_hours = []
-        all_days = []
+        all_posts = np.zeros((len(DAYS), len(HOURS)), dtype=np.int64)
         for name, member in self.member_stats.items():
-            histograms(
-                member.hours_posted,
+            self.plot_pool.submit(
+                histograms,
+                member.posts_by_hour,
                 HOURS,
                 f"{name}'s Daily Post Distribution",
                 "Hour",
                 histogram_dir / f"{name}{FileData.daily}",
             )
-            histograms(
-                member.days_posted,
+            self.plot_pool.submit(
+                histograms,
+                member.posts_by_day,
                 DAYS,
                 f"{name}'s Weekly Post Distribution",
                 "Day of Week",
                 histogram_dir / f"{name}{FileData.weekly}",
             )
-            all_hours += member.hours_posted
-            all_days += member.days_posted
+            all_posts += member.posts_by_day_and_hour
         # Histogram for all posts in chat
-        histograms(
-            all_hours,
+        self.plot_pool.submit(
+            histograms,
+            all_posts.sum(axis=0).tolist(),
             HOURS,
             f"{self.config.chat_name}'s Daily Post Distribution",
             "Hour",
             histogram_dir / f"{self.config.chat_name}{FileData.daily}",
         )
-        histograms(
-            all_days,
+        self.plot_pool.submit(
+            histograms,
+            all_posts.sum(axis=1).tolist(),
             DAYS,
             f"{self.config.chat_name}'s Weekly Post Distribution",
             "Day of Week",
             histogram_dir / f"{self.config.chat_name}{FileData.weekly}",
         )
+        self.plot_pool.submit(
+            activity_heat_map,
+            all_posts.tolist(),
+            f"{self.config.chat_name}'s Posts by Day and Hour",
+            histogram_dir / f"{self.config.chat_name}{FileData.day_and_hour}",
+        )
 
     def reaction_heat_maps(self):
         """Create heat maps for reactions"""
         LOG.info("Calculating and plotting chat reactions")
         heatmap_dir = self.output_dir / FileData.heatmap_folder
         heatmap_dir.mkdir(exist_ok=True)
+        members = self.reaction_matrices.members
         # Heat map for all reactions
-        reaction_dict = {
-            name: stats.reactions_received_by_sender
-            for name, stats in self.member_stats.items()
-        }
         reaction_map_output = heatmap_dir / FileData.reaction_heatmap
         title = f"{self.config.chat_name} Reactions by Member"
-        reaction_heat_map(reaction_dict, title, reaction_map_output)
+        self.plot_pool.submit(
+            reaction_heat_map,
+            members,
+            self.reaction_matrices.reactions,
+            title,
+            reaction_map_output,
+        )
 
         # Heat map for heart reactions
-        reaction_dict = {
-            name: stats.hearts_received_by_sender
-            for name, stats in self.member_stats.items()
-        }
         reaction_map_output = heatmap_dir / FileData.hearts_heatmap
         title = f"{self.config.chat_name} Hearts by Member"
-        reaction_heat_map(reaction_dict, title, reaction_map_output)
+        self.plot_pool.submit(
+            reaction_heat_map,
+            members,
+            self.reaction_matrices.hearts,
+            title,
+            reaction_map_output,
+        )
 
         # Heat map for dislike
-        reaction_dict = {
-            name: stats.dislikes_received_by_sender
-            for name, stats in self.member_stats.items()
-        }
         reaction_map_output = heatmap_dir / FileData.dislikes_heatmap
         title = f"{self.config.chat_name} Dislikes by Member"
-        reaction_heat_map(reaction_dict, title, reaction_map_output)
+        self.plot_pool.submit(
+            reaction_heat_map,
+            members,
+            self.reaction_matrices.dislikes,
+            title,
+            reaction_map_output,
+        )
 
     def keyword_plots(self):
         """Plot how frequently each keyword appeared"""
@@ -406,9 +1055,97 @@ class Analysis:
             return
         LOG.info(log_str)
         output_file = self.output_dir / FileData.chat_keywords
-        plot_keyword_occurances(self.keyword_map, output_file)
+        self.plot_pool.submit(plot_keyword_occurances, self.keyword_map, output_file)
 
     def chat_summary(self):
         """Create table with chat summary data"""
         LOG.info("Creating Chat Summary Table")
         chat_summary_table(self.chat_stats, self.output_dir)
+
+    def period_tables(self):
+        """Create tables of chat activity by day, week, month and year"""
+        LOG.info("Creating tables of chat activity over time")
+        period_dir = self.output_dir / FileData.period_folder
+        period_dir.mkdir(exist_ok=True)
+        for period in Period:
+            period_table(
+                self.period_stats,
+                period,
+                period_dir / FileData.period_table.format(period.value),
+            )
+
+    def monthly_plots(self):
+        """Plot monthly chat activity and keyword mentions"""
+        if self.period_stats.first_day is None:
+            LOG.warning("No messages to plot monthly activity of")
+            return
+        LOG.info("Plotting monthly chat activity")
+        period_dir = self.output_dir / FileData.period_folder
+        period_dir.mkdir(exist_ok=True)
+        months, totals = self.period_stats.aggregate(Period.MONTH)
+        self.plot_pool.submit(
+            plot_time_series,
+            months,
+            {name: totals[name].tolist() for name in ["messages", "likes", "words"]},
+            f"{self.config.chat_name}: Monthly Activity",
+            period_dir / FileData.monthly_activity,
+        )
+        if self.config.chat_keywords:
+            self.plot_pool.submit(
+                plot_time_series,
+                months,
+                {
+                    name: totals[keyword_series(name)].tolist()
+                    for name in self.period_stats.keywords
+                },
+                f"{self.config.chat_name}: Monthly Messages Including Each Keyword",
+                period_dir / FileData.monthly_keywords,
+            )
+
+    def activity_calendar(self):
+        """Plot the number of posts on each day of each year"""
+        if self.period_stats.first_day is None:
+            LOG.warning("No messages to plot an activity calendar of")
+            return
+        LOG.info("Plotting chat activity calendar")
+        period_dir = self.output_dir / FileData.period_folder
+        period_dir.mkdir(exist_ok=True)
+        years, counts = self.period_stats.day_of_year_counts()
+        self.plot_pool.submit(
+            calendar_heat_map,
+            years,
+            counts.tolist(),
+            f"{self.config.chat_name}'s Posts by Day of Year",
+            period_dir / FileData.activity_calendar,
+        )
+
+    def year_over_year(self):
+        """Create tables comparing the activity of each year"""
+        LOG.info("Creating year over year comparison tables")
+        period_dir = self.output_dir / FileData.period_folder
+        period_dir.mkdir(exist_ok=True)
+        year_over_year_tables(
+            self.period_stats,
+            period_dir / FileData.year_over_year,
+            period_dir / FileData.messages_by_month_and_year,
+        )
+
+
+def analyze_chunk(  # pylint: disable=too-many-arguments
+    analysis_config: AnalysisConfig,
+    chat_path: Path,
+    engine: AnalysisEngine,
+    id_to_names: dict[str, list[str]],
+    strict_validation: bool,
+    start: int,
+    end: int,
+) -> AnalysisResults:
+    """Aggregate the messages of `chat_path` between byte offsets `start` and `end`, with
+    the members of the whole chat, the posters of `id_to_names`"""
+    analysis = Analysis(
+        analysis_config, chat_path, engine, strict_validation=strict_validation
+    )
+    analysis.registry = MemberRegistry(id_to_names)
+    analysis.read_chat(start, end)
+    analysis.compute_member_stats()
+    return analysis.results()
@@ -0,0 +1,169 @@
+"""Analyze many chat archives on a pool of pre-warmed worker processes"""
+
+import io
+import logging
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.data_processing.plots import plt
+from py.data_processing.result_cache import ResultCache
+from py.models.analysis_config import AnalysisConfig
+from py.utils.logger import initialize_logger
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchJob:
+    """A chat archive to analyze with its analysis config, and how to analyze it"""
+
+    chat_path: Path
+    config: AnalysisConfig
+    engine: AnalysisEngine = AnalysisEngine.PYTHON
+    cache_dir: Path | None = None
+    cache_size: int = 512 * 2**20
+    incremental: bool = False
+    outputs: list[str] | None = None
+    force: bool = False
+    strict_validation: bool = False
+    chunk_size: int | None = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch job"""
+
+    chat_path: Path
+    output_folder: str
+    seconds: float = 0.0
+    messages: int = 0
+    stages: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def status(self) -> str:
+        """Status of the job, ok, skipped if it had no output to write or the error it
+        failed with"""
+        if self.error is not None:
+            return f"failed: {self.error}"
+        return "ok" if self.stages else "skipped"
+
+
+@dataclass
+class BatchSummary:
+    """Results of every job of a batch, in the order the jobs were listed"""
+
+    results: list[BatchResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        """Results of the jobs that failed"""
+        return [result for result in self.results if result.error is not None]
+
+    def table(self) -> str:
+        """Timing and status of each job as a text table"""
+        width = max([len(result.chat_path.name) for result in self.results] + [7])
+        lines = [f"{'archive':<{width}}{'messages':>10}{'seconds':>10}  status"]
+        lines += [
+            f"{result.chat_path.name:<{width}}{result.messages:>10}"
+            f"{result.seconds:>10.2f}  {result.status}"
+            for result in self.results
+        ]
+        lines.append(
+            f"{len(self.results) - len(self.failed)} of {len(self.results)} archives "
+            f"analyzed in {self.seconds:.2f} s"
+        )
+        return "\n".join(lines)
+
+
+def find_jobs(chat_dir: Path, config_dir: Path) -> list[tuple[Path, AnalysisConfig]]:
+    """Chat json archives in `chat_dir`, each with the config of the same name in
+    `config_dir`, or the default config named after the archive if there is none"""
+    jobs = []
+    for chat_path in sorted(chat_dir.glob("*.json")):
+        config_file = config_dir / chat_path.name
+        if config_file.exists():
+            config = AnalysisConfig.model_validate_json(
+                config_file.read_text(encoding="utf-8")
+            )
+        else:
+            LOG.warning("No analysis config for %s, using defaults", chat_path.name)
+            config = AnalysisConfig(chat_name=chat_path.stem)
+        jobs.append((chat_path, config))
+    folders = [config.output_folder for _, config in jobs]
+    shared = sorted({folder for folder in folders if folders.count(folder) > 1})
+    if shared:
+        raise ValueError(f"Archives would share the output folders {shared}")
+    return jobs
+
+
+def warm_worker(log_level: str):
+    """Initialize a worker process, so the first archive it analyzes does not pay for
+    imports, logging setup or loading fonts"""
+    if not logging.getLogger().handlers:
+        initialize_logger(log_level)
+    figure = plt.figure(figsize=(1, 1))
+    plt.title("warm")
+    figure.savefig(io.BytesIO())
+    plt.close(figure)
+
+
+def analyze_archive(job: BatchJob) -> BatchResult:
+    """Run the analysis of a batch job, catching its errors so the batch carries on"""
+    result = BatchResult(job.chat_path, job.config.output_folder)
+    start = time.perf_counter()
+    try:
+        analysis = Analysis(
+            job.config,
+            job.chat_path,
+            job.engine,
+            None if job.cache_dir is None else ResultCache(job.cache_dir, job.cache_size),
+            # Archives are analyzed in parallel, so each renders its own figures
+            plot_workers=1,
+            strict_validation=job.strict_validation,
+            chunk_size=job.chunk_size,
+        )
+        result.stages = analysis.analyze_chat(job.incremental, job.outputs, job.force)
+        result.messages = analysis.chat_stats.num_messages
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        LOG.exception("Analysis of %s failed", job.chat_path)
+        result.error = repr(e)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def analyze_batch(
+    jobs: list[BatchJob], workers: int | None = None, log_level: str = "INFO"
+) -> BatchSummary:
+    """Analyze `jobs` on `workers` processes, one per CPU if None
+
+    The largest archives are started first, so a long analysis does not start last
+    """
+    start = time.perf_counter()
+    order = sorted(
+        range(len(jobs)), key=lambda i: jobs[i].chat_path.stat().st_size, reverse=True
+    )
+    results: list[BatchResult | None] = [None] * len(jobs)
+    with ProcessPoolExecutor(
+        workers, initializer=warm_worker, initargs=(log_level,)
+    ) as executor:
+        futures: dict[Future, int] = {
+            executor.submit(analyze_archive, jobs[i]): i for i in order
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            LOG.info(
+                "Analyzed %s in %.2f s, %s",
+                result.chat_path.name,
+                result.seconds,
+                result.status,
+            )
+            results[futures[future]] = result
+    return BatchSummary(
+        [result for result in results if result is not None],
+        time.perf_counter() - start,
+    )
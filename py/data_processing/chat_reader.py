@@ -0,0 +1,156 @@
+"""Module to stream chat messages from an archive file"""
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator
+
+from py.models.message_template import ChatMessage, Message, MessageRecord
+
+READ_SIZE = 1 << 16
+SEPARATORS = re.compile(r"[\s,\[\]]*")
+
+
+def _iter_decoded(
+    chat_path: Path, start: int = 0, end: int | None = None
+) -> Iterator[tuple[dict[str, Any], str, int, int]]:
+    """Generator to decode the json messages in `chat_path` one at a time, optionally only
+    those between byte offsets `start` and `end`
+
+    Each message is yielded with the decoded text buffer it was read from, its end
+    position in the buffer and the byte offset of the start of the buffer, so offsets are
+    only encoded when needed. The file is read in fixed size blocks and each message object
+    is decoded directly from the block, so memory is bounded by the largest message rather
+    than the archive size
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(chat_path, "rb") as file:
+        file.seek(start)
+        remaining = None if end is None else end - start
+
+        def read_block() -> tuple[str, bool]:
+            """Read and decode the next block, and whether the end has been reached"""
+            nonlocal remaining
+            size = READ_SIZE if remaining is None else min(READ_SIZE, remaining)
+            data = file.read(size)
+            if remaining is not None:
+                remaining -= len(data)
+            return text_decoder.decode(data, final=not data), not data
+
+        buffer = ""
+        position = 0
+        offset = start
+        end_of_file = False
+        while True:
+            position = SEPARATORS.match(buffer, position).end()  # type: ignore
+            if position == len(buffer):
+                if end_of_file:
+                    return
+                offset += len(buffer.encode("utf-8"))
+                buffer, end_of_file = read_block()
+                position = 0
+                continue
+            try:
+                message, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Message is split across blocks, keep the partial message and read more
+                if end_of_file:
+                    raise
+                offset += len(buffer[:position].encode("utf-8"))
+                chunk, end_of_file = read_block()
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield message, buffer, position, offset
+
+
+def iter_message_dicts(
+    chat_path: Path, start: int = 0, end: int | None = None
+) -> Iterator[dict[str, Any]]:
+    """Generator to decode the json messages in `chat_path` one at a time, optionally only
+    those between byte offsets `start` and `end`, with memory bounded by the largest
+    message rather than the archive size"""
+    for message, _, _, _ in _iter_decoded(chat_path, start, end):
+        yield message
+
+
+def iter_message_ends(
+    chat_path: Path, every: int
+) -> Iterator[tuple[dict[str, Any], int | None]]:
+    """Generator to decode the json messages in `chat_path` one at a time, each with the
+    byte offset it ends at if it is the last of a run of `every` messages, else None"""
+    for count, (message, buffer, position, offset) in enumerate(
+        _iter_decoded(chat_path), 1
+    ):
+        if count % every:
+            yield message, None
+        else:
+            yield message, offset + len(buffer[:position].encode("utf-8"))
+
+
+def iter_message_starts(
+    chat_path: Path, start: int = 0, end: int | None = None
+) -> Iterator[tuple[dict[str, Any], int]]:
+    """Generator to decode the json messages in `chat_path` one at a time, optionally only
+    those between byte offsets `start` and `end`, each with the byte offset of the end of
+    the message before it, from which `read_message` decodes it again
+
+    Offsets are encoded incrementally, so each part of a block is encoded once
+    """
+    message_start = start
+    encoded: str | None = None
+    encoded_position = 0
+    for message, buffer, position, offset in _iter_decoded(chat_path, start, end):
+        yield message, message_start
+        if buffer is not encoded:
+            encoded, encoded_position, message_start = buffer, 0, offset
+        message_start += len(buffer[encoded_position:position].encode("utf-8"))
+        encoded_position = position
+
+
+def read_message(chat_path: Path, offset: int) -> dict[str, Any]:
+    """Decode the first json message after byte offset `offset` of `chat_path`"""
+    return next(iter_message_dicts(chat_path, offset))
+
+
+def is_json_array(chat_path: Path) -> bool:
+    """Whether `chat_path` is a json array of messages rather than one message per line"""
+    with open(chat_path, encoding="utf-8") as file:
+        while chunk := file.read(READ_SIZE):
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith("[")
+    return False
+
+
+class ChatArchive:
+    """Re-iterable view of the messages in a chat archive, each pass streams from disk
+
+    Messages are decoded into `MessageRecord`s holding the fields used by analysis, or
+    validated as `ChatMessage`s if `strict`
+    """
+
+    def __init__(
+        self,
+        chat_path: Path,
+        start: int = 0,
+        end: int | None = None,
+        strict: bool = False,
+    ):
+        self.chat_path = chat_path
+        self.start = start
+        self.end = end
+        self.strict = strict
+
+    def __iter__(self) -> Iterator[Message]:
+        decode = ChatMessage.model_validate if self.strict else MessageRecord
+        for message in iter_message_dicts(self.chat_path, self.start, self.end):
+            yield decode(message)
+
+    def with_offsets(self) -> Iterator[tuple[Message, int]]:
+        """Messages, each with the byte offset `read_message` decodes it again from"""
+        decode = ChatMessage.model_validate if self.strict else MessageRecord
+        for message, offset in iter_message_starts(self.chat_path, self.start, self.end):
+            yield decode(message), offset
@@ -0,0 +1,70 @@
+"""Split a chat archive into chunks of messages that are analyzed separately"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+from py.data_processing.chat_reader import iter_message_ends
+from py.data_processing.member_registry import MemberRegistry
+from py.models.analysis_results import AnalysisResults
+
+
+@dataclass
+class ArchiveChunks:
+    """Byte ranges of the chunks of a chat archive, with every name its posters used"""
+
+    # Byte offset of the start of each chunk, then of the end of the last chunk
+    offsets: list[int]
+    # Every name of each user who posted, oldest first
+    id_to_names: dict[str, list[str]]
+
+    @classmethod
+    def scan(cls, chat_path: Path, chunk_size: int) -> "ArchiveChunks":
+        """Find the chunks of `chat_path` of `chunk_size` messages and collect the names
+        of its posters, decoding one message at a time"""
+        registry = MemberRegistry()
+        offsets = [0]
+        count = 0
+        for count, (message, end) in enumerate(
+            iter_message_ends(chat_path, chunk_size), 1
+        ):
+            registry.observe_poster(message["user_id"], message["name"])
+            if end is not None:
+                offsets.append(end)
+        if count % chunk_size:
+            offsets.append(chat_path.stat().st_size)
+        return cls(offsets, registry.id_to_names)
+
+    @property
+    def ranges(self) -> list[tuple[int, int]]:
+        """Start and end byte offsets of each chunk"""
+        return list(zip(self.offsets, self.offsets[1:]))
+
+
+def map_chunks(
+    analyze: Callable[[int, int], AnalysisResults],
+    ranges: list[tuple[int, int]],
+    workers: int | None = 1,
+) -> Iterator[AnalysisResults]:
+    """Results of `analyze(start, end)` for each chunk, in archive order, on a pool of
+    `workers` processes, one per CPU if None
+
+    With a single worker chunks are analyzed one after the other in this process
+    """
+    if workers == 1:
+        for start, end in ranges:
+            yield analyze(start, end)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(analyze, *zip(*ranges))
+
+
+def reduce_chunks(
+    reduced: AnalysisResults, results: Iterator[AnalysisResults], num_messages_rank: int
+) -> AnalysisResults:
+    """Merge the results of each chunk, in archive order, into `reduced`, the empty
+    results of the whole archive"""
+    for chunk_results in results:
+        reduced.merge(chunk_results, num_messages_rank)
+    return reduced
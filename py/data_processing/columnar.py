@@ -0,0 +1,367 @@
+"""Columnar message store and vectorized member stats engine"""
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Iterable, Iterator, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from py.data_processing.keyword_matcher import KeywordMatcher
+from py.models.analysis_config import ChatKeywords
+from py.models.chat_stats import ChatStats
+from py.models.member_stats import MemberStats
+from py.models.period_stats import PeriodStats
+from py.models.reaction_matrices import CountMatrix, ReactionMatrices
+from py.models.message_template import AttachmentType, Message, LIKES, DISLIKES
+from py.utils.time_buckets import TimeBuckets, month_labels
+
+class ReactionKind(IntEnum):
+    """Reaction codes counted by the analysis"""
+
+    OTHER = 0
+    LIKE = 1
+    DISLIKE = 2
+
+    @classmethod
+    def from_code(cls, code: str) -> "ReactionKind":
+        """Classify a reaction code"""
+        if code in LIKES:
+            return cls.LIKE
+        if code in DISLIKES:
+            return cls.DISLIKE
+        return cls.OTHER
+
+
+def _intern(table: dict[str, int], value: str) -> int:
+    """Return the index of `value` in `table`, adding it if not present"""
+    return table.setdefault(value, len(table))
+
+
+@dataclass
+class ChatColumns:  # pylint: disable=too-many-instance-attributes
+    """Chat archive stored as column arrays, user ids and names are interned to indices
+
+    Message columns are indexed by message position in the archive. Favorites are exploded
+    to one row per (message, reacter), reactions to one row per reaction group and one row
+    per (reaction group, reacter), all in archive order
+    """
+
+    user_ids: list[str]
+    names: list[str]
+
+    # Message columns
+    message_id: np.ndarray
+    created_at: np.ndarray
+    poster: np.ndarray
+    poster_name: np.ndarray
+    word_count: np.ndarray
+    images: np.ndarray
+    polls: np.ndarray
+    has_reactions: np.ndarray
+    texts: Sequence[str | None]
+    image_urls: Sequence[str | None]
+
+    # Favorites, one row per reacter
+    favorite_message: np.ndarray
+    favorite_user: np.ndarray
+
+    # Reactions, one row per reaction group and one row per reacter in each group
+    group_message: np.ndarray
+    group_kind: np.ndarray
+    reaction_group: np.ndarray
+    reaction_user: np.ndarray
+
+    @property
+    def num_messages(self) -> int:
+        """Number of messages in the archive"""
+        return len(self.created_at)
+
+    def posters(self) -> Iterator[tuple[str, str]]:
+        """Iterate through the distinct (user id, name) pairs of posters, in the order
+        they first posted"""
+        pairs = self.poster.astype(np.int64) * max(len(self.names), 1) + self.poster_name
+        _, first = np.unique(pairs, return_index=True)
+        first.sort()
+        for user, name in zip(
+            self.poster[first].tolist(), self.poster_name[first].tolist()
+        ):
+            yield self.user_ids[user], self.names[name]
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Message]) -> "ChatColumns":
+        """Convert chat messages to columns in a single pass"""
+        # pylint: disable=too-many-locals
+        user_table: dict[str, int] = {}
+        name_table: dict[str, int] = {}
+        message_id: list[int] = []
+        created_at: list[int] = []
+        poster: list[int] = []
+        poster_name: list[int] = []
+        word_count: list[int] = []
+        images: list[int] = []
+        polls: list[int] = []
+        has_reactions: list[bool] = []
+        texts: list[str | None] = []
+        image_urls: list[str | None] = []
+        favorite_message: list[int] = []
+        favorite_user: list[int] = []
+        group_message: list[int] = []
+        group_kind: list[int] = []
+        reaction_group: list[int] = []
+        reaction_user: list[int] = []
+
+        for index, message in enumerate(messages):
+            message_id.append(message.id)
+            created_at.append(message.created_at)
+            poster.append(_intern(user_table, message.user_id))
+            poster_name.append(_intern(name_table, message.name))
+            texts.append(message.text)
+            word_count.append(
+                0 if message.text is None else len(message.text.split(" "))
+            )
+
+            image_url: str | None = None
+            num_images = 0
+            num_polls = 0
+            for attachment in message.attachments:
+                if attachment.type == AttachmentType.POLL:
+                    num_polls += 1
+                elif attachment.type == AttachmentType.IMAGE:
+                    if num_images == 0:
+                        image_url = attachment.url
+                    num_images += 1
+            images.append(num_images)
+            polls.append(num_polls)
+            image_urls.append(image_url)
+
+            for reacter in message.favorited_by:
+                favorite_message.append(index)
+                favorite_user.append(_intern(user_table, reacter))
+
+            has_reactions.append(message.reactions is not None)
+            for reaction in message.reactions or []:
+                group = len(group_message)
+                group_message.append(index)
+                group_kind.append(ReactionKind.from_code(reaction.code))
+                for reacter in reaction.user_ids:
+                    reaction_group.append(group)
+                    reaction_user.append(_intern(user_table, reacter))
+
+        return cls(
+            user_ids=list(user_table),
+            names=list(name_table),
+            message_id=np.array(message_id, dtype=np.int64),
+            created_at=np.array(created_at, dtype=np.int64),
+            poster=np.array(poster, dtype=np.int32),
+            poster_name=np.array(poster_name, dtype=np.int32),
+            word_count=np.array(word_count, dtype=np.int32),
+            images=np.array(images, dtype=np.int32),
+            polls=np.array(polls, dtype=np.int32),
+            has_reactions=np.array(has_reactions, dtype=bool),
+            texts=texts,
+            image_urls=image_urls,
+            favorite_message=np.array(favorite_message, dtype=np.int32),
+            favorite_user=np.array(favorite_user, dtype=np.int32),
+            group_message=np.array(group_message, dtype=np.int32),
+            group_kind=np.array(group_kind, dtype=np.int8),
+            reaction_group=np.array(reaction_group, dtype=np.int32),
+            reaction_user=np.array(reaction_user, dtype=np.int32),
+        )
+
+
+class ColumnarStats:  # pylint: disable=too-many-instance-attributes
+    """Compute member and chat stats from `ChatColumns` with array operations
+
+    `member_of_user` maps each interned user id to its member index, or -1 for users who
+    are not chat members. Messages posted by non-members are not counted, and reactions
+    given by non-members are dropped one at a time, as in the python engine. Post times
+    are bucketed in `zone`, or the local time zone if None
+    """
+
+    def __init__(
+        self,
+        columns: ChatColumns,
+        member_of_user: np.ndarray,
+        member_names: list[str],
+        zone: ZoneInfo | None,
+    ):
+        self.columns = columns
+        self.member_names = member_names
+        self.buckets = TimeBuckets.from_timestamps(columns.created_at, zone)
+
+        # Messages made by members
+        self.poster = member_of_user[columns.poster]
+        self.valid = self.poster >= 0
+
+        # Favorites given by members to members
+        self.favorite_reacter = member_of_user[columns.favorite_user]
+        self.favorite_applied = self.valid[columns.favorite_message] & (
+            self.favorite_reacter >= 0
+        )
+
+        # Likes and dislikes given by members to members
+        self.reaction_message = columns.group_message[columns.reaction_group]
+        self.reaction_kind = columns.group_kind[columns.reaction_group]
+        self.reaction_reacter = member_of_user[columns.reaction_user]
+        self.reaction_applied = (
+            (self.reaction_kind != ReactionKind.OTHER)
+            & self.valid[self.reaction_message]
+            & (self.reaction_reacter >= 0)
+        )
+        self.like_rows = np.flatnonzero(
+            self.reaction_applied & (self.reaction_kind == ReactionKind.LIKE)
+        )
+
+        # Keyword index and message of each keyword found in a member's message
+        self.hits: tuple[np.ndarray, np.ndarray] | None = None
+
+    def _count(self, members: np.ndarray, weights: np.ndarray | None = None) -> list[int]:
+        """Count occurances of each member index, optionally weighted"""
+        counts = np.bincount(members, weights=weights, minlength=len(self.member_names))
+        return counts.astype(np.int64).tolist()
+
+    def _matrix(self, receivers: np.ndarray, givers: np.ndarray) -> CountMatrix:
+        """Count (receiver, giver) member index pairs into a sparse matrix"""
+        return CountMatrix.from_pairs(receivers, givers, len(self.member_names))
+
+    def fill_stats(
+        self,
+        member_stats: dict[str, MemberStats],
+        chat_stats: ChatStats,
+        reaction_matrices: ReactionMatrices,
+    ):
+        """Populate `member_stats`, `chat_stats` and `reaction_matrices` from the
+        columns"""
+        # pylint: disable=too-many-locals
+        columns = self.columns
+        valid = self.valid
+        poster = self.poster[valid]
+        favorite_poster = self.poster[columns.favorite_message[self.favorite_applied]]
+        favorite_reacter = self.favorite_reacter[self.favorite_applied]
+
+        dislike_groups = self.valid[columns.group_message] & (
+            columns.group_kind == ReactionKind.DISLIKE
+        )
+        dislike_rows = self.reaction_applied & (
+            self.reaction_kind == ReactionKind.DISLIKE
+        )
+        like_poster = self.poster[self.reaction_message[self.like_rows]]
+        like_reacter = self.reaction_reacter[self.like_rows]
+        dislike_poster = self.poster[self.reaction_message[dislike_rows]]
+        dislike_reacter = self.reaction_reacter[dislike_rows]
+
+        messages_sent = self._count(poster)
+        images_sent = self._count(poster, columns.images[valid])
+        polls_made = self._count(poster, columns.polls[valid])
+        word_count = self._count(poster, columns.word_count[valid])
+        reactions_received = self._count(favorite_poster)
+        reactions_given = self._count(favorite_reacter)
+        hearts_received = self._count(like_poster)
+        hearts_given = self._count(like_reacter)
+        dislikes_received = self._count(
+            self.poster[columns.group_message[dislike_groups]]
+        )
+        dislikes_given = self._count(dislike_reacter)
+        reaction_matrices.reactions = self._matrix(favorite_poster, favorite_reacter)
+        reaction_matrices.hearts = self._matrix(like_poster, like_reacter)
+        reaction_matrices.dislikes = self._matrix(dislike_poster, dislike_reacter)
+
+        posts_by_day_and_hour = self.buckets.day_and_hour_counts(
+            self.poster, len(self.member_names)
+        )
+
+        for i, stats in enumerate(member_stats.values()):
+            stats.messages_sent = messages_sent[i]
+            stats.images_sent = images_sent[i]
+            stats.polls_made = polls_made[i]
+            stats.word_count = word_count[i]
+            stats.reactions_received = reactions_received[i]
+            stats.reactions_given = reactions_given[i]
+            stats.hearts_received = hearts_received[i]
+            stats.hearts_given = hearts_given[i]
+            stats.dislikes_received = dislikes_received[i]
+            stats.dislikes_given = dislikes_given[i]
+            stats.set_post_times(posts_by_day_and_hour[i])
+
+        chat_stats.num_messages = int(valid.sum())
+        chat_stats.total_image_attachments = int(columns.images[valid].sum())
+        chat_stats.total_polls = int(columns.polls[valid].sum())
+        chat_stats.average_word_count = float(columns.word_count[valid].sum())
+        chat_stats.total_reactions = len(favorite_reacter)
+        chat_stats.total_likes = len(like_reacter)
+        chat_stats.total_dislikes = len(dislike_reacter)
+
+    def keyword_hits(self, matcher: KeywordMatcher) -> tuple[np.ndarray, np.ndarray]:
+        """Keyword index and message of each keyword found in a member's message, each
+        message text is only matched once"""
+        if self.hits is None:
+            hit_keywords: list[int] = []
+            hit_messages: list[int] = []
+            for message in np.flatnonzero(self.valid).tolist():
+                for keyword in matcher.matches(self.columns.texts[message]):
+                    hit_keywords.append(keyword)
+                    hit_messages.append(message)
+            self.hits = (
+                np.array(hit_keywords, dtype=np.int64),
+                np.array(hit_messages, dtype=np.int64),
+            )
+        return self.hits
+
+    def fill_keywords(
+        self,
+        keyword_map: dict[str, dict[str, int]],
+        keywords: list[ChatKeywords],
+        matcher: KeywordMatcher,
+    ):
+        """Count the messages of each member that contain each keyword"""
+        hit_keywords, hit_messages = self.keyword_hits(matcher)
+        size = len(self.member_names)
+        counts = np.bincount(
+            hit_keywords * size + self.poster[hit_messages],
+            minlength=len(keywords) * size,
+        ).reshape(len(keywords), size)
+        for keyword, keyword_counts in zip(keywords, counts.tolist()):
+            for name, count in zip(self.member_names, keyword_counts):
+                keyword_map[keyword.name][name] += count
+
+    def period_stats(
+        self, keywords: list[ChatKeywords], matcher: KeywordMatcher
+    ) -> PeriodStats:
+        """Daily messages, likes, words and keywords of members"""
+        day = self.buckets.day
+        hit_keywords, hit_messages = (
+            self.keyword_hits(matcher)
+            if keywords
+            else (np.zeros(0, np.int64), np.zeros(0, np.int64))
+        )
+        return PeriodStats.from_days(
+            day[self.valid],
+            self.columns.word_count[self.valid],
+            day[self.reaction_message[self.like_rows]],
+            [keyword.name for keyword in keywords],
+            hit_keywords,
+            day[hit_messages],
+        )
+
+    def superlative_candidates(self) -> Iterator[tuple[int, int, str]]:
+        """Iterate through messages eligible for top messages, with their number of likes
+        and month"""
+        likes = np.bincount(
+            self.reaction_message[self.like_rows], minlength=self.columns.num_messages
+        )
+        messages = np.flatnonzero(self.valid & self.columns.has_reactions)
+        return zip(
+            messages.tolist(),
+            likes[messages].tolist(),
+            month_labels(self.buckets.month[messages]),
+        )
+
+    def likers(self, message: int) -> list[str]:
+        """Names of the members who liked `message`"""
+        like_messages = self.reaction_message[self.like_rows]
+        start, stop = np.searchsorted(like_messages, [message, message + 1])
+        return [
+            self.member_names[reacter]
+            for reacter in self.reaction_reacter[self.like_rows[start:stop]].tolist()
+        ]
@@ -0,0 +1,234 @@
+"""Compressed, chunked binary archive of `ChatColumns`, loaded with a memory map
+
+File layout: a magic header, one zlib compressed block per column chunk, a json index of
+block offsets and dtypes, then the index length and the magic again. String columns are
+stored as three columns: utf-8 data, offsets into the data and a null mask. Numeric columns
+are decompressed as they are loaded, string columns are decoded one chunk at a time when a
+value is accessed
+"""
+
+import json
+import mmap
+import operator
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, Self, Sequence
+
+import numpy as np
+
+from py.data_processing.chat_reader import ChatArchive
+from py.data_processing.columnar import ChatColumns
+
+MAGIC = b"GMWCOL1\n"
+FOOTER = struct.Struct("<Q")
+VERSION = 1
+CHUNK_SIZE = 65536
+
+# Columns stored as numeric arrays
+NUMERIC_COLUMNS = [
+    "message_id",
+    "created_at",
+    "poster",
+    "poster_name",
+    "word_count",
+    "images",
+    "polls",
+    "has_reactions",
+    "favorite_message",
+    "favorite_user",
+    "group_message",
+    "group_kind",
+    "reaction_group",
+    "reaction_user",
+]
+# Columns stored as strings, chunked with the messages
+STRING_COLUMNS = ["texts", "image_urls"]
+# Interned string tables
+STRING_TABLES = ["user_ids", "names"]
+
+
+class ArchiveWriter:
+    """Write compressed column chunks and their index"""
+
+    def __init__(self, file: Any, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.index: dict[str, dict[str, Any]] = {}
+        file.write(MAGIC)
+
+    def write_column(self, name: str, array: np.ndarray):
+        """Write `array` as compressed chunks of `chunk_size` rows"""
+        chunks = []
+        for start in range(0, max(len(array), 1), self.chunk_size):
+            chunk = np.ascontiguousarray(array[start : start + self.chunk_size])
+            chunks.append(self.write_block(chunk))
+        self.index[name] = {"dtype": array.dtype.str, "chunks": chunks}
+
+    def write_strings(self, name: str, values: Sequence[str | None]):
+        """Write strings as utf-8 data, offset and null mask columns chunked by row"""
+        columns: dict[str, list[list[int]]] = {"data": [], "offsets": [], "null": []}
+        for start in range(0, max(len(values), 1), self.chunk_size):
+            chunk = values[start : start + self.chunk_size]
+            encoded = [b"" if value is None else value.encode("utf-8") for value in chunk]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+            null = np.array([value is None for value in chunk], dtype=bool)
+            columns["data"].append(
+                self.write_block(np.frombuffer(b"".join(encoded), dtype=np.uint8))
+            )
+            columns["offsets"].append(self.write_block(offsets))
+            columns["null"].append(self.write_block(null))
+        for part, chunks in columns.items():
+            dtype = {"data": np.uint8, "offsets": np.int64, "null": np.bool_}[part]
+            self.index[f"{name}.{part}"] = {
+                "dtype": np.dtype(dtype).str,
+                "chunks": chunks,
+            }
+
+    def write_block(self, array: np.ndarray) -> list[int]:
+        """Write a compressed block, return its offset, compressed length and row count"""
+        data = zlib.compress(array.tobytes())
+        offset = self.file.tell()
+        self.file.write(data)
+        return [offset, len(data), len(array)]
+
+    def close(self, header: dict[str, Any]):
+        """Write the index after the column blocks"""
+        index = json.dumps({**header, "columns": self.index}).encode("utf-8")
+        self.file.write(index)
+        self.file.write(FOOTER.pack(len(index)))
+        self.file.write(MAGIC)
+
+
+def write_columnar_archive(
+    columns: ChatColumns, archive_path: Path, chunk_size: int = CHUNK_SIZE
+):
+    """Write `columns` to a binary columnar archive at `archive_path`"""
+    temporary_file = archive_path.with_suffix(".tmp")
+    with open(temporary_file, "wb") as file:
+        writer = ArchiveWriter(file, chunk_size)
+        for name in NUMERIC_COLUMNS:
+            writer.write_column(name, getattr(columns, name))
+        for name in STRING_COLUMNS + STRING_TABLES:
+            writer.write_strings(name, getattr(columns, name))
+        writer.close(
+            {
+                "version": VERSION,
+                "chunk_size": chunk_size,
+                "num_messages": columns.num_messages,
+            }
+        )
+    temporary_file.replace(archive_path)
+
+
+def convert_chat(chat_path: Path, archive_path: Path, chunk_size: int = CHUNK_SIZE):
+    """Convert the json chat at `chat_path` to a binary columnar archive"""
+    columns = ChatColumns.from_messages(ChatArchive(chat_path))
+    write_columnar_archive(columns, archive_path, chunk_size)
+
+
+class StringColumn(Sequence[str | None]):
+    """Lazily decoded string column, chunks are decompressed when a value is accessed"""
+
+    def __init__(self, archive: "ColumnarArchive", name: str):
+        self.archive = archive
+        self.name = name
+        self.chunk_size: int = archive.index["chunk_size"]
+        self.length = sum(
+            chunk[2] for chunk in archive.index["columns"][f"{name}.null"]["chunks"]
+        )
+        self.cached_chunk = -1
+        self.cached: list[str | None] = []
+
+    def __len__(self) -> int:
+        return self.length
+
+    def chunk(self, chunk: int) -> list[str | None]:
+        """Decode every string in chunk number `chunk`"""
+        if chunk != self.cached_chunk:
+            data = self.archive.block(f"{self.name}.data", chunk).tobytes()
+            offsets = self.archive.block(f"{self.name}.offsets", chunk).tolist()
+            null = self.archive.block(f"{self.name}.null", chunk).tolist()
+            self.cached = [
+                None if null[i] else data[offsets[i] : offsets[i + 1]].decode("utf-8")
+                for i in range(len(null))
+            ]
+            self.cached_chunk = chunk
+        return self.cached
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        index = operator.index(index)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f"{self.name} index {index} out of range")
+        return self.chunk(index // self.chunk_size)[index % self.chunk_size]
+
+    def __iter__(self) -> Iterator[str | None]:
+        for chunk in range(-(-self.length // self.chunk_size)):
+            yield from self.chunk(chunk)
+
+
+class ColumnarArchive:
+    """Memory mapped binary columnar archive"""
+
+    def __init__(self, archive_path: Path):
+        self.archive_path = archive_path
+        self.file = open(archive_path, "rb")  # pylint: disable=consider-using-with
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise
+        footer_start = len(self.map) - len(MAGIC) - FOOTER.size
+        if (
+            self.map[: len(MAGIC)] != MAGIC
+            or self.map[footer_start + FOOTER.size :] != MAGIC
+        ):
+            self.close()
+            raise ValueError(f"{archive_path} is not a columnar chat archive")
+        (index_length,) = FOOTER.unpack(self.map[footer_start : footer_start + FOOTER.size])
+        self.index: dict[str, Any] = json.loads(
+            self.map[footer_start - index_length : footer_start]
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Release the memory map and file"""
+        self.map.close()
+        self.file.close()
+
+    def block(self, name: str, chunk: int) -> np.ndarray:
+        """Decompress chunk number `chunk` of column `name`"""
+        column = self.index["columns"][name]
+        offset, length, _ = column["chunks"][chunk]
+        data = zlib.decompress(memoryview(self.map)[offset : offset + length])
+        return np.frombuffer(data, dtype=np.dtype(column["dtype"]))
+
+    def column(self, name: str) -> np.ndarray:
+        """Decompress every chunk of column `name`"""
+        chunks = self.index["columns"][name]["chunks"]
+        return np.concatenate([self.block(name, chunk) for chunk in range(len(chunks))])
+
+    def strings(self, name: str) -> StringColumn:
+        """Lazily decoded string column `name`"""
+        return StringColumn(self, name)
+
+    def load(self) -> ChatColumns:
+        """Load the archive as `ChatColumns`, string columns are decoded on access"""
+        numeric = {name: self.column(name) for name in NUMERIC_COLUMNS}
+        return ChatColumns(
+            user_ids=list(self.strings("user_ids")),  # type: ignore[arg-type]
+            names=list(self.strings("names")),  # type: ignore[arg-type]
+            texts=self.strings("texts"),
+            image_urls=self.strings("image_urls"),
+            **numeric,
+        )
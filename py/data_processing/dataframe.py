@@ -0,0 +1,367 @@
+"""DataFrame chat store and member stats engine built on pandas group by operations"""
+
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, Iterable, Iterator
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from py.data_processing.keyword_matcher import KeywordMatcher
+from py.data_processing.top_messages import RankedMessages
+from py.models.analysis_config import ChatKeywords
+from py.models.chat_stats import ChatStats
+from py.models.member_stats import MemberStats
+from py.models.message_superlative import MessageSuperlative
+from py.models.message_template import AttachmentType, Message, LIKES, DISLIKES
+from py.models.period_stats import PeriodStats
+from py.models.reaction_matrices import CountMatrix, ReactionMatrices
+from py.utils.time_buckets import TimeBuckets, month_labels
+from py.utils.utility import DAYS, HOURS
+
+
+def count_matrix(receivers: pd.Series, givers: pd.Series) -> CountMatrix:
+    """Count (receiver, giver) member index pairs into a sparse matrix"""
+    pairs = pd.DataFrame({"receiver": receivers.to_numpy(), "giver": givers.to_numpy()})
+    counts = pairs.groupby(["receiver", "giver"]).size()
+    matrix = CountMatrix()
+    for (receiver, giver), count in zip(counts.index.tolist(), counts.tolist()):
+        matrix.counts.setdefault(receiver, {})[giver] = count
+    return matrix
+
+
+@dataclass
+class ChatFrames:
+    """Chat archive stored as data frames
+
+    `messages` has one row per message, indexed by message position in the archive. Its
+    list fields are exploded into child frames, in archive order: `attachments` and
+    `favorites` have one row per attachment and per favoriting user, indexed by message
+    position. `reactions` has one row per reaction group, with the position of its message,
+    and `reacters` one row per user of each group, indexed by group
+    """
+
+    messages: pd.DataFrame
+    attachments: pd.DataFrame
+    favorites: pd.DataFrame
+    reactions: pd.DataFrame
+    reacters: pd.DataFrame
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Message]) -> "ChatFrames":
+        """Load chat messages into a frame and explode their list fields"""
+        columns = [
+            "message_id",
+            "created_at",
+            "user_id",
+            "name",
+            "text",
+            "attachments",
+            "favorited_by",
+            "reactions",
+        ]
+        rows = [
+            (
+                message.id,
+                message.created_at,
+                message.user_id,
+                message.name,
+                message.text,
+                message.attachments,
+                message.favorited_by,
+                message.reactions,
+            )
+            for message in messages
+        ]
+        # Columns are kept as python objects, so missing texts stay None
+        frame = pd.DataFrame(
+            {
+                column: pd.Series(values, dtype=object)
+                for column, values in zip(columns, zip(*rows) if rows else [[]] * len(columns))
+            }
+        ).astype({"message_id": np.int64, "created_at": np.int64})
+
+        attachments = frame["attachments"].explode().dropna()
+        groups = frame["reactions"].explode().dropna()
+        reactions = pd.DataFrame(
+            {
+                "message": groups.index.to_numpy(dtype=np.int64),
+                "code": groups.map(attrgetter("code")).to_numpy(dtype=object),
+            }
+        )
+        reacters = (
+            pd.Series(groups.map(attrgetter("user_ids")).to_numpy(dtype=object))
+            .explode()
+            .dropna()
+        )
+
+        frame["word_count"] = np.array(
+            [0 if text is None else len(text.split(" ")) for text in frame["text"]],
+            dtype=np.int64,
+        )
+        frame["has_reactions"] = frame["reactions"].notna()
+        return cls(
+            messages=frame.drop(columns=["attachments", "favorited_by", "reactions"]),
+            attachments=pd.DataFrame(
+                {
+                    "type": attachments.map(attrgetter("type")),
+                    "url": attachments.map(attrgetter("url")),
+                }
+            ),
+            favorites=frame["favorited_by"].explode().dropna().to_frame("user_id"),
+            reactions=reactions,
+            reacters=reacters.to_frame("user_id"),
+        )
+
+    @property
+    def num_messages(self) -> int:
+        """Number of messages in the archive"""
+        return len(self.messages)
+
+    def posters(self) -> Iterator[tuple[str, str]]:
+        """Iterate through the distinct (user id, name) pairs of posters, in the order
+        they first posted"""
+        pairs = self.messages[["user_id", "name"]].drop_duplicates()
+        return zip(pairs["user_id"].tolist(), pairs["name"].tolist())
+
+
+class DataFrameStats:  # pylint: disable=too-many-instance-attributes
+    """Compute member and chat stats from `ChatFrames` with group by operations
+
+    `member_of_id` maps each user id to its member index. Users missing from it are not
+    chat members. Messages posted by non-members are not counted, and reactions given by
+    non-members are dropped one at a time, as in the python engine. Post times are
+    bucketed in `zone`, or the local time zone if None
+    """
+
+    def __init__(
+        self,
+        frames: ChatFrames,
+        member_of_id: pd.Series,
+        member_names: list[str],
+        zone: ZoneInfo | None,
+    ):
+        self.frames = frames
+        self.member_of_id = member_of_id
+        self.member_names = member_names
+        messages = frames.messages
+        buckets = TimeBuckets.from_timestamps(messages["created_at"].to_numpy(), zone)
+
+        # Messages, with their poster's member index and local time buckets
+        self.messages = messages.assign(
+            poster=self.members(messages["user_id"]),
+            hour=buckets.hour,
+            weekday=buckets.weekday,
+            day=buckets.day,
+            month=buckets.month,
+        )
+        self.valid = self.messages["poster"] >= 0
+        self.posts = self.messages[self.valid]
+        poster = self.messages["poster"]
+
+        # Attachments of members' messages
+        attachments = frames.attachments.join(poster)
+        self.attachments = attachments[attachments["poster"] >= 0]
+
+        # Favorites given by members to members
+        favorites = frames.favorites.join(poster).assign(
+            reacter=lambda favorites: self.members(favorites["user_id"])
+        )
+        self.favorites = favorites[(favorites["poster"] >= 0) & (favorites["reacter"] >= 0)]
+
+        # Reaction groups of members' messages, and likes and dislikes given by members
+        reactions = frames.reactions.join(poster, on="message")
+        self.reactions = reactions[reactions["poster"] >= 0]
+        reacters = (
+            frames.reacters.join(self.reactions)
+            .dropna(subset=["poster"])
+            .astype({"message": np.int64, "poster": np.int64})
+            .assign(reacter=lambda reacters: self.members(reacters["user_id"]))
+        )
+        reacters = reacters[reacters["reacter"] >= 0]
+        self.likes = reacters[reacters["code"].isin(LIKES)]
+        self.dislikes = reacters[reacters["code"].isin(DISLIKES)]
+
+    def members(self, user_ids: pd.Series) -> pd.Series:
+        """Member index of each of `user_ids`, -1 for users who are not chat members"""
+        return user_ids.map(self.member_of_id).fillna(-1).astype(np.int64)
+
+    def _count(self, members: pd.Series, weights: pd.Series | None = None) -> list[int]:
+        """Count occurances of each member index, optionally weighted"""
+        counts = (
+            members.value_counts()
+            if weights is None
+            else weights.groupby(members.to_numpy()).sum()
+        )
+        return counts.reindex(range(len(self.member_names)), fill_value=0).tolist()
+
+    def fill_stats(
+        self,
+        member_stats: dict[str, MemberStats],
+        chat_stats: ChatStats,
+        reaction_matrices: ReactionMatrices,
+    ):
+        """Populate `member_stats`, `chat_stats` and `reaction_matrices` from the
+        frames"""
+        posts = self.posts
+        attachment_type = self.attachments["type"]
+        images = self.attachments[attachment_type == AttachmentType.IMAGE]
+        polls = self.attachments[attachment_type == AttachmentType.POLL]
+        dislike_groups = self.reactions[self.reactions["code"].isin(DISLIKES)]
+
+        messages_sent = self._count(posts["poster"])
+        images_sent = self._count(images["poster"])
+        polls_made = self._count(polls["poster"])
+        word_count = self._count(posts["poster"], posts["word_count"])
+        reactions_received = self._count(self.favorites["poster"])
+        reactions_given = self._count(self.favorites["reacter"])
+        hearts_received = self._count(self.likes["poster"])
+        hearts_given = self._count(self.likes["reacter"])
+        dislikes_received = self._count(dislike_groups["poster"])
+        dislikes_given = self._count(self.dislikes["reacter"])
+        reaction_matrices.reactions = count_matrix(
+            self.favorites["poster"], self.favorites["reacter"]
+        )
+        reaction_matrices.hearts = count_matrix(self.likes["poster"], self.likes["reacter"])
+        reaction_matrices.dislikes = count_matrix(
+            self.dislikes["poster"], self.dislikes["reacter"]
+        )
+
+        size = len(self.member_names)
+        posts_by_day_and_hour = (
+            posts.groupby(["poster", "weekday", "hour"])
+            .size()
+            .reindex(
+                pd.MultiIndex.from_product(
+                    [range(size), range(len(DAYS)), range(len(HOURS))],
+                    names=["poster", "weekday", "hour"],
+                ),
+                fill_value=0,
+            )
+            .to_numpy()
+            .reshape(size, len(DAYS), len(HOURS))
+        )
+
+        for i, stats in enumerate(member_stats.values()):
+            stats.messages_sent = messages_sent[i]
+            stats.images_sent = images_sent[i]
+            stats.polls_made = polls_made[i]
+            stats.word_count = word_count[i]
+            stats.reactions_received = reactions_received[i]
+            stats.reactions_given = reactions_given[i]
+            stats.hearts_received = hearts_received[i]
+            stats.hearts_given = hearts_given[i]
+            stats.dislikes_received = dislikes_received[i]
+            stats.dislikes_given = dislikes_given[i]
+            stats.set_post_times(posts_by_day_and_hour[i])
+
+        chat_stats.num_messages = len(posts)
+        chat_stats.total_image_attachments = len(images)
+        chat_stats.total_polls = len(polls)
+        chat_stats.average_word_count = float(posts["word_count"].sum())
+        chat_stats.total_reactions = len(self.favorites)
+        chat_stats.total_likes = len(self.likes)
+        chat_stats.total_dislikes = len(self.dislikes)
+
+    def keyword_hits(self, matcher: KeywordMatcher | None) -> pd.DataFrame:
+        """Keyword index of each keyword found in a member's message, indexed by message
+        position, with the message's poster and day, no hits if `matcher` is None"""
+        texts = self.posts["text"]
+        keywords = (
+            texts.map(matcher.matches) if matcher is not None else texts[:0]
+        ).explode().dropna()
+        return self.posts[["poster", "day"]].join(
+            keywords.astype(np.int64).rename("keyword"), how="inner"
+        )
+
+    def fill_keywords(
+        self,
+        keyword_map: dict[str, dict[str, int]],
+        keywords: list[ChatKeywords],
+        hits: pd.DataFrame,
+    ):
+        """Count the messages of each member that contain each keyword"""
+        counts = (
+            hits.groupby(["keyword", "poster"])
+            .size()
+            .unstack(fill_value=0)
+            .reindex(
+                index=range(len(keywords)),
+                columns=range(len(self.member_names)),
+                fill_value=0,
+            )
+        )
+        for keyword, keyword_counts in zip(keywords, counts.to_numpy().tolist()):
+            for name, count in zip(self.member_names, keyword_counts):
+                keyword_map[keyword.name][name] += count
+
+    def period_stats(
+        self, keywords: list[ChatKeywords], hits: pd.DataFrame
+    ) -> PeriodStats:
+        """Daily messages, likes, words and keywords of members"""
+        return PeriodStats.from_days(
+            self.posts["day"].to_numpy(dtype=np.int64),
+            self.posts["word_count"].to_numpy(),
+            self.messages["day"].to_numpy(dtype=np.int64)[self.likes["message"]],
+            [keyword.name for keyword in keywords],
+            hits["keyword"].to_numpy(dtype=np.int64),
+            hits["day"].to_numpy(dtype=np.int64),
+        )
+
+    def rank_messages(
+        self, k: int, superlative: Callable[..., MessageSuperlative]
+    ) -> RankedMessages:
+        """Most liked messages with reactions, overall, by member and by month, ties
+        broken by the higher message id
+
+        `superlative` builds a message's superlative from its poster, id, creation time,
+        text, first image url and likers
+        """
+        candidates = self.posts[self.posts["has_reactions"]].assign(
+            likes=self.likes.groupby("message").size(),
+            label=lambda candidates: month_labels(candidates["month"].to_numpy()),
+        )
+        ranked = candidates.fillna({"likes": 0}).sort_values(
+            ["likes", "message_id"], ascending=False
+        )
+        overall = ranked.head(k)
+        by_member = ranked.groupby("poster", sort=False).head(k)
+        by_month = ranked.groupby("label").head(k)
+
+        kept = pd.concat([overall, by_member, by_month])
+        kept = kept[~kept.index.duplicated()]
+        attachments = self.frames.attachments
+        images = attachments[attachments["type"] == AttachmentType.IMAGE]
+        image_url = images[~images.index.duplicated()]["url"]
+        likes = self.likes[self.likes["message"].isin(kept.index)]
+        likers = likes["reacter"].groupby(likes["message"].to_numpy()).agg(list)
+        built = {
+            message: superlative(
+                self.member_names[row.poster],
+                row.message_id,
+                row.created_at,
+                row.text,
+                image_url.get(message),
+                [self.member_names[reacter] for reacter in likers.get(message, [])],
+            )
+            for message, row in zip(kept.index.tolist(), kept.itertuples())
+        }
+
+        def superlatives(messages: pd.DataFrame) -> list[MessageSuperlative]:
+            return [built[message] for message in messages.index.tolist()]
+
+        # Members in the order of their first message with reactions
+        members = candidates["poster"].unique().tolist()
+        member_groups = dict(list(by_member.groupby("poster", sort=False)))
+        return (
+            superlatives(overall),
+            {
+                self.member_names[member]: superlatives(member_groups[member])
+                for member in members
+            },
+            {
+                month: superlatives(messages)
+                for month, messages in by_month.groupby("label", sort=True)
+            },
+        )
@@ -0,0 +1,102 @@
+"""Multi-pattern keyword matching with an Aho-Corasick automaton"""
+
+from collections import deque
+
+from py.models.analysis_config import ChatKeywords
+
+
+def is_word_character(character: str) -> bool:
+    """Whether `character` is part of a word, as in a regex `\\w`"""
+    return character.isalnum() or character == "_"
+
+
+class KeywordMatcher:
+    """Find which keywords of a config appear in a message, in a single pass
+
+    Every alias of every keyword is compiled once into an Aho-Corasick automaton, and a
+    message is scanned one character at a time. A keyword matches a message if any of its
+    aliases is a substring of the lowercased message text. Aliases of keywords with
+    `whole_word` set must also not be joined to the word characters around them
+    """
+
+    def __init__(self, keywords: list[ChatKeywords]):
+        self.num_keywords = len(keywords)
+        self.whole_word = [keyword.whole_word for keyword in keywords]
+        # Keywords with an empty alias, which is part of every text
+        self.always: set[int] = set()
+
+        # Trie of aliases; `outputs` holds the (alias length, keyword) pairs ending at a state
+        self.goto: list[dict[str, int]] = [{}]
+        self.outputs: list[list[tuple[int, int]]] = [[]]
+        for index, keyword in enumerate(keywords):
+            for alias in keyword.aliases:
+                if not alias:
+                    self.always.add(index)
+                    continue
+                state = 0
+                for character in alias:
+                    if character not in self.goto[state]:
+                        self.goto[state][character] = len(self.goto)
+                        self.goto.append({})
+                        self.outputs.append([])
+                    state = self.goto[state][character]
+                if (len(alias), index) not in self.outputs[state]:
+                    self.outputs[state].append((len(alias), index))
+        self.alphabet = {character for edges in self.goto for character in edges}
+
+        # Failure links, breadth first so the link of a state's parent is already set
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(character, 0)
+                self.outputs[child] = self.outputs[child] + [
+                    output
+                    for output in self.outputs[self.fail[child]]
+                    if output not in self.outputs[child]
+                ]
+
+    def bounded(self, text: str, start: int, end: int) -> bool:
+        """Whether `text[start:end]` does not continue a word on either side"""
+        if (
+            start > 0
+            and is_word_character(text[start])
+            and is_word_character(text[start - 1])
+        ):
+            return False
+        return not (
+            end < len(text)
+            and is_word_character(text[end - 1])
+            and is_word_character(text[end])
+        )
+
+    def matches(self, text: str | None) -> set[int]:
+        """Indices of the keywords that appear in `text`"""
+        if text is None:
+            return set()
+        text = text.lower()
+        found = set(self.always)
+        goto, fail, outputs, alphabet = self.goto, self.fail, self.outputs, self.alphabet
+        state = 0
+        for end, character in enumerate(text, 1):
+            if character not in alphabet:
+                state = 0
+                continue
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            for length, keyword in outputs[state]:
+                if keyword in found or (
+                    self.whole_word[keyword]
+                    and not self.bounded(text, end - length, end)
+                ):
+                    continue
+                found.add(keyword)
+                if len(found) == self.num_keywords:
+                    return found
+        return found
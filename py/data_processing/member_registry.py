@@ -0,0 +1,110 @@
+"""Registry of chat members, built while the chat is read"""
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from py.utils.utility import remove_unicode_characters
+
+# User ids of messages posted by GroupMe itself
+GROUPME_NAMES = ["system", "calendar"]
+
+
+def short_name(name: str) -> str:
+    """Name used for a member, their first name or James and their last initial"""
+    split_name = name.split(" ")
+    if "James" in name and len(split_name) > 1:
+        return "James " + split_name[-1][0]
+    return split_name[0]
+
+
+@dataclass
+class ResolvedMembers:
+    """Chat members, resolved once every message has been read"""
+
+    # Every name of each user who posted, oldest first
+    id_to_names: dict[str, list[str]]
+    # Current name of each user who posted
+    id_to_name: dict[str, str]
+    # Name of each chat member, in the order they first posted
+    chat_member_names: list[str]
+    # Member index of each interned user, -1 for users who are not chat members
+    member_of_user: np.ndarray
+
+
+class MemberRegistry:
+    """Intern user ids to small integers and collect the names users post under
+
+    Users are interned as messages are read, so stats can be accumulated by integer user
+    id in the same pass. Names are only resolved to members by `resolve`, once every
+    message has been seen
+    """
+
+    def __init__(self, id_to_names: dict[str, list[str]] | None = None):
+        self.user_ids: list[str] = []
+        self.user_index: dict[str, int] = {}
+        # Distinct names of each interned user, empty for users who have not posted
+        self.names: list[list[str]] = []
+        # Last raw name of each interned user, names are only shortened when they change
+        self.last_name: list[str | None] = []
+        # Users who posted, in the order they first posted
+        self.posters: list[int] = []
+        for user_id, names in (id_to_names or {}).items():
+            user = self.intern(user_id)
+            self.names[user] = list(names)
+            self.posters.append(user)
+
+    def intern(self, user_id: str) -> int:
+        """Integer id of `user_id`, interning it if it has not been seen"""
+        user = self.user_index.get(user_id)
+        if user is None:
+            user = self.user_index[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.names.append([])
+            self.last_name.append(None)
+        return user
+
+    def intern_all(self, user_ids: Iterable[str]) -> np.ndarray:
+        """Integer ids of each of `user_ids`"""
+        return np.array([self.intern(user_id) for user_id in user_ids], dtype=np.int64)
+
+    def observe_poster(self, user_id: str, name: str) -> int:
+        """Record that `user_id` posted as `name`, return their integer id"""
+        user = self.intern(user_id)
+        if name != self.last_name[user]:
+            self.last_name[user] = name
+            if user_id not in GROUPME_NAMES:
+                names = self.names[user]
+                if not names:
+                    self.posters.append(user)
+                name = short_name(name)
+                if name not in names:
+                    names.append(name)
+        return user
+
+    @property
+    def id_to_names(self) -> dict[str, list[str]]:
+        """Every name of each user who posted, oldest first"""
+        return {self.user_ids[user]: self.names[user] for user in self.posters}
+
+    def resolve(self, exclude_copilot: bool) -> ResolvedMembers:
+        """Resolve users to chat members by their most recent name"""
+        id_to_name = {
+            self.user_ids[user]: remove_unicode_characters(self.names[user][-1])
+            for user in self.posters
+        }
+        chat_member_names = [
+            name
+            for name in id_to_name.values()
+            if not (name == "Copilot" and exclude_copilot)
+        ]
+        member_index: dict[str, int] = {}
+        for name in chat_member_names:
+            member_index.setdefault(name, len(member_index))
+        member_of_user = np.full(len(self.user_ids), -1, dtype=np.int64)
+        for user in self.posters:
+            member_of_user[user] = member_index.get(id_to_name[self.user_ids[user]], -1)
+        return ResolvedMembers(
+            self.id_to_names, id_to_name, chat_member_names, member_of_user
+        )
@@ -1,29 +1,87 @@
 """Module for to create plots for analysis"""
 
+import logging
+import tracemalloc
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Self
 
+import matplotlib
+
+# Figures are only saved to files, so render without a display in every process
+matplotlib.use("Agg")
+
+# pylint: disable=wrong-import-position
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns  # type: ignore
 
+from py.models.period_stats import MONTH_STARTS, MONTHS
+from py.models.reaction_matrices import CountMatrix
+from py.utils.utility import DAYS, HOURS
+
+LOG = logging.getLogger(__name__)
+
+
+class PlotPool:
+    """Render figures on a pool of `workers` processes, one per CPU if None
+
+    Plot functions are submitted with precomputed data and rendered in the background.
+    With a single worker figures are rendered as they are submitted. Leaving the
+    context waits for every figure and raises the first rendering error
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers
+        self.executor: ProcessPoolExecutor | None = None
+        self.futures: list[Future] = []
+        # Number of figures submitted
+        self.submitted = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, *_):
+        self.close(cancel=exc_type is not None)
+
+    def submit(self, plot: Callable[..., None], *args: Any):
+        """Render `plot(*args)`, in a worker process if the pool has several"""
+        self.submitted += 1
+        if self.workers == 1:
+            plot(*args)
+            return
+        if self.executor is None:
+            # Workers do not keep tracing memory allocations if the pool is profiled
+            self.executor = ProcessPoolExecutor(
+                self.workers, initializer=tracemalloc.stop
+            )
+        self.futures.append(self.executor.submit(plot, *args))
+
+    def close(self, cancel: bool = False):
+        """Wait for submitted figures, or cancel those not started, and stop the workers"""
+        if self.executor is None:
+            return
+        LOG.debug("Waiting for %d figures to render", len(self.futures))
+        self.executor.shutdown(wait=True, cancel_futures=cancel)
+        futures, self.futures, self.executor = self.futures, [], None
+        if not cancel:
+            for future in futures:
+                future.result()
+
 
 def reaction_heat_map(
-    reaction_dict: dict[str, dict[str, int]], plot_title: str, output_file: Path
+    members: list[str], reactions: CountMatrix, plot_title: str, output_file: Path
 ):
-    """Create heat map of feactions"""
+    """Create heat map of feactions, `reactions` indexed by receiving then giving member"""
 
-    member_received = list(reaction_dict.keys()) + ["Total reactions given"]
-    member_given = list(reaction_dict.keys()) + ["Total reactions received"]
+    member_received = members + ["Total reactions given"]
+    member_given = members + ["Total reactions received"]
 
     # Fill numpy 2D array
     reaction_table = np.zeros(
         shape=(len(member_received), len(member_given)), dtype=int
     )
-    for receiver, reactions in reaction_dict.items():
-        for reacter, total in reactions.items():
-            reaction_table[member_received.index(receiver)][
-                member_received.index(reacter)
-            ] = total
+    reaction_table[:-1, :-1] = reactions.dense(len(members))
     total_table = np.zeros(shape=(len(member_received), len(member_given)), dtype=int)
     total_table[-1] = np.sum(reaction_table, axis=0)
     total_table[:, -1] = np.sum(reaction_table, axis=1)
@@ -64,16 +122,42 @@ def reaction_heat_map(
     plt.close()
 
 
+def activity_heat_map(counts: list[list[int]], plot_title: str, output_file: Path):
+    """Create heat map of posts, `counts` indexed by day of the week then hour"""
+    _, ax = plt.subplots(figsize=(14, 10))
+    sns.heatmap(
+        data=np.array(counts),
+        annot=True,
+        ax=ax,
+        cmap=sns.color_palette("rocket_r", as_cmap=True),
+        fmt="g",
+        xticklabels=HOURS,
+        yticklabels=DAYS,
+    )
+    ax.collections[0].colorbar.set_label(  # type: ignore
+        "Number of messages", fontsize=15
+    )
+    ax.set_xticklabels(HOURS, rotation=45, ha="right", rotation_mode="anchor")
+    ax.tick_params(axis="both", labelsize=10)
+    ax.set_title(plot_title, fontsize=20)
+    ax.set_ylabel("Day of Week", fontsize=15)
+    ax.set_xlabel("Hour", fontsize=15)
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close()
+
+
 def histograms(
-    dataset: int, labels: list[str], title: str, x_label: str, output_file: Path
+    counts: list[int], labels: list[str], title: str, x_label: str, output_file: Path
 ):
-    """Create a histogram from integers in `dataset`"""
+    """Create a histogram from `counts`, the number of values in each bin of `labels`"""
     _, ax = plt.subplots(figsize=(14, 10))
     bins = np.arange(start=-0.5, stop=len(labels) + 0.5, step=1)
     bin_ticks = bins[:-1] + 0.5
     ax.hist(
-        dataset,
+        list(range(len(labels))),
         bins=list(bins),
+        weights=counts,
         edgecolor="black",
         color="blue",
         alpha=0.6,
@@ -153,3 +237,60 @@ def plot_keyword_occurances(keyword_map: dict[str, dict[str, int]], output_file:
     plt.tight_layout()
     plt.savefig(output_file)
     plt.close()
+
+
+def plot_time_series(
+    labels: list[str], series: dict[str, list[int]], title: str, output_file: Path
+):
+    """Plot each of `series`, totals for each period of `labels`, on its own axes"""
+    _, axes = plt.subplots(
+        len(series), 1, figsize=(14, 3 + 3 * len(series)), sharex=True, squeeze=False
+    )
+    positions = list(range(len(labels)))
+    for ax, (name, counts) in zip(axes[:, 0], series.items()):
+        ax.plot(positions, counts, marker="o", markersize=3, color="blue", alpha=0.6)
+        ax.fill_between(positions, counts, color="blue", alpha=0.15)
+        ax.set_ylabel(name.capitalize(), fontsize=15)
+        ax.set_ylim(bottom=0)
+        ax.grid(axis="y", alpha=0.3)
+    axes[0, 0].set_title(title, fontsize=20)
+    # Label at most 24 periods
+    step = max(1, len(labels) // 24)
+    axes[-1, 0].set_xticks(
+        ticks=positions[::step],
+        labels=labels[::step],
+        rotation=45,
+        ha="right",
+        rotation_mode="anchor",
+    )
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close()
+
+
+def calendar_heat_map(
+    years: list[str], counts: list[list[int]], plot_title: str, output_file: Path
+):
+    """Create a calendar of posts, `counts` indexed by year then day of a leap year"""
+    _, ax = plt.subplots(figsize=(20, 2 + len(years)))
+    sns.heatmap(
+        data=np.array(counts),
+        ax=ax,
+        cmap=sns.color_palette("rocket_r", as_cmap=True),
+        yticklabels=years,
+        xticklabels=False,
+    )
+    ax.collections[0].colorbar.set_label(  # type: ignore
+        "Number of messages", fontsize=15
+    )
+    ax.set_xticks(
+        [start + 0.5 for start in MONTH_STARTS], [month[:3] for month in MONTHS]
+    )
+    ax.tick_params(axis="both", labelsize=10)
+    ax.tick_params(axis="y", rotation=0)
+    ax.set_title(plot_title, fontsize=20)
+    ax.set_ylabel("Year", fontsize=15)
+    ax.set_xlabel("Day of Year", fontsize=15)
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close()
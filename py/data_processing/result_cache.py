@@ -0,0 +1,81 @@
+"""Content addressed cache of analysis results"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+from py.models.analysis_config import AnalysisConfig
+from py.models.analysis_results import RESULTS_VERSION, AnalysisResults
+
+LOG = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+class ResultCache:
+    """Cache of `AnalysisResults` keyed on a hash of the chat archive and analysis config
+
+    Entries are json files in `cache_dir`. Reading an entry marks it as recently used, and
+    the least recently used entries are evicted when the cache grows over `max_bytes`
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(chat_path: Path, config: AnalysisConfig) -> str:
+        """Hash of the contents of `chat_path` and the serialized `config`"""
+        digest = hashlib.sha256(RESULTS_VERSION.encode("utf-8"))
+        with open(chat_path, "rb") as file:
+            while block := file.read(HASH_BLOCK_SIZE):
+                digest.update(block)
+        digest.update(config.model_dump_json().encode("utf-8"))
+        return digest.hexdigest()
+
+    def entry(self, key: str) -> Path:
+        """Path of the cache entry for `key`"""
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, key: str) -> AnalysisResults | None:
+        """Read cached results for `key`, None if there are none"""
+        entry = self.entry(key)
+        try:
+            os.utime(entry)
+            with open(entry, encoding="utf-8") as file:
+                results = AnalysisResults.model_validate_json(file.read())
+        except FileNotFoundError:
+            # Not cached, or evicted by another process sharing the cache
+            return None
+        LOG.info("Using cached analysis results %s", entry.name)
+        return results
+
+    def save(self, key: str, results: AnalysisResults):
+        """Write results for `key` to the cache, then evict entries over the size limit"""
+        entry = self.entry(key)
+        # Processes sharing the cache each write their own temporary file
+        temporary_file = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            file.write(results.model_dump_json())
+        temporary_file.replace(entry)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits in `max_bytes`"""
+        entries = []
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                # Evicted by another process sharing the cache
+                continue
+        entries.sort(key=lambda entry: entry[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if total <= self.max_bytes:
+                break
+            LOG.debug("Evicting cached analysis results %s", entry.name)
+            total -= stat.st_size
+            entry.unlink(missing_ok=True)
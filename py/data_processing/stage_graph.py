@@ -0,0 +1,89 @@
+"""Dependency graph of analysis stages, to run only the stages requested outputs need"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """A stage of the analysis
+
+    Aggregate stages compute results in memory for the stages that require them and have
+    no output files. Output stages write `outputs`, a stage that is not `enabled` by the
+    analysis config is never run. `run` returns the number of items handled, if counted
+    """
+
+    name: str
+    run: Callable[[], int | None]
+    requires: list[str] = field(default_factory=list)
+    outputs: list[Path] = field(default_factory=list)
+    enabled: bool = True
+
+    def up_to_date(self, inputs_mtime: float) -> bool:
+        """Whether every output file exists and is newer than the stage inputs"""
+        return all(
+            output.exists() and output.stat().st_mtime >= inputs_mtime
+            for output in self.outputs
+        )
+
+
+class StageGraph:
+    """Stages declared in run order, each after the stages it requires"""
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: dict[str, Stage] = {}
+        for stage in stages:
+            unknown = [name for name in stage.requires if name not in self.stages]
+            if unknown:
+                raise ValueError(
+                    f"Stage {stage.name} requires undeclared stages {unknown}"
+                )
+            self.stages[stage.name] = stage
+        # Requested outputs the last plan skipped because the analysis config disables them
+        self.disabled: list[str] = []
+
+    @property
+    def outputs(self) -> list[str]:
+        """Names of the stages that write output files"""
+        return [name for name, stage in self.stages.items() if stage.outputs]
+
+    def plan(
+        self,
+        requested: Iterable[str] | None,
+        inputs: Iterable[Path],
+        force: bool = False,
+    ) -> list[Stage]:
+        """Stages to run, in order, to write the `requested` outputs, all if None
+
+        Disabled output stages are skipped and listed in `disabled`, output stages whose
+        files are newer than every input are skipped unless `force`, and an aggregate
+        stage is only run if a stage that requires it is run
+        """
+        names = self.outputs if requested is None else list(requested)
+        unknown = [name for name in names if name not in self.outputs]
+        if unknown:
+            raise ValueError(f"Unknown outputs {unknown}, choose from {self.outputs}")
+        inputs_mtime = max((path.stat().st_mtime for path in inputs), default=0.0)
+
+        needed: set[str] = set()
+        pending = []
+        self.disabled = []
+        for name in names:
+            stage = self.stages[name]
+            if not stage.enabled:
+                LOG.info("Skipping %s, it is disabled by the analysis config", name)
+                self.disabled.append(name)
+            elif not force and stage.up_to_date(inputs_mtime):
+                LOG.info("Skipping %s, its outputs are up to date", name)
+            else:
+                pending.append(name)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].requires)
+        return [stage for name, stage in self.stages.items() if name in needed]
@@ -0,0 +1,63 @@
+"""Most liked messages of a chat, overall, by member and by month"""
+
+from typing import Any, Callable
+
+from py.models.message_superlative import MessageSuperlative
+from py.utils.top_k import TopK
+
+# A ranked message id and the reference used to build its superlative
+Ranked = tuple[int, Any]
+RankedMessages = tuple[
+    list[MessageSuperlative],
+    dict[str, list[MessageSuperlative]],
+    dict[str, list[MessageSuperlative]],
+]
+
+
+class MessageRanking:
+    """Top `k` messages by likes, overall and for each poster and month, in one pass
+
+    Only the like count, id and a reference to each message are kept while ranking.
+    `MessageSuperlative` rows are built by `materialize`, once for each message that
+    made one of the rankings
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.overall: TopK[Ranked] = TopK(k)
+        self.by_member: dict[str, TopK[Ranked]] = {}
+        self.by_month: dict[str, TopK[Ranked]] = {}
+
+    def add(self, likes: int, message_id: int, poster: str, month: str, message: Any):
+        """Rank `message`, posted in `month` (YYYY-MM), a reference used to build its
+        superlative if it is kept"""
+        ranked = (message_id, message)
+        self.overall.push(likes, message_id, ranked)
+        member_top = self.by_member.get(poster)
+        if member_top is None:
+            member_top = self.by_member[poster] = TopK(self.k)
+        member_top.push(likes, message_id, ranked)
+        month_top = self.by_month.get(month)
+        if month_top is None:
+            month_top = self.by_month[month] = TopK(self.k)
+        month_top.push(likes, message_id, ranked)
+
+    def materialize(
+        self, build: Callable[[Any], MessageSuperlative]
+    ) -> RankedMessages:
+        """Build the superlatives of ranked messages, overall, by member and by month"""
+        built: dict[int, MessageSuperlative] = {}
+
+        def superlatives(top: TopK[Ranked]) -> list[MessageSuperlative]:
+            ranked = top.ranked()
+            for message_id, message in ranked:
+                if message_id not in built:
+                    built[message_id] = build(message)
+            return [built[message_id] for message_id, _ in ranked]
+
+        return (
+            superlatives(self.overall),
+            {poster: superlatives(top) for poster, top in self.by_member.items()},
+            {month: superlatives(top) for month, top in sorted(self.by_month.items())},
+        )
+
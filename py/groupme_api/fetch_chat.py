@@ -1,120 +1,377 @@
 """Module to obatain groupchat data"""
 
+import itertools
 import json
 import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Any, BinaryIO, Iterator
 
 import requests
 from requests import Response
 
 from py.groupme_api.request_utils import (
-    ENDPOINT,
+    API_BASE_URL,
     HEADERS,
+    MESSAGES_PATH,
     GroupMeException,
     NotModifiedException,
-    StatusCode,
 )
+from py.groupme_api.rate_limiter import RateLimiter
+from py.groupme_api.request_scheduler import RequestScheduler
+from py.data_processing.chat_reader import is_json_array, iter_message_dicts
 from py.models.analysis_config import AnalysisConfig
+from py.models.fetch_checkpoint import FetchCheckpoint
+from py.utils.directories import FileData
+from py.utils.profiler import Profiler
 
 LOG = logging.getLogger(__name__)
 
+# Pages requested ahead of the page being written
+PAGE_QUEUE_SIZE = 4
+QUEUE_TIMEOUT = 0.1
+
 class FetchChat:
-    """Class with medthods necessary for fetching GroupMe chat"""
+    """Class with medthods necessary for fetching GroupMe chat
+
+    Messages are appended to the output file one json message per line. Progress is saved
+    to a checkpoint file next to the output file after every page, so an interrupted fetch
+    resumes where it stopped. Requests go to `api_base_url`, which can point at a local mock
+    server for offline testing
+    """
 
     def __init__(
-        self, chat_id: str, acces_token: str, output_file: Path, config: AnalysisConfig
+        self,
+        chat_id: str,
+        acces_token: str,
+        output_file: Path,
+        config: AnalysisConfig,
+        rate_limiter: RateLimiter | None = None,
+        profiler: Profiler | None = None,
+        api_base_url: str = API_BASE_URL,
     ):
         self.chat_id = chat_id
+        self.api_base_url = api_base_url.rstrip("/")
         self.access_token = acces_token
         self.output_file = output_file
+        self.checkpoint_file = output_file.with_suffix(FileData.checkpoint_suffix)
         self.config = config
+        self.scheduler = RequestScheduler(
+            rate_limiter or RateLimiter(config.requests_per_second),
+            config.max_retries,
+            config.retry_backoff,
+            config.retry_backoff_max,
+        )
+        self.profiler = profiler or Profiler(enabled=False)
 
+        # Keep-alive session, so every page reuses the same connection
+        self.session = requests.Session()
         self.endpoint: str
         self.headers: dict[str, str]
         self.format_request()
 
+        # Fetch progress
+        self.fetch_failed = False
+        self.messages_fetched = 0
+        self.fetch_start = 0.0
+        self.fetch_time = 0.0
+        # Time until the response to the last request arrived, in seconds
+        self.request_latency: float | None = None
+
     def fetch_chat(self):
-        """Method to fetch group chat contents"""
-        params = {"limit": self.config.message_request_limit}
-        message_iterator = self.iterate_messages(params)
-        message_count = 0
-        batch = 1
-        with open(self.output_file, "w", encoding="utf-8") as file:
-            file.write("[\n")
-            while message := next(message_iterator, None):
+        """Method to fetch group chat contents, from newest to oldest message"""
+        checkpoint = FetchCheckpoint.load(self.checkpoint_file)
+        resume = (
+            checkpoint is not None
+            and not checkpoint.complete
+            and self.output_file.exists()
+            and self.output_file.stat().st_size >= (checkpoint.archive_size or 0)
+        )
+        if checkpoint is None or not resume:
+            checkpoint = FetchCheckpoint()
+        else:
+            LOG.info("Resuming fetch of messages before id %s", checkpoint.before_id)
+
+        params: dict[str, int | str] = {"limit": self.config.message_request_limit}
+        if checkpoint.before_id is not None:
+            params["before_id"] = checkpoint.before_id
+        with open(self.output_file, "ab" if resume else "wb") as file:
+            self.discard_unsaved(file, checkpoint)
+            for batch, messages in enumerate(self.iterate_pages(params, "before_id"), 1):
+                self.write_messages(
+                    file,
+                    [
+                        message
+                        for message in messages
+                        if self.config.start_date is None
+                        or message["created_at"] >= self.config.start_date
+                    ],
+                )
+                if checkpoint.newest_id is None:
+                    checkpoint.newest_id = messages[0]["id"]
+                checkpoint.before_id = messages[-1]["id"]
+                checkpoint.archive_size = file.tell()
+                checkpoint.save(self.checkpoint_file)
+                LOG.info("Completed message batch %d", batch)
+        self.log_throughput()
+        if self.fetch_failed:
+            LOG.error("Rerun the fetch to resume from the last completed batch")
+            return
+        checkpoint.complete = True
+        checkpoint.save(self.checkpoint_file)
+
+    def update_chat(self):
+        """Method to fetch only messages newer than the newest message in the output file"""
+        newest_id = self.newest_fetched_id()
+        if newest_id is None:
+            LOG.warning("No messages fetched yet from %s, fetching chat", self.output_file)
+            self.fetch_chat()
+            return
+        checkpoint = FetchCheckpoint.load(self.checkpoint_file) or FetchCheckpoint(
+            complete=True
+        )
+        if is_json_array(self.output_file):
+            self.convert_to_line_delimited()
+            checkpoint.archive_size = self.output_file.stat().st_size
+
+        # Messages after `after_id` are returned from oldest to newest
+        params: dict[str, int | str] = {
+            "limit": self.config.message_request_limit,
+            "after_id": newest_id,
+        }
+        LOG.info("Fetching messages after id %s", newest_id)
+        with open(self.output_file, "ab") as file:
+            self.discard_unsaved(file, checkpoint)
+            for batch, messages in enumerate(self.iterate_pages(params, "after_id"), 1):
+                self.write_messages(file, messages)
+                checkpoint.newest_id = messages[-1]["id"]
+                checkpoint.archive_size = file.tell()
+                checkpoint.save(self.checkpoint_file)
+                LOG.info("Completed message batch %d", batch)
+        self.log_throughput()
+
+    def iterate_pages(
+        self, params: dict[str, int | str], cursor: str
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Generator of message pages, the next page is requested while the current one is
+        processed
+
+        Pages are requested on a background thread and passed through a bounded queue. After
+        each page, `cursor` (before_id or after_id) is set to the id of the last message of
+        the page
+        """
+        pages: queue.Queue[list[dict[str, Any]] | None] = queue.Queue(
+            maxsize=PAGE_QUEUE_SIZE
+        )
+        stop = threading.Event()
+        self.fetch_failed = False
+        self.messages_fetched = 0
+        self.fetch_start = time.perf_counter()
+        producer = threading.Thread(
+            target=self.produce_pages, args=(dict(params), cursor, pages, stop), daemon=True
+        )
+        producer.start()
+        try:
+            while (page := pages.get()) is not None:
+                yield page
+        finally:
+            stop.set()
+            producer.join()
+            self.fetch_time = time.perf_counter() - self.fetch_start
+
+    def produce_pages(
+        self,
+        params: dict[str, int | str],
+        cursor: str,
+        pages: queue.Queue[list[dict[str, Any]] | None],
+        stop: threading.Event,
+    ):
+        """Request pages until the end of the chat and put them on the `pages` queue"""
+        try:
+            for page in itertools.count(1):
+                if stop.is_set():
+                    return
+                with self.profiler.stage(f"fetch {self.chat_id} page {page}") as metrics:
+                    messages = self.request_messages(params)
+                    metrics.items = None if messages is None else len(messages)
+                    metrics.request_latency = self.request_latency
+                if messages is None:
+                    self.fetch_failed = True
+                    return
+                if not messages or not self.put_page(pages, messages, stop):
+                    return
+                if len(messages) < self.config.message_request_limit:
+                    return
                 if (
-                    self.config.end_date is None or
-                    message["created_at"] < self.config.end_date
+                    cursor == "before_id"
+                    and self.config.start_date is not None
+                    and messages[-1]["created_at"] < self.config.start_date
                 ):
-                    LOG.debug("Writing message %s", message["id"])
-                    LOG.debug(
-                        "Message fetched %d / %d of batch %d",
-                        message_count + 1,
-                        self.config.message_request_limit,
-                        batch,
+                    LOG.info(
+                        "No more messages after timestamp: %r", self.config.start_date
                     )
-                    file.write("\t")
-                    file.write(json.dumps(message))
-                    file.write(",\n")
-                message_count += 1
-                if message_count == self.config.message_request_limit:
-                    params["before_id"] = message["id"]
-                    message_iterator = self.iterate_messages(params)
-                    message_count = 0
-                    LOG.info("Completed message batch %d", batch)
-                    batch += 1
-            file.write("]")
-        self.remove_trailing_comma()
+                    return
+                params[cursor] = messages[-1]["id"]
+        finally:
+            self.put_page(pages, None, stop)
+
+    @staticmethod
+    def put_page(
+        pages: queue.Queue[list[dict[str, Any]] | None],
+        page: list[dict[str, Any]] | None,
+        stop: threading.Event,
+    ) -> bool:
+        """Put `page` on the queue, waiting for space unless the consumer has stopped"""
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=QUEUE_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def log_throughput(self):
+        """Log the number of messages fetched and the rate they were fetched at"""
+        rate = self.messages_fetched / self.fetch_time if self.fetch_time else 0.0
+        LOG.info(
+            "Fetched %d messages in %.1f s (%.1f messages / s)",
+            self.messages_fetched,
+            self.fetch_time,
+            rate,
+        )
+
+    def newest_fetched_id(self) -> str | None:
+        """Id of the newest message that has been fetched, None if there are none"""
+        checkpoint = FetchCheckpoint.load(self.checkpoint_file)
+        if checkpoint is not None and checkpoint.newest_id is not None:
+            return checkpoint.newest_id
+        if not self.output_file.exists():
+            return None
+        newest = max(
+            iter_message_dicts(self.output_file),
+            key=lambda message: message["created_at"],
+            default=None,
+        )
+        return None if newest is None else str(newest["id"])
+
+    def convert_to_line_delimited(self):
+        """Rewrite a json array chat file with one message per line, so it can be appended to"""
+        LOG.info("Converting %s to one message per line", self.output_file)
+        temporary_file = self.output_file.with_suffix(".tmp")
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            for message in iter_message_dicts(self.output_file):
+                file.write(json.dumps(message) + "\n")
+        temporary_file.replace(self.output_file)
+
+    @staticmethod
+    def discard_unsaved(file: BinaryIO, checkpoint: FetchCheckpoint):
+        """Truncate `file` to the size saved in `checkpoint`, dropping messages written
+        after the checkpoint was last saved, such as a page or a partly written message
+        of an interrupted fetch, so they are not written twice"""
+        size = file.seek(0, os.SEEK_END)
+        if checkpoint.archive_size is not None and size > checkpoint.archive_size:
+            LOG.info(
+                "Discarding %d bytes written after the last checkpoint",
+                size - checkpoint.archive_size,
+            )
+            file.truncate(checkpoint.archive_size)
+            file.seek(0, os.SEEK_END)
+
+    def write_messages(self, file: BinaryIO, messages: list[dict[str, Any]]):
+        """Write messages within the date range to `file`, one message per line"""
+        lines = [
+            json.dumps(message) + "\n"
+            for message in messages
+            if self.config.end_date is None
+            or message["created_at"] < self.config.end_date
+        ]
+        LOG.debug("Writing %d messages", len(lines))
+        file.write("".join(lines).encode("utf-8"))
+        file.flush()
+        self.messages_fetched += len(lines)
 
     def format_request(self):
         """Format header and endpoint"""
-        self.endpoint = ENDPOINT.format(self.chat_id)
-        self.headers = HEADERS
+        self.endpoint = self.api_base_url + MESSAGES_PATH.format(self.chat_id)
+        self.headers = dict(HEADERS)
         self.headers["X-Access-Token"] = self.access_token
-        self.headers["Referer"].format(self.chat_id)
+        self.headers["Referer"] = HEADERS["Referer"].format(self.chat_id)
+        self.session.headers.update(self.headers)
 
-    def send_request(self, params: dict[str, int]) -> Response:
-        """Send request for chat messages and validate it"""
-        response = requests.get(
-            self.endpoint, params=params, headers=self.headers, timeout=10
+    def send_request(self, params: dict[str, int | str]) -> Response:
+        """Send request for chat messages and validate it, retrying transient failures"""
+        return self.scheduler.send(
+            lambda: self.session.get(self.endpoint, params=params, timeout=10)
         )
-        LOG.debug("Request Status Code: %d", response.status_code)
-        StatusCode.validate_request(response)
-        return response
 
-    def iterate_messages(self, params: dict[str, int]) -> Iterable[dict | None]:
-        """Generator to query groupme messages and iterate through them"""
+    def request_messages(
+        self, params: dict[str, int | str]
+    ) -> list[dict[str, Any]] | None:
+        """Request a page of messages, an empty list at the end of the chat and None on error"""
+        self.request_latency = None
         try:
             response = self.send_request(params)
-            for message in response.json()["response"]["messages"]:
-                if (
-                    self.config.start_date is not None
-                    and message["created_at"] < self.config.start_date
-                ):
-                    LOG.info(
-                        "No more messages after timestamp: %r",
-                        self.config.start_date,
-                    )
-                    yield None
-                yield message
+            self.request_latency = response.elapsed.total_seconds()
+            return response.json()["response"]["messages"]
         except NotModifiedException as e:
             LOG.info(e)
-            yield None
+            return []
         except (
             GroupMeException,
-            requests.exceptions.TooManyRedirects,
-            requests.exceptions.TooManyRedirects,
             requests.exceptions.RequestException,
         ) as e:
             LOG.error(e)
             LOG.error("Error occured, fetch of chat messages will not continue")
-            yield None
-
-    def remove_trailing_comma(self):
-        """Remove last comma in groupme message formatted json file"""
-        with open(self.output_file, "r", encoding="utf-8") as f:
-            text = f.readlines()
-            text[-2] = text[-2].rsplit(",", maxsplit=1)[0] + "\n"
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            f.writelines(text)
+            return None
+
+
+def fetch_chats(
+    chat_files: dict[str, Path],
+    access_token: str,
+    config: AnalysisConfig,
+    workers: int,
+    update: bool = False,
+    profiler: Profiler | None = None,
+    api_base_url: str = API_BASE_URL,
+) -> dict[str, bool]:
+    """Fetch several chats concurrently, `chat_files` maps each chat id to its output file
+
+    Each chat is fetched on its own thread with its own session and headers, all requests
+    share one rate limit. Returns whether each chat was fetched without error
+    """
+    rate_limiter = RateLimiter(config.requests_per_second)
+    fetchers = {
+        chat_id: FetchChat(
+            chat_id,
+            access_token,
+            output_file,
+            config,
+            rate_limiter,
+            profiler,
+            api_base_url,
+        )
+        for chat_id, output_file in chat_files.items()
+    }
+
+    def fetch(fetcher: FetchChat) -> bool:
+        LOG.info("Fetching chat %s to %s", fetcher.chat_id, fetcher.output_file)
+        try:
+            if update:
+                fetcher.update_chat()
+            else:
+                fetcher.fetch_chat()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            LOG.error(e)
+            return False
+        return not fetcher.fetch_failed
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(zip(fetchers, executor.map(fetch, fetchers.values())))
+    for chat_id, success in results.items():
+        if not success:
+            LOG.error("Fetch of chat %s did not complete, rerun to resume", chat_id)
+    return results
@@ -0,0 +1,270 @@
+"""Local mock of the GroupMe messages API, replaying a chat archive for offline testing"""
+
+import json
+import logging
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Self
+from urllib.parse import parse_qs, urlsplit
+
+import typer
+from typing_extensions import Annotated
+
+from py.data_processing.chat_reader import iter_message_dicts
+from py.groupme_api.request_utils import StatusCode
+from py.utils.directories import FileData
+from py.utils.utility import validate_json_input
+
+LOG = logging.getLogger(__name__)
+
+MESSAGES_ROUTE = re.compile(r"^/v3/groups/([^/]+)/messages$")
+DEFAULT_LIMIT = 20
+# Outcome of a request that is dropped without a response
+DROPPED = "dropped"
+
+
+@dataclass
+class Faults:
+    """Faults injected into responses, rates are the fraction of requests affected"""
+
+    # Delay before each response, in seconds, and the width of its random jitter
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Requests rejected with 420 or 429, with `retry_after` seconds in a Retry-After header
+    throttle_rate: float = 0.0
+    throttle_status: int = StatusCode.TOO_MANY_REQUESTS.value
+    retry_after: float | None = None
+    # Requests answered with a 5xx server error
+    error_rate: float = 0.0
+    error_status: int = StatusCode.SERVICE_UNAVAILABLE.value
+    # Requests whose connection is closed without a response
+    drop_rate: float = 0.0
+    seed: int | None = None
+
+
+class MessageStore:
+    """Messages of a chat archive, newest first, paginated like the GroupMe API"""
+
+    def __init__(self, messages: list[dict[str, Any]]):
+        self.messages = sorted(
+            messages, key=lambda message: int(message["id"]), reverse=True
+        )
+        self.position = {str(message["id"]): i for i, message in enumerate(self.messages)}
+
+    @classmethod
+    def from_archive(cls, chat_path: Path) -> Self:
+        """Load the messages of a chat archive, in either json format"""
+        return cls(list(iter_message_dicts(chat_path)))
+
+    def page(self, params: dict[str, str]) -> list[dict[str, Any]] | None:
+        """Messages of a page, newest first unless after `after_id`, None for an unknown
+        message id"""
+        limit = int(params.get("limit", DEFAULT_LIMIT))
+        if "before_id" in params:
+            start = self.position.get(params["before_id"])
+            return None if start is None else self.messages[start + 1 : start + 1 + limit]
+        if "after_id" in params:
+            end = self.position.get(params["after_id"])
+            if end is None:
+                return None
+            # Messages after `after_id` are returned from oldest to newest
+            return self.messages[max(0, end - limit) : end][::-1]
+        return self.messages[:limit]
+
+
+class MockGroupMeServer:
+    """Serve `/v3/groups/{id}/messages` from a `MessageStore` on a local port
+
+    Every group id is served the same messages. Each request is delayed by the configured
+    latency, then may be throttled, fail with a server error or be dropped, at the rates of
+    `faults`. Responses are counted by status in `responses`. Use as a context manager to
+    serve on a background thread
+    """
+
+    def __init__(
+        self, store: MessageStore, faults: Faults | None = None, port: int = 0
+    ):
+        self.store = store
+        self.faults = faults or Faults()
+        self.random = random.Random(self.faults.seed)
+        self.lock = threading.Lock()
+        self.responses: Counter[str] = Counter()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.handler())
+        self.server.daemon_threads = True
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Base url of the API served, to pass as the fetch `api_base_url`"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def __enter__(self) -> Self:
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        LOG.info("Mock GroupMe API serving at %s", self.base_url)
+        return self
+
+    def __exit__(self, *_):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def outcome(self) -> tuple[float, str | None]:
+        """Delay before responding, and the fault injected, if any"""
+        faults = self.faults
+        with self.lock:
+            delay = faults.latency + self.random.uniform(0, faults.jitter)
+            draw = self.random.random()
+        for fault, rate in [
+            (DROPPED, faults.drop_rate),
+            (str(faults.throttle_status), faults.throttle_rate),
+            (str(faults.error_status), faults.error_rate),
+        ]:
+            if draw < rate:
+                return delay, fault
+            draw -= rate
+        return delay, None
+
+    def count(self, outcome: str):
+        """Count a response with status or outcome `outcome`"""
+        with self.lock:
+            self.responses[outcome] += 1
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        """Request handler class bound to this server"""
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Handle GroupMe API requests"""
+
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Respond to a page request"""
+                url = urlsplit(self.path)
+                if MESSAGES_ROUTE.match(url.path) is None:
+                    self.respond(StatusCode.NOT_FOUND.value)
+                    return
+                delay, fault = mock.outcome()
+                if delay:
+                    time.sleep(delay)
+                if fault == DROPPED:
+                    mock.count(DROPPED)
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                if fault is not None:
+                    headers = {}
+                    if fault == str(mock.faults.throttle_status) and (
+                        mock.faults.retry_after is not None
+                    ):
+                        headers["Retry-After"] = str(mock.faults.retry_after)
+                    self.respond(int(fault), headers=headers)
+                    return
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                messages = mock.store.page(params)
+                if messages is None:
+                    self.respond(StatusCode.BAD_REQUEST.value)
+                elif not messages:
+                    self.respond(StatusCode.NOT_MODIFIED.value)
+                else:
+                    self.respond(
+                        StatusCode.OK.value,
+                        {
+                            "response": {
+                                "count": len(mock.store.messages),
+                                "messages": messages,
+                            },
+                            "meta": {"code": StatusCode.OK.value},
+                        },
+                    )
+
+            def respond(
+                self,
+                status: int,
+                body: dict[str, Any] | None = None,
+                headers: dict[str, str] | None = None,
+            ):
+                """Send a response with an optional json body"""
+                mock.count(str(status))
+                data = b"" if body is None else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if status != StatusCode.NOT_MODIFIED.value:
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if status != StatusCode.NOT_MODIFIED.value:
+                    self.wfile.write(data)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                LOG.debug(format, *args)
+
+        return Handler
+
+
+def main(  # pylint: disable=too-many-arguments
+    chat_json: Annotated[str, typer.Option(help="Name of json chat file to serve")],
+    port: Annotated[int, typer.Option(help="Port to serve on")] = 8080,
+    latency: Annotated[float, typer.Option(help="Delay of each response (s)")] = 0.0,
+    jitter: Annotated[float, typer.Option(help="Random extra delay, up to (s)")] = 0.0,
+    throttle_rate: Annotated[
+        float, typer.Option(help="Fraction of requests throttled")
+    ] = 0.0,
+    throttle_status: Annotated[
+        int, typer.Option(help="Status of throttled requests, 420 or 429")
+    ] = StatusCode.TOO_MANY_REQUESTS.value,
+    retry_after: Annotated[
+        float | None, typer.Option(help="Retry-After of throttled requests (s)")
+    ] = None,
+    error_rate: Annotated[
+        float, typer.Option(help="Fraction of requests failing with a server error")
+    ] = 0.0,
+    error_status: Annotated[
+        int, typer.Option(help="Status of server errors")
+    ] = StatusCode.SERVICE_UNAVAILABLE.value,
+    drop_rate: Annotated[
+        float, typer.Option(help="Fraction of requests dropped without a response")
+    ] = 0.0,
+    seed: Annotated[int | None, typer.Option(help="Random seed of faults")] = None,
+):
+    """Serve a chat archive through a mock GroupMe messages API until interrupted"""
+    logging.basicConfig(level=logging.INFO)
+    store = MessageStore.from_archive(
+        FileData.raw_output_dir / validate_json_input(chat_json)
+    )
+    faults = Faults(
+        latency=latency,
+        jitter=jitter,
+        throttle_rate=throttle_rate,
+        throttle_status=throttle_status,
+        retry_after=retry_after,
+        error_rate=error_rate,
+        error_status=error_status,
+        drop_rate=drop_rate,
+        seed=seed,
+    )
+    with MockGroupMeServer(store, faults, port) as server:
+        typer.echo(
+            f"Serving {len(store.messages)} messages, "
+            f"fetch with --api-base-url {server.base_url}"
+        )
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            typer.echo(f"Responses: {dict(server.responses)}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
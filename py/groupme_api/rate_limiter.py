@@ -0,0 +1,55 @@
+"""Token bucket rate limiter shared by GroupMe requests"""
+
+import threading
+import time
+
+# Rate changes when requests are throttled or succeed
+DECREASE_FACTOR = 0.5
+INCREASE_FRACTION = 0.05
+MIN_RATE_FRACTION = 0.02
+
+
+class RateLimiter:
+    """Thread safe token bucket, allows `rate` requests per second with bursts of `burst`
+
+    The rate adapts to the throttling it observes: it is halved each time a request is
+    throttled and climbs back towards `max_rate` in small steps after each success. A
+    Retry-After delay pauses every request sharing the limiter
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.max_rate = rate
+        self.min_rate = rate * MIN_RATE_FRACTION
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def throttled(self, pause: float = 0.0):
+        """Slow down after a throttled request, pausing all requests for `pause` seconds"""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def succeeded(self):
+        """Speed back up towards the maximum rate after a successful request"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * INCREASE_FRACTION)
@@ -0,0 +1,79 @@
+"""Schedule GroupMe requests under a rate limit, retrying transient failures"""
+
+import logging
+import random
+import time
+from typing import Callable
+
+import requests
+from requests import Response
+
+from py.groupme_api.rate_limiter import RateLimiter
+from py.groupme_api.request_utils import (
+    StatusCode,
+    ThrottledException,
+    TransientException,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+class RequestScheduler:
+    """Send requests through a shared `RateLimiter`, retrying throttled requests, server
+    errors and dropped connections with exponential backoff and full jitter
+
+    A Retry-After header sets the minimum delay before the retry and pauses every request
+    sharing the rate limiter
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.retries = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt`"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def send(self, request: Callable[[], Response]) -> Response:
+        """Send `request` and validate the response, retrying transient failures"""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = request()
+                LOG.debug("Request Status Code: %d", response.status_code)
+                StatusCode.validate_request(response)
+            except ThrottledException as e:
+                delay = max(self.backoff(attempt), e.retry_after or 0.0)
+                self.rate_limiter.throttled(delay)
+                error: Exception = e
+            except (
+                TransientException,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                delay = self.backoff(attempt)
+                error = e
+            else:
+                self.rate_limiter.succeeded()
+                return response
+
+            if attempt >= self.max_retries:
+                raise error
+            attempt += 1
+            self.retries += 1
+            LOG.warning(
+                "%s, retry %d of %d in %.1f s", error, attempt, self.max_retries, delay
+            )
+            self.sleep(delay)
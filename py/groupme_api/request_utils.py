@@ -1,10 +1,14 @@
 """Request Data, Status Code and Exception Definitions"""
 
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from enum import IntEnum
 from requests import Response
 
 
-ENDPOINT = "https://api.groupme.com/v3/groups/{}/messages"
+API_BASE_URL = "https://api.groupme.com/v3"
+MESSAGES_PATH = "/groups/{}/messages"
+ENDPOINT = API_BASE_URL + MESSAGES_PATH
 HEADERS = {
             "Accept": "application/json, text/javascript",
             "Accept-Charset": "ISO-8859-1,utf-8",
@@ -32,6 +36,7 @@ class StatusCode(IntEnum):
     INTERNAL_SERVER_ERROR = 500
     BAD_GATEWAY = 502
     SERVICE_UNAVAILABLE = 503
+    GATEWAY_TIMEOUT = 504
 
     @classmethod
     def validate_request(cls, response: Response):
@@ -39,11 +44,44 @@ class StatusCode(IntEnum):
         status = response.status_code
         if status == cls.NOT_MODIFIED.value:
             raise NotModifiedException("End of chat reached, no more messages to query")
+        if status in [cls.ENHANCE_YOUR_CALM.value, cls.TOO_MANY_REQUESTS.value]:
+            raise ThrottledException(
+                f"Request throttled: status code {status}", retry_after(response)
+            )
+        if status >= cls.INTERNAL_SERVER_ERROR.value:
+            raise TransientException(f"Server error: status code {status}")
         if status not in [cls.OK.value, cls.CREATED.value, cls.NO_CONTENT.value]:
             raise GroupMeException(f"Bad response: status code {status}")
 
+def retry_after(response: Response) -> float | None:
+    """Seconds to wait before retrying, from the Retry-After header of `response`"""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
 class GroupMeException(Exception):
     """Exception when GroupMe request fails"""
 
+class TransientException(GroupMeException):
+    """Exception when a GroupMe request fails but may succeed if retried"""
+
+class ThrottledException(TransientException):
+    """Exception when GroupMe rejects a request for exceeding its rate limit"""
+
+    def __init__(self, message: str, retry_after_seconds: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after_seconds
+
 class NotModifiedException(Exception):
     """Exception when no content is fetched"""
@@ -8,9 +8,13 @@ from typing_extensions import Annotated
 from py.utils.logger import initialize_logger
 from py.utils.utility import validate_json_input
 from py.utils.directories import FileData
-from py.groupme_api.fetch_chat import FetchChat
+from py.utils.profiler import Profiler
+from py.groupme_api.fetch_chat import FetchChat, fetch_chats
+from py.groupme_api.request_utils import API_BASE_URL
 from py.models.analysis_config import read_analysis_config
-from py.data_processing.analysis import Analysis
+from py.data_processing.analysis import Analysis, AnalysisEngine, AnalysisOutput
+from py.data_processing.columnar_archive import convert_chat
+from py.data_processing.result_cache import ResultCache
 
 LOG = logging.getLogger(__name__)
 
@@ -20,16 +24,84 @@ def main(
     download_chat: Annotated[
         bool, typer.Option(help="Whether to download chat data")
     ] = False,
+    update_chat: Annotated[
+        bool,
+        typer.Option(help="Whether to download only messages newer than the chat json"),
+    ] = False,
     chat_id: Annotated[str | None, typer.Option(help="Chat ID number")] = None,
+    batch_chat_id: Annotated[
+        list[str] | None,
+        typer.Option(help="Chat ID numbers to download concurrently, may be repeated"),
+    ] = None,
+    fetch_workers: Annotated[
+        int, typer.Option(help="Number of chats to download at once")
+    ] = 4,
     access_token: Annotated[
         str | None, typer.Option(help="GroupMe API access token")
     ] = None,
+    api_base_url: Annotated[
+        str, typer.Option(help="Base url of the GroupMe API, ie: a local mock server")
+    ] = API_BASE_URL,
     analysis_config: Annotated[
         str | None, typer.Option(help="json file with analysis parameters")
     ] = None,
     log_level: Annotated[
         str, typer.Option(help="Level to log (INFO, DEBUG, ERROR)")
     ] = "INFO",
+    engine: Annotated[
+        AnalysisEngine, typer.Option(help="Engine used to compute member stats")
+    ] = AnalysisEngine.PYTHON,
+    columnar_archive: Annotated[
+        bool,
+        typer.Option(
+            help="Analyze a binary columnar copy of the chat json, converted when stale"
+        ),
+    ] = False,
+    cache: Annotated[
+        bool, typer.Option(help="Whether to reuse results of a previous identical analysis")
+    ] = True,
+    cache_size: Annotated[
+        int, typer.Option(help="Maximum size of the analysis result cache, in MB")
+    ] = 512,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="Fold only messages appended since the last analysis into its saved state"
+        ),
+    ] = False,
+    output: Annotated[
+        list[AnalysisOutput] | None,
+        typer.Option(help="Output to write, may be repeated, every output if unset"),
+    ] = None,
+    force: Annotated[
+        bool, typer.Option(help="Whether to rewrite outputs that are up to date")
+    ] = False,
+    plot_workers: Annotated[
+        int | None,
+        typer.Option(help="Number of processes rendering figures, one per CPU if unset"),
+    ] = None,
+    strict_validation: Annotated[
+        bool,
+        typer.Option(help="Validate every field of every message while reading the chat"),
+    ] = False,
+    chunk_size: Annotated[
+        int | None,
+        typer.Option(
+            help="Analyze the chat in chunks of this many messages, to bound memory"
+        ),
+    ] = None,
+    chunk_workers: Annotated[
+        int | None,
+        typer.Option(help="Number of processes analyzing chunks, one per CPU if unset"),
+    ] = 1,
+    profile: Annotated[
+        bool,
+        typer.Option(help="Save the time and memory used by each stage to a metrics file"),
+    ] = False,
+    profile_cprofile: Annotated[
+        bool,
+        typer.Option(help="With --profile, also save cProfile stats of the slowest stage"),
+    ] = False,
 ):
     """Main execution of GroupMe Wrapped"""
     try:
@@ -43,22 +115,80 @@ def main(
 
         # Parameters for chat data analysis
         config = read_analysis_config(analysis_config)
+        profiler = Profiler(enabled=profile, cprofile=profile_cprofile)
+        output_dir = FileData.results_dir / config.output_folder
+
+        # Download several chats, saved to <chat-json>_<chat id>.json
+        if batch_chat_id:
+            assert (
+                access_token is not None
+            ), "Must input access token to fetch groupme data"
+            chat_files = {
+                batch_id: chat_path.with_stem(f"{chat_path.stem}_{batch_id}")
+                for batch_id in batch_chat_id
+            }
+            fetch_chats(
+                chat_files,
+                access_token,
+                config,
+                fetch_workers,
+                update_chat,
+                profiler,
+                api_base_url,
+            )
+            profiler.save(output_dir)
+            return
 
         # Download chat data
-        if download_chat:
+        if download_chat or update_chat:
             assert (
                 access_token is not None
             ), "Must input access token to fetch groupme data"
             assert chat_id is not None, "Must input chat id to fetch groupme data"
-            FetchChat(
+            fetcher = FetchChat(
                 chat_id=chat_id,
                 acces_token=access_token,
                 output_file=chat_path,
                 config=config,
-            ).fetch_chat()
+                profiler=profiler,
+                api_base_url=api_base_url,
+            )
+            if update_chat:
+                fetcher.update_chat()
+            else:
+                fetcher.fetch_chat()
+
+        # Convert chat data to a columnar archive
+        if columnar_archive:
+            archive_path = chat_path.with_suffix(FileData.columnar_suffix)
+            if (
+                not archive_path.exists()
+                or archive_path.stat().st_mtime < chat_path.stat().st_mtime
+            ):
+                LOG.info("Converting %s to columnar archive", chat_path)
+                convert_chat(chat_path, archive_path)
+            chat_path = archive_path
 
         # Analyze chat data
-        Analysis(config, chat_path).analyze_chat()
+        result_cache = (
+            ResultCache(FileData.cache_dir, cache_size * 2**20) if cache else None
+        )
+        Analysis(
+            config,
+            chat_path,
+            engine,
+            result_cache,
+            plot_workers,
+            strict_validation,
+            profiler,
+            chunk_size,
+            chunk_workers,
+        ).analyze_chat(
+            incremental,
+            [requested.value for requested in output or []] or None,
+            force,
+        )
+        profiler.save(output_dir)
 
     except Exception as e:  # pylint: disable=broad-exception-caught
         LOG.error(e)
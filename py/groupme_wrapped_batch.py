@@ -0,0 +1,102 @@
+"""Executable to perform GroupMe wrapped on a directory of chats"""
+
+import logging
+from pathlib import Path
+
+import typer
+from typing_extensions import Annotated
+
+from py.utils.logger import initialize_logger
+from py.utils.directories import FileData
+from py.data_processing.analysis import AnalysisEngine, AnalysisOutput
+from py.data_processing.batch import BatchJob, analyze_batch, find_jobs
+
+LOG = logging.getLogger(__name__)
+
+
+def main(  # pylint: disable=too-many-arguments
+    chat_dir: Annotated[
+        Path, typer.Option(help="Directory of chat json files to analyze")
+    ] = FileData.raw_output_dir,
+    config_dir: Annotated[
+        Path,
+        typer.Option(help="Directory of analysis configs, named after their chat json"),
+    ] = FileData.analysis_configs,
+    workers: Annotated[
+        int | None,
+        typer.Option(help="Number of chats analyzed at once, one per CPU if unset"),
+    ] = None,
+    log_level: Annotated[
+        str, typer.Option(help="Level to log (INFO, DEBUG, ERROR)")
+    ] = "INFO",
+    engine: Annotated[
+        AnalysisEngine, typer.Option(help="Engine used to compute member stats")
+    ] = AnalysisEngine.PYTHON,
+    cache: Annotated[
+        bool, typer.Option(help="Whether to reuse results of a previous identical analysis")
+    ] = True,
+    cache_size: Annotated[
+        int, typer.Option(help="Maximum size of the analysis result cache, in MB")
+    ] = 512,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="Fold only messages appended since the last analysis into its saved state"
+        ),
+    ] = False,
+    output: Annotated[
+        list[AnalysisOutput] | None,
+        typer.Option(help="Output to write, may be repeated, every output if unset"),
+    ] = None,
+    force: Annotated[
+        bool, typer.Option(help="Whether to rewrite outputs that are up to date")
+    ] = False,
+    strict_validation: Annotated[
+        bool,
+        typer.Option(help="Validate every field of every message while reading the chat"),
+    ] = False,
+    chunk_size: Annotated[
+        int | None,
+        typer.Option(
+            help="Analyze each chat in chunks of this many messages, to bound memory"
+        ),
+    ] = None,
+):
+    """Analyze every chat json in a directory on a pool of worker processes"""
+    try:
+
+        # Initialize Logging
+        initialize_logger(log_level)
+
+        jobs = [
+            BatchJob(
+                chat_path,
+                config,
+                engine,
+                FileData.cache_dir if cache else None,
+                cache_size * 2**20,
+                incremental,
+                [requested.value for requested in output or []] or None,
+                force,
+                strict_validation,
+                chunk_size,
+            )
+            for chat_path, config in find_jobs(chat_dir, config_dir)
+        ]
+        if not jobs:
+            LOG.warning("No chat json files found in %s", chat_dir)
+            return
+        LOG.info("Analyzing %d chats", len(jobs))
+        summary = analyze_batch(jobs, workers, log_level)
+        typer.echo(summary.table())
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        LOG.error(e)
+        raise
+
+    if summary.failed:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
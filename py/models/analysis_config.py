@@ -4,6 +4,7 @@ import json
 import logging
 from datetime import datetime
 from typing import Self
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -22,6 +23,10 @@ class ChatKeywords(BaseModel):
     name: str = Field(
         default="", description="The name to represent the set of keywords in plots"
     )
+    whole_word: bool = Field(
+        default=False,
+        description="Whether aliases only count when they are not part of a longer word",
+    )
 
     @field_validator("aliases")
     @classmethod
@@ -55,6 +60,24 @@ class AnalysisConfig(BaseModel):
         le=200,
         ge=1,
     )
+    requests_per_second: float = Field(
+        default=5.0,
+        description="Maximum rate of requests to the GroupMe API, shared by concurrent fetches",
+        gt=0,
+    )
+    max_retries: int = Field(
+        default=5,
+        description="Number of times a throttled or failed request is retried",
+        ge=0,
+    )
+    retry_backoff: float = Field(
+        default=1.0,
+        description="Base delay of the exponential backoff between retries, in seconds",
+        gt=0,
+    )
+    retry_backoff_max: float = Field(
+        default=60.0, description="Maximum delay between retries, in seconds", gt=0
+    )
     chat_name: str = Field(
         default="Group Chat",
         description="Name of groupchat to be referred to in figures",
@@ -73,16 +96,54 @@ class AnalysisConfig(BaseModel):
         default = True,
         description = "Whether copilot AI chatmember should be included in stats"
     )
+    timezone: str | None = Field(
+        default=None,
+        description="IANA time zone of post times, ie: America/New_York, local if unset",
+    )
+
+    @field_validator("chat_keywords")
+    @classmethod
+    def unique_keyword_names(
+        cls, value: list[ChatKeywords] | None
+    ) -> list[ChatKeywords] | None:
+        """Validate that each chat keyword has its own name"""
+        names = [keyword.name for keyword in value or []]
+        repeated = sorted({name for name in names if names.count(name) > 1})
+        if repeated:
+            raise ValueError(f"Chat keyword names {repeated} are used more than once")
+        return value
+
+    @field_validator("timezone")
+    @classmethod
+    def valid_timezone(cls, value: str | None) -> str | None:
+        """Validate the time zone name"""
+        if value is not None:
+            try:
+                ZoneInfo(value)
+            except (ZoneInfoNotFoundError, ValueError) as error:
+                raise ValueError(f"Unknown time zone {value}") from error
+        return value
+
+    @property
+    def zone(self) -> ZoneInfo | None:
+        """Time zone of post times and dates, None for the local time zone"""
+        return None if self.timezone is None else ZoneInfo(self.timezone)
 
     @model_validator(mode="after")
     def set_earliest_date(self) -> Self:
         """Define earliest date based on user_input"""
         if self.start_date is not None and isinstance(self.start_date, datetime):
-            self.start_date = datetime.timestamp(self.start_date)
+            self.start_date = datetime.timestamp(self.localize(self.start_date))
         if self.end_date is not None and isinstance(self.end_date, datetime):
-            self.end_date = datetime.timestamp(self.end_date)
+            self.end_date = datetime.timestamp(self.localize(self.end_date))
         return self
 
+    def localize(self, date: datetime) -> datetime:
+        """Interpret a naive `date` in the configured time zone"""
+        if date.tzinfo is None and self.timezone is not None:
+            return date.replace(tzinfo=self.zone)
+        return date
+
     @model_validator(mode="after")
     def set_output_folder(self) -> Self:
         """Set output folder to chat name if no output folder input to model"""
@@ -0,0 +1,127 @@
+"""Aggregated results of a chat analysis, before superlatives and outputs are made"""
+
+import hashlib
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel, Field
+
+from py.models.chat_stats import ChatStats
+from py.models.member_stats import MemberStats
+from py.models.message_superlative import MessageSuperlative
+from py.models.period_stats import PeriodStats
+from py.models.reaction_matrices import ReactionMatrices
+from py.utils.top_k import TopK
+
+# Bump when the contents of `AnalysisResults` change, so saved results are not reused
+RESULTS_VERSION = "6"
+# Bytes at the end of the analyzed archive used to check it has only been appended to
+TAIL_SIZE = 4096
+
+
+def rerank(messages: list[MessageSuperlative], k: int) -> list[MessageSuperlative]:
+    """The `k` most liked of `messages`, ties broken by message id"""
+    top: TopK[MessageSuperlative] = TopK(k)
+    for message in messages:
+        top.push(message.total_likes, message.message_id, message)
+    return top.ranked()
+
+
+class AnalysisResults(BaseModel):
+    """Basemodel class to store the aggregated stats of a chat"""
+
+    member_stats: dict[str, MemberStats] = Field(
+        default_factory=dict, description="Stats of each chat member, by name"
+    )
+    chat_stats: ChatStats = Field(
+        default_factory=ChatStats, description="Stats of the overall chat"
+    )
+    reaction_matrices: ReactionMatrices = Field(
+        default_factory=ReactionMatrices,
+        description="Reactions each member received from each other member",
+    )
+    keyword_map: dict[str, dict[str, int]] = Field(
+        default_factory=dict,
+        description="Number of messages that include each keyword, by member",
+    )
+    best_messages: list[MessageSuperlative] = Field(
+        default_factory=list, description="Most liked messages, in ranked order"
+    )
+    best_messages_by_member: dict[str, list[MessageSuperlative]] = Field(
+        default_factory=dict, description="Most liked messages of each member"
+    )
+    best_messages_by_month: dict[str, list[MessageSuperlative]] = Field(
+        default_factory=dict, description="Most liked messages of each month, as YYYY-MM"
+    )
+    period_stats: PeriodStats = Field(
+        default_factory=PeriodStats, description="Daily activity of the chat"
+    )
+
+    def merge(self, other: "AnalysisResults", num_messages_rank: int):
+        """Fold in `other`, the results of a later set of messages"""
+        for name, stats in other.member_stats.items():
+            if name in self.member_stats:
+                self.member_stats[name].merge(stats)
+            else:
+                self.member_stats[name] = stats
+        self.chat_stats.merge(other.chat_stats)
+        self.reaction_matrices.merge(other.reaction_matrices)
+        for keyword, counts in other.keyword_map.items():
+            keyword_counts = self.keyword_map.setdefault(keyword, {})
+            for name, count in counts.items():
+                keyword_counts[name] = keyword_counts.get(name, 0) + count
+        self.best_messages = rerank(
+            self.best_messages + other.best_messages, num_messages_rank
+        )
+        for groups, other_groups in [
+            (self.best_messages_by_member, other.best_messages_by_member),
+            (self.best_messages_by_month, other.best_messages_by_month),
+        ]:
+            for group, messages in other_groups.items():
+                groups[group] = rerank(groups.get(group, []) + messages, num_messages_rank)
+        self.best_messages_by_month = dict(sorted(self.best_messages_by_month.items()))
+        self.period_stats.merge(other.period_stats)
+
+
+class AnalysisState(AnalysisResults):
+    """Aggregated results saved with what is needed to fold in messages appended later"""
+
+    config_hash: str = Field(description="Hash of the analysis config of the results")
+    id_to_names: dict[str, list[str]] = Field(
+        default_factory=dict, description="Names used by each user id, in archive order"
+    )
+    archive_size: int = Field(
+        default=0, description="Number of bytes of the chat archive analyzed"
+    )
+    archive_tail: str = Field(
+        default="", description="Hash of the last bytes of the chat archive analyzed"
+    )
+
+    @staticmethod
+    def tail_hash(chat_path: Path, size: int) -> str:
+        """Hash of the bytes before offset `size` of `chat_path`"""
+        with open(chat_path, "rb") as file:
+            file.seek(max(0, size - TAIL_SIZE))
+            return hashlib.sha256(file.read(min(size, TAIL_SIZE))).hexdigest()
+
+    def appended_to(self, chat_path: Path) -> bool:
+        """Whether `chat_path` is the analyzed archive with only messages appended"""
+        return (
+            chat_path.stat().st_size >= self.archive_size
+            and self.tail_hash(chat_path, self.archive_size) == self.archive_tail
+        )
+
+    @classmethod
+    def load(cls, state_file: Path) -> Self | None:
+        """Read state from `state_file`, None if no state was saved"""
+        if not state_file.exists():
+            return None
+        with open(state_file, encoding="utf-8") as file:
+            return cls.model_validate_json(file.read())
+
+    def save(self, state_file: Path):
+        """Write state to `state_file`"""
+        temporary_file = state_file.with_suffix(".tmp")
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            file.write(self.model_dump_json())
+        temporary_file.replace(state_file)
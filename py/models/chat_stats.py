@@ -31,6 +31,11 @@ class ChatStats(BaseModel):
     )
     total_polls: int = Field(default=0, description="The total number of polls made")
 
+    def merge(self, other: "ChatStats"):
+        """Add the totals of `other`, stats from a later set of messages, to these stats"""
+        for field in ChatStats.model_fields:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
 def chat_summary_table(chat_stats: ChatStats, output_dir: Path):
     """Create table with most popular messages"""
     headers = ["Stat", "Value"]
@@ -0,0 +1,42 @@
+"""Checkpoint of chat fetch progress, saved next to the chat archive"""
+
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel, Field
+
+
+class FetchCheckpoint(BaseModel):
+    """Basemodel class to store how far a chat fetch has progressed"""
+
+    before_id: str | None = Field(
+        default=None,
+        description="Id of the oldest message fetched, older messages are fetched next",
+    )
+    newest_id: str | None = Field(
+        default=None, description="Id of the newest message fetched"
+    )
+    archive_size: int | None = Field(
+        default=None,
+        description="Bytes of the chat archive written when the checkpoint was saved, "
+        "later bytes are discarded when the fetch is resumed",
+    )
+    complete: bool = Field(
+        default=False,
+        description="Whether every message in the date range has been fetched",
+    )
+
+    @classmethod
+    def load(cls, checkpoint_file: Path) -> Self | None:
+        """Read checkpoint from `checkpoint_file`, None if no checkpoint was saved"""
+        if not checkpoint_file.exists():
+            return None
+        with open(checkpoint_file, encoding="utf-8") as file:
+            return cls.model_validate_json(file.read())
+
+    def save(self, checkpoint_file: Path):
+        """Write checkpoint to `checkpoint_file`"""
+        temporary_file = checkpoint_file.with_suffix(".tmp")
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            file.write(self.model_dump_json())
+        temporary_file.replace(checkpoint_file)
@@ -1,14 +1,22 @@
 """Summary model of results for individual user"""
 
-import statistics
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel, Field
 
 from py.utils.utility import DAYS, HOURS
 from py.utils.directories import FileData
 
+def add_counts(counts: Any, other: Any) -> Any:
+    """Add counts, or nested lists of counts, element by element"""
+    if isinstance(counts, list):
+        return [add_counts(count, other_count) for count, other_count in zip(counts, other)]
+    return counts + other
+
+
 HEADERS = [
         "Member",
         "Messages Sent",
@@ -42,10 +50,6 @@ class MemberStats(BaseModel):
     reactions_received: int = Field(
         default=0, description="Total number of reactions received"
     )
-    reactions_received_by_sender: dict[str, int] = Field(
-        default_factory=dict,
-        description="Total number of reactions received, by sender",
-    )
     hearts_given: int = Field(
         default=0, description="Total number of hearts / likes received"
     )
@@ -56,14 +60,6 @@ class MemberStats(BaseModel):
         default=0.0,
         description="Ratio of total hearts / likes recieved to total messages sent",
     )
-    hearts_received_by_sender: dict[str, int] = Field(
-        default_factory=dict,
-        description="Total number ofhearts / likes received, by sender",
-    )
-    hearts_given_by_receiver: dict[str, int] = Field(
-        default_factory=dict,
-        description="Total number of hearts / likes given, by receiver",
-    )
     dislikes_received: int = Field(
         default=0,
         description="Total number of dislikes (dislike, question) received",
@@ -72,10 +68,6 @@ class MemberStats(BaseModel):
         default=0,
         description="Total number of dislikes (dislike, question) given",
     )
-    dislikes_received_by_sender: dict[str, int] = Field(
-        default_factory=dict,
-        description="Total number of dislikes (dislike, question) received, by sender",
-    )
     biggest_fan: str = Field(
         default="", description="User who reacted to Member the most with hearts"
     )
@@ -88,50 +80,58 @@ class MemberStats(BaseModel):
     )
     images_sent: int = Field(default=0, description="Number of image attachments sent")
     polls_made: int = Field(default=0, description="Number of polls made")
-    hours_posted: list[int] = Field(
-        default_factory=list, description="Hours of the day the member made posts"
+    posts_by_hour: list[int] = Field(
+        default_factory=lambda: [0] * len(HOURS),
+        description="Number of posts made in each hour of the day",
     )
-    days_posted: list[int] = Field(
-        default_factory=list, description="days of the week member made posts"
+    posts_by_day: list[int] = Field(
+        default_factory=lambda: [0] * len(DAYS),
+        description="Number of posts made on each day of the week",
+    )
+    posts_by_day_and_hour: list[list[int]] = Field(
+        default_factory=lambda: [[0] * len(HOURS) for _ in DAYS],
+        description="Number of posts made in each hour of each day of the week",
     )
     word_count: int = Field(
         default=0, description="The total number of words the user posted"
     )
 
-    def initialize_dicts(self, name_list: list[str]):
-        """Fill dictionary fields with zero for each chat member in `name_list`"""
-        for name in name_list:
-            self.hearts_received_by_sender[name] = 0
-            self.hearts_given_by_receiver[name] = 0
-            self.reactions_received_by_sender[name] = 0
-            self.dislikes_received_by_sender[name] = 0
+    def merge(self, other: "MemberStats"):
+        """Add the counts of `other`, stats from a later set of messages, to these stats
+
+        Derived stats (averages, ratios and superlatives) are not merged, they are
+        calculated from the merged counts
+        """
+        for field, info in MemberStats.model_fields.items():
+            if info.annotation is int or isinstance(getattr(self, field), list):
+                setattr(self, field, add_counts(getattr(self, field), getattr(other, field)))
+
+    def set_post_times(self, posts_by_day_and_hour: np.ndarray):
+        """Set post counts from the number of posts in each hour of each weekday"""
+        self.posts_by_hour = posts_by_day_and_hour.sum(axis=0).tolist()
+        self.posts_by_day = posts_by_day_and_hour.sum(axis=1).tolist()
+        self.posts_by_day_and_hour = posts_by_day_and_hour.tolist()
 
     def post_time_modes(self):
-        """Determine the most common day and hour to post"""
-        self.most_active_hour = HOURS[statistics.mode(self.hours_posted)]
-        self.most_active_day = DAYS[statistics.mode(self.days_posted)]
+        """Determine the most common day and hour to post, the earliest on ties"""
+        self.most_active_hour = HOURS[int(np.argmax(self.posts_by_hour))]
+        self.most_active_day = DAYS[int(np.argmax(self.posts_by_day))]
 
     def get_verbosity(self):
         """Determine the avergae word count"""
         self.average_word_count = self.word_count / self.messages_sent
 
-    def get_reaction_superlatives(self):
-        """Determine the member's biggest fan and supporter, and their like / post ratio"""
+    def get_reaction_superlatives(
+        self, biggest_fan: tuple[str, int], biggest_supporter_of: tuple[str, int]
+    ):
+        """Set the member's biggest fan and supporter, as (member, hearts), and their like
+        / post ratio"""
 
         self.heart_message_ratio = self.hearts_received / self.messages_sent
-        biggest_fan = max(
-            self.hearts_received_by_sender,
-            key=self.hearts_received_by_sender.get,  # pylint: disable=no-member
-        )
-        self.biggest_fan = (
-            f"{biggest_fan} - {self.hearts_received_by_sender[biggest_fan]}"
-        )
-        biggest_supporter_of = max(
-            self.hearts_given_by_receiver,
-            key=self.hearts_given_by_receiver.get,  # pylint: disable=no-member
+        self.biggest_fan = f"{biggest_fan[0]} - {biggest_fan[1]}"
+        self.biggest_supporter_of = (
+            f"{biggest_supporter_of[0]} - {biggest_supporter_of[1]}"
         )
-        self.biggest_supporter_of = (f"{biggest_supporter_of} - "
-            f"{self.hearts_given_by_receiver[biggest_supporter_of]}")
 
 def member_summary_table(
     member_stats: dict[str, MemberStats],
@@ -139,9 +139,7 @@ def member_summary_table(
     output_file: Path,
 ):
     """Create a table with summary stats for each player"""
-    headers = HEADERS
-    for key in keyword_map.keys():
-        headers += [key]
+    headers = HEADERS + list(keyword_map.keys())
     summary = pd.DataFrame(columns=headers, index=range(len(member_stats.keys())))
     for i, (name, stats) in enumerate(member_stats.items()):
 
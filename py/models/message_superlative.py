@@ -22,6 +22,9 @@ class MessageSuperlative(BaseModel):
     total_likes: int = Field(
         default=0, ge=0, description="The total number of reactions"
     )
+    message_id: int = Field(
+        default=0, description="GroupMe id of the message, which breaks ties in likes"
+    )
 
 def popular_message_table(messages: list[MessageSuperlative], output_file: Path):
     """Create table with most popular messages"""
@@ -30,3 +33,17 @@ def popular_message_table(messages: list[MessageSuperlative], output_file: Path)
     for i, message in enumerate(messages):
         messages_ranked.iloc[i] = list(message.model_dump().values())
     messages_ranked.to_csv(output_file, sep=",", encoding="utf-8", index=False)
+
+
+def grouped_popular_message_table(
+    groups: dict[str, list[MessageSuperlative]], group_header: str, output_file: Path
+):
+    """Create table with the most popular messages of each group, ie: member or month"""
+    headers = [group_header] + list(MessageSuperlative.model_fields.keys())
+    rows = [
+        [group] + list(message.model_dump().values())
+        for group, messages in groups.items()
+        for message in messages
+    ]
+    messages_ranked = pd.DataFrame(rows, columns=headers)
+    messages_ranked.to_csv(output_file, sep=",", encoding="utf-8", index=False)
@@ -1,6 +1,7 @@
 """Template for message data requested from groupme API"""
 
 from enum import Enum
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -82,6 +83,77 @@ class ChatMessage(BaseModel):
     reactions: list[Reaction] | None = None
 
 
+ATTACHMENT_TYPES = {
+    attachment_type.value: attachment_type for attachment_type in AttachmentType
+}
+
+
+class ReactionRecord:
+    """Reaction fields used by analysis"""
+
+    __slots__ = ("code", "user_ids")
+
+    def __init__(self, code: str, user_ids: list[str]):
+        self.code = code
+        self.user_ids = user_ids
+
+
+class AttachmentRecord:
+    """Attachment fields used by analysis"""
+
+    __slots__ = ("type", "url")
+
+    def __init__(self, attachment_type: AttachmentType | None, url: str | None):
+        self.type = attachment_type
+        self.url = url
+
+
+class MessageRecord:
+    """Message fields used by analysis, decoded without validation
+
+    A lightweight alternative to `ChatMessage` for reading large archives. Fields that are
+    not used by analysis are skipped, and attachment types that are not an
+    `AttachmentType` are decoded as None rather than rejected
+    """
+
+    __slots__ = (
+        "id",
+        "created_at",
+        "user_id",
+        "name",
+        "text",
+        "attachments",
+        "favorited_by",
+        "reactions",
+    )
+
+    def __init__(self, message: dict[str, Any]):
+        self.id = int(message["id"])
+        self.created_at: int = message["created_at"]
+        self.user_id: str = message["user_id"]
+        self.name: str = message["name"]
+        self.text: str | None = message.get("text")
+        self.attachments = [
+            AttachmentRecord(
+                ATTACHMENT_TYPES.get(attachment["type"]), attachment.get("url")
+            )
+            for attachment in message.get("attachments") or []
+        ]
+        self.favorited_by: list[str] = message.get("favorited_by") or []
+        reactions = message.get("reactions")
+        self.reactions = (
+            None
+            if reactions is None
+            else [
+                ReactionRecord(reaction.get("code", ""), reaction["user_ids"])
+                for reaction in reactions
+            ]
+        )
+
+
+# A decoded message, validated or not
+Message = ChatMessage | MessageRecord
+
 LIKES = [
     reaction.value
     for reaction in [ReactionEmojis.HEART, ReactionEmojis.LIKE, ReactionEmojis.FIRE]
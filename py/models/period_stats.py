@@ -0,0 +1,217 @@
+"""Module to contain chat activity by day, aggregated to weeks, months and years"""
+
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from py.utils.time_buckets import EPOCH_WEEKDAY
+
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+# Day of the year of the first of each month, in a leap year
+MONTH_STARTS = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+DAYS_IN_LEAP_YEAR = 366
+# Prefix of the name of each keyword series, so keywords cannot replace other series or
+# the period column of tables
+KEYWORD_PREFIX = "keyword_"
+
+
+def keyword_series(name: str) -> str:
+    """Name of the series of messages including keyword `name`"""
+    return KEYWORD_PREFIX + name
+
+
+class Period(str, Enum):
+    """Periods that daily activity is aggregated to"""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class PeriodStats(BaseModel):
+    """Model to hold daily chat activity, from the first to the last day with a post"""
+
+    first_day: int | None = Field(
+        default=None,
+        description="Local date of the first day, as days since 1970-01-01, None if there "
+        "are no messages",
+    )
+    messages: list[int] = Field(
+        default_factory=list, description="Number of messages posted each day"
+    )
+    likes: list[int] = Field(
+        default_factory=list, description="Number of likes given to the posts of each day"
+    )
+    words: list[int] = Field(
+        default_factory=list, description="Number of words posted each day"
+    )
+    keywords: dict[str, list[int]] = Field(
+        default_factory=dict,
+        description="Number of messages posted each day that include each keyword",
+    )
+
+    @classmethod
+    def from_days(  # pylint: disable=too-many-arguments
+        cls,
+        post_days: np.ndarray,
+        words: np.ndarray,
+        like_days: np.ndarray,
+        keyword_names: list[str],
+        hit_keywords: np.ndarray,
+        hit_days: np.ndarray,
+    ) -> "PeriodStats":
+        """Count daily activity from the local day of each post, with its number of
+        words, of the post of each like and of the post of each keyword hit"""
+        if len(post_days) == 0:
+            return cls(keywords={name: [] for name in keyword_names})
+        first = int(post_days.min())
+        size = int(post_days.max()) - first + 1
+
+        def daily(days: np.ndarray, weights: np.ndarray | None = None) -> list[int]:
+            counts = np.bincount(days - first, weights=weights, minlength=size)
+            return counts.astype(np.int64).tolist()
+
+        return cls(
+            first_day=first,
+            messages=daily(post_days),
+            likes=daily(like_days),
+            words=daily(post_days, words),
+            keywords={
+                name: daily(hit_days[hit_keywords == keyword])
+                for keyword, name in enumerate(keyword_names)
+            },
+        )
+
+    @property
+    def series(self) -> dict[str, list[int]]:
+        """Each daily series, by name, keyword series are named by `keyword_series`"""
+        return {
+            "messages": self.messages,
+            "likes": self.likes,
+            "words": self.words,
+            **{keyword_series(name): counts for name, counts in self.keywords.items()},
+        }
+
+    def merge(self, other: "PeriodStats"):
+        """Add the daily activity of `other`, stats from a later set of messages"""
+        if other.first_day is None:
+            return
+        if self.first_day is None:
+            self.first_day = other.first_day
+        start = min(self.first_day, other.first_day)
+        end = max(
+            self.first_day + len(self.messages), other.first_day + len(other.messages)
+        )
+
+        def aligned(first: int, counts: list[int]) -> np.ndarray:
+            """`counts` from day `first`, padded with zeros to the merged days"""
+            padded = np.zeros(end - start, np.int64)
+            padded[first - start : first - start + len(counts)] = counts
+            return padded
+
+        for name in ["messages", "likes", "words"]:
+            counts = aligned(self.first_day, getattr(self, name)) + aligned(
+                other.first_day, getattr(other, name)
+            )
+            setattr(self, name, counts.tolist())
+        for name in dict.fromkeys([*self.keywords, *other.keywords]):
+            counts = aligned(self.first_day, self.keywords.get(name, [])) + aligned(
+                other.first_day, other.keywords.get(name, [])
+            )
+            self.keywords[name] = counts.tolist()
+        self.first_day = start
+
+    def aggregate(self, period: Period) -> tuple[list[str], dict[str, np.ndarray]]:
+        """Labels of each `period` from the first to the last day, and the total of each
+        series over each period"""
+        if self.first_day is None:
+            return [], {name: np.zeros(0, np.int64) for name in self.series}
+        days = np.arange(self.first_day, self.first_day + len(self.messages))
+        dates = days.astype("datetime64[D]")
+        if period == Period.DAY:
+            keys = days
+            labels = dates.astype(str).tolist()
+        elif period == Period.WEEK:
+            # Weeks start on Monday and are labelled by their first day
+            keys = (days + EPOCH_WEEKDAY) // 7
+            labels = [
+                str(np.datetime64(int(week) * 7 - EPOCH_WEEKDAY, "D"))
+                for week in np.unique(keys)
+            ]
+        else:
+            unit = "M" if period == Period.MONTH else "Y"
+            keys = dates.astype(f"datetime64[{unit}]").astype(np.int64)
+            labels = [
+                str(np.datetime64(int(key), unit)) for key in np.unique(keys)
+            ]
+        group = keys - keys[0]
+        return labels, {
+            name: np.bincount(group, weights=counts).astype(np.int64)
+            for name, counts in self.series.items()
+        }
+
+    def day_of_year_counts(self) -> tuple[list[str], np.ndarray]:
+        """Years, and the number of messages on each day of each year, indexed by year
+        then day of a leap year so that dates line up across years"""
+        if self.first_day is None:
+            return [], np.zeros((0, DAYS_IN_LEAP_YEAR), np.int64)
+        dates = np.arange(
+            self.first_day, self.first_day + len(self.messages)
+        ).astype("datetime64[D]")
+        years = dates.astype("datetime64[Y]")
+        months = dates.astype("datetime64[M]")
+        month = months.astype(np.int64) % 12
+        day_of_year = np.array(MONTH_STARTS)[month] + (dates - months).astype(np.int64)
+        year = (years - years[0]).astype(np.int64)
+        counts = np.zeros((int(year[-1]) + 1, DAYS_IN_LEAP_YEAR), np.int64)
+        np.add.at(counts, (year, day_of_year), self.messages)
+        labels = [str(years[0] + i) for i in range(len(counts))]
+        return labels, counts
+
+
+def period_table(period_stats: PeriodStats, period: Period, output_file: Path):
+    """Create a table of chat activity in each `period`"""
+    labels, totals = period_stats.aggregate(period)
+    table = pd.DataFrame({period.value: labels, **totals})
+    table.to_csv(output_file, sep=",", encoding="utf-8", index=False)
+
+
+def year_over_year_tables(
+    period_stats: PeriodStats, yearly_file: Path, monthly_file: Path
+):
+    """Create a table comparing the totals of each year, and a table of the messages of
+    each month by year"""
+    years, totals = period_stats.aggregate(Period.YEAR)
+    yearly = pd.DataFrame({"year": years, **totals})
+    messages = yearly["messages"].replace(0, np.nan)
+    yearly["words_per_message"] = (yearly["words"] / messages).round(2)
+    yearly["likes_per_message"] = (yearly["likes"] / messages).round(2)
+    yearly["messages_change_percent"] = (
+        yearly["messages"].pct_change(fill_method=None) * 100
+    ).round(1)
+    yearly.to_csv(yearly_file, sep=",", encoding="utf-8", index=False)
+
+    months, monthly_totals = period_stats.aggregate(Period.MONTH)
+    monthly = np.zeros((len(MONTHS), len(years)), np.int64)
+    for month, count in zip(months, monthly_totals["messages"].tolist()):
+        monthly[int(month[5:7]) - 1, years.index(month[:4])] = count
+    pd.DataFrame(monthly, columns=years, index=MONTHS).rename_axis("month").to_csv(
+        monthly_file, sep=",", encoding="utf-8"
+    )
@@ -0,0 +1,54 @@
+"""Metrics of a profiled run, saved next to the analysis outputs"""
+
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+
+class StageMetrics(BaseModel):
+    """Basemodel class to store the resources used by one stage of a run"""
+
+    name: str = Field(description="Name of the stage")
+    wall_time: float = Field(default=0.0, description="Elapsed time, in seconds")
+    cpu_time: float = Field(
+        default=0.0, description="CPU time of the thread that ran the stage, in seconds"
+    )
+    peak_memory: float = Field(
+        default=0.0,
+        description="Peak memory traced while the stage ran, in MiB. Concurrent stages "
+        "share the trace",
+    )
+    items: int | None = Field(
+        default=None, description="Number of messages or figures the stage handled"
+    )
+    items_per_second: float | None = Field(
+        default=None, description="Items handled per second of wall time"
+    )
+    request_latency: float | None = Field(
+        default=None,
+        description="Time until the response to the stage's request arrived, in seconds",
+    )
+
+
+class ProfileMetrics(BaseModel):
+    """Basemodel class to store the metrics of every stage of a profiled run"""
+
+    stages: list[StageMetrics] = Field(
+        default_factory=list, description="Metrics of each stage, in the order they ended"
+    )
+    max_rss: float | None = Field(
+        default=None,
+        description="Maximum resident memory of the process, in MiB, None if the "
+        "platform does not report it",
+    )
+    slowest_stage: str | None = Field(
+        default=None, description="Name of the stage with the longest wall time"
+    )
+    cprofile_file: str | None = Field(
+        default=None, description="cProfile statistics of the slowest stage, if saved"
+    )
+
+    def save(self, metrics_file: Path):
+        """Write metrics to `metrics_file`"""
+        with open(metrics_file, "w", encoding="utf-8") as file:
+            file.write(self.model_dump_json(indent=4))
@@ -0,0 +1,130 @@
+"""Sparse matrices of reactions between chat members"""
+
+from typing import Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+
+class CountMatrix(BaseModel):
+    """Sparse square matrix of counts, indexed by receiving and giving member
+
+    Only nonzero counts are stored, so memory grows with the number of member pairs that
+    reacted to each other rather than with the square of the number of members
+    """
+
+    counts: dict[int, dict[int, int]] = Field(
+        default_factory=dict,
+        description="Nonzero counts, by receiving member index then giving member index",
+    )
+
+    @classmethod
+    def from_pairs(
+        cls, receivers: np.ndarray, givers: np.ndarray, size: int
+    ) -> "CountMatrix":
+        """Count (receiver, giver) member index pairs"""
+        keys, totals = np.unique(
+            receivers.astype(np.int64) * size + givers, return_counts=True
+        )
+        matrix = cls()
+        for key, total in zip(keys.tolist(), totals.tolist()):
+            matrix.counts.setdefault(key // size, {})[key % size] = total
+        return matrix
+
+    def add(self, receiver: int, giver: int, count: int = 1):
+        """Add `count` to the (receiver, giver) count"""
+        row = self.counts.get(receiver)
+        if row is None:
+            row = self.counts[receiver] = {}
+        row[giver] = row.get(giver, 0) + count
+
+    def transpose(self) -> "CountMatrix":
+        """Matrix indexed by giving member then receiving member"""
+        matrix = CountMatrix()
+        for receiver, row in self.counts.items():
+            for giver, count in row.items():
+                matrix.add(giver, receiver, count)
+        return matrix
+
+    def merge(self, other: "CountMatrix", index_map: Sequence[int]):
+        """Add the counts of `other`, whose member `i` is member `index_map[i]` here
+
+        Counts of members mapped to a negative index are dropped
+        """
+        for receiver, row in other.counts.items():
+            receiver = int(index_map[receiver])
+            if receiver < 0:
+                continue
+            for giver, count in row.items():
+                giver = int(index_map[giver])
+                if giver >= 0:
+                    self.add(receiver, giver, count)
+
+    def total(self) -> int:
+        """Sum of all counts"""
+        return sum(sum(row.values()) for row in self.counts.values())
+
+    def row_sums(self, size: int) -> list[int]:
+        """Sum of each of the first `size` rows"""
+        return [sum(self.counts.get(receiver, {}).values()) for receiver in range(size)]
+
+    def row_max(self, receiver: int) -> tuple[int, int]:
+        """Giver with the largest count in row `receiver`, the first on ties, and the
+        count"""
+        row = self.counts.get(receiver)
+        if not row:
+            return 0, 0
+        giver = min(row, key=lambda giver: (-row[giver], giver))
+        return giver, row[giver]
+
+    def dense(self, size: int) -> np.ndarray:
+        """Counts as a `size` x `size` array"""
+        array = np.zeros((size, size), dtype=np.int64)
+        for receiver, row in self.counts.items():
+            array[receiver, list(row)] = list(row.values())
+        return array
+
+
+class ReactionMatrices(BaseModel):
+    """Reactions, hearts and dislikes each member received from each other member"""
+
+    members: list[str] = Field(
+        default_factory=list, description="Member names, by matrix index"
+    )
+    reactions: CountMatrix = Field(
+        default_factory=CountMatrix, description="Reactions received, by sender"
+    )
+    hearts: CountMatrix = Field(
+        default_factory=CountMatrix, description="Hearts / likes received, by sender"
+    )
+    dislikes: CountMatrix = Field(
+        default_factory=CountMatrix,
+        description="Dislikes (dislike, question) received, by sender",
+    )
+
+    def merge(self, other: "ReactionMatrices"):
+        """Add the counts of `other`, matching members by name"""
+        index = {name: i for i, name in enumerate(self.members)}
+        for name in other.members:
+            if name not in index:
+                index[name] = len(self.members)
+                self.members.append(name)
+        index_map = [index[name] for name in other.members]
+        self.reactions.merge(other.reactions, index_map)
+        self.hearts.merge(other.hearts, index_map)
+        self.dislikes.merge(other.dislikes, index_map)
+
+    def biggest_fans(self) -> list[tuple[str, int]]:
+        """Member who gave each member the most hearts, and the number of hearts"""
+        return [
+            (self.members[giver], count)
+            for giver, count in map(self.hearts.row_max, range(len(self.members)))
+        ]
+
+    def biggest_supported(self) -> list[tuple[str, int]]:
+        """Member each member gave the most hearts to, and the number of hearts"""
+        hearts_given = self.hearts.transpose()
+        return [
+            (self.members[receiver], count)
+            for receiver, count in map(hearts_given.row_max, range(len(self.members)))
+        ]
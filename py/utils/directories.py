@@ -14,6 +14,8 @@ class FileData:
     log_dir: Path = BASE_PATH / "logs"
     analysis_configs: Path = BASE_PATH / "analysis_configs"
     results_dir: Path = BASE_PATH / "output_figures"
+    cache_dir: Path = BASE_PATH / "cache"
+    benchmark_dir: Path = BASE_PATH / "benchmarks"
 
     # Heatmap results
     heatmap_folder: str = "reaction_heatmaps"
@@ -34,9 +36,34 @@ class FileData:
 
     # Tables
     popular_messages: str = "most_popular_messages.csv"
+    popular_messages_by_member: str = "most_popular_messages_by_member.csv"
+    popular_messages_by_month: str = "most_popular_messages_by_month.csv"
     member_summary: str = "member_summary.csv"
     chat_summary: str = "chat_summary.csv"
 
+    # Saved analysis state
+    analysis_state: str = "analysis_state.json"
+    config_stamp: str = "analysis_config.json"
+
+    # Profiling
+    profile_metrics: str = "profile_metrics.json"
+    profile_stats: str = "slowest_stage.prof"
+
     # Chat Activity
+    post_frequency_folder: str = "post_frequency"
     daily: str = "_daily_post_distribution"
     weekly: str = "_weekly_post_distribution"
+    day_and_hour: str = "_day_and_hour_post_distribution"
+
+    # Activity over time
+    period_folder: str = "activity_over_time"
+    period_table: str = "activity_by_{}.csv"
+    monthly_activity: str = "monthly_activity.png"
+    monthly_keywords: str = "monthly_keywords.png"
+    activity_calendar: str = "activity_calendar.png"
+    year_over_year: str = "year_over_year.csv"
+    messages_by_month_and_year: str = "messages_by_month_and_year.csv"
+
+    # Chat fetch
+    checkpoint_suffix: str = ".checkpoint"
+    columnar_suffix: str = ".gmcol"
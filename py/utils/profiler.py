@@ -0,0 +1,118 @@
+"""Record the resources used by each stage of a run"""
+
+import cProfile
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from py.models.profile_metrics import ProfileMetrics, StageMetrics
+from py.utils.directories import FileData
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+LOG = logging.getLogger(__name__)
+
+
+def max_rss(children: bool = False) -> float | None:
+    """Maximum resident memory (MiB) of this process, or of its largest finished child
+    process if `children`, None on platforms that do not report it"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(
+        resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    )
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return usage.ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+class Profiler:
+    """Measure wall time, CPU time and peak traced memory of named stages
+
+    A disabled profiler measures nothing, so stages can always be wrapped. With `cprofile`,
+    each stage is also run under cProfile and the statistics of the slowest stage are kept.
+    Stages may run on several threads, CPU time is that of the stage's thread. Only one
+    stage is run under cProfile at a time, stages that overlap it are only timed
+    """
+
+    def __init__(self, enabled: bool = True, cprofile: bool = False):
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.metrics = ProfileMetrics()
+        self.slowest: cProfile.Profile | None = None
+        self.profiling = False
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Measure the stage run in the context, the yielded metrics take item counts"""
+        metrics = StageMetrics(name=name)
+        if not self.enabled:
+            yield metrics
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profile: cProfile.Profile | None = None
+        with self.lock:
+            if self.cprofile and not self.profiling:
+                self.profiling = True
+                profile = cProfile.Profile()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield metrics
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.profiling = False
+            metrics.cpu_time = time.thread_time() - cpu_start
+            metrics.wall_time = time.perf_counter() - wall_start
+            metrics.peak_memory = tracemalloc.get_traced_memory()[1] / 2**20
+            if metrics.items is not None and metrics.wall_time > 0:
+                metrics.items_per_second = metrics.items / metrics.wall_time
+            self.record(metrics, profile)
+
+    def record(self, metrics: StageMetrics, profile: cProfile.Profile | None):
+        """Add the metrics of a finished stage"""
+        with self.lock:
+            slowest = max(
+                self.metrics.stages,
+                key=lambda stage: stage.wall_time,
+                default=None,
+            )
+            if slowest is None or metrics.wall_time > slowest.wall_time:
+                self.metrics.slowest_stage = metrics.name
+                self.slowest = profile
+            self.metrics.stages.append(metrics)
+        LOG.debug("%s took %.3f s", metrics.name, metrics.wall_time)
+
+    def save(self, output_dir: Path):
+        """Write the metrics, and the cProfile statistics of the slowest stage, to
+        `output_dir`"""
+        if not self.enabled:
+            return
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.metrics.max_rss = max_rss()
+        if self.slowest is not None:
+            cprofile_file = output_dir / FileData.profile_stats
+            self.slowest.dump_stats(cprofile_file)
+            self.metrics.cprofile_file = str(cprofile_file)
+        metrics_file = output_dir / FileData.profile_metrics
+        self.metrics.save(metrics_file)
+        LOG.info(
+            "Saved profile metrics to %s, slowest stage: %s",
+            metrics_file,
+            self.metrics.slowest_stage,
+        )
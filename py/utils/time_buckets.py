@@ -0,0 +1,117 @@
+"""Vectorized conversion of message timestamps to local time buckets"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from py.utils.utility import DAYS, HOURS
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+# Spacing of the offsets sampled to find time zone transitions, transitions are assumed
+# to be further apart than this
+SAMPLE_SPACING = 6 * SECONDS_PER_HOUR
+# 1970-01-01 was a Thursday
+EPOCH_WEEKDAY = 3
+
+
+def utc_offset(timestamp: int, zone: ZoneInfo | None) -> int:
+    """Offset from UTC of `zone`, or the local time zone if None, at `timestamp` (s)"""
+    date = datetime.fromtimestamp(timestamp, timezone.utc).astimezone(zone)
+    return int(date.utcoffset().total_seconds())  # type: ignore[union-attr]
+
+
+def local_datetime(timestamp: int, zone: ZoneInfo | None) -> datetime:
+    """Naive datetime of `timestamp` in `zone`, or the local time zone if None"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).astimezone(zone).replace(
+        tzinfo=None
+    )
+
+
+def utc_offsets(timestamps: np.ndarray, zone: ZoneInfo | None) -> np.ndarray:
+    """Offset from UTC of `zone` at each of `timestamps`, in seconds
+
+    Offsets are sampled across the range of `timestamps`, and each change between samples
+    is narrowed down to the second of the transition by bisection. Offsets are then looked
+    up for every timestamp at once, so the time zone is only queried a few times per day
+    of the range rather than once per timestamp
+    """
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=np.int64)
+    first, last = int(timestamps.min()), int(timestamps.max())
+    samples = list(range(first, last, SAMPLE_SPACING)) + [last]
+    offsets = [utc_offset(sample, zone) for sample in samples]
+
+    transitions: list[int] = []
+    transition_offsets: list[int] = [offsets[0]]
+    for i in range(1, len(samples)):
+        if offsets[i] == offsets[i - 1]:
+            continue
+        # The offset changes in (low, high]
+        low, high = samples[i - 1], samples[i]
+        while high - low > 1:
+            middle = (low + high) // 2
+            if utc_offset(middle, zone) == offsets[i - 1]:
+                low = middle
+            else:
+                high = middle
+        transitions.append(high)
+        transition_offsets.append(offsets[i])
+    return np.array(transition_offsets, dtype=np.int64)[
+        np.searchsorted(np.array(transitions, dtype=np.int64), timestamps, side="right")
+    ]
+
+
+def month_label(month: int) -> str:
+    """Label of a month counted from 1970-01, as YYYY-MM"""
+    return f"{1970 + month // 12}-{month % 12 + 1:02d}"
+
+
+def month_labels(months: np.ndarray) -> list[str]:
+    """Label of each of `months`, counted from 1970-01, as YYYY-MM"""
+    labels = {month: month_label(month) for month in np.unique(months).tolist()}
+    return [labels[month] for month in months.tolist()]
+
+
+@dataclass
+class TimeBuckets:
+    """Local hour, weekday, date and month of each of a column of timestamps"""
+
+    # Hour of the day, 0 - 23
+    hour: np.ndarray
+    # Day of the week, 0 is Monday
+    weekday: np.ndarray
+    # Local date, as days since 1970-01-01
+    day: np.ndarray
+    # Local month, as months since 1970-01
+    month: np.ndarray
+
+    @classmethod
+    def from_timestamps(
+        cls, timestamps: np.ndarray, zone: ZoneInfo | None
+    ) -> "TimeBuckets":
+        """Bucket `timestamps` (s) in `zone`, or the local time zone if None"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        local = timestamps + utc_offsets(timestamps, zone)
+        day = local // SECONDS_PER_DAY
+        return cls(
+            hour=(local % SECONDS_PER_DAY // SECONDS_PER_HOUR).astype(np.int8),
+            weekday=((day + EPOCH_WEEKDAY) % 7).astype(np.int8),
+            day=day.astype(np.int32),
+            month=day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32),
+        )
+
+    def day_and_hour_counts(self, groups: np.ndarray, num_groups: int) -> np.ndarray:
+        """Number of timestamps in each group, weekday and hour, indexed in that order
+
+        `groups` is the group index of each timestamp, timestamps with a negative group are
+        not counted
+        """
+        counted = groups >= 0
+        keys = groups[counted].astype(np.int64) * len(DAYS) + self.weekday[counted]
+        return np.bincount(
+            keys * len(HOURS) + self.hour[counted],
+            minlength=num_groups * len(DAYS) * len(HOURS),
+        ).reshape(num_groups, len(DAYS), len(HOURS))
@@ -0,0 +1,40 @@
+"""Bounded top-K selection"""
+
+import heapq
+from itertools import count
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """Keep the `k` items with the largest (likes, message id) keys in a min heap
+
+    The smallest kept key is at the root of the heap, so an item is only kept if it beats
+    it. Ties in likes keep the message with the higher id, so the items kept do not depend
+    on the order they are pushed in
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        # (likes, message id, push order, item), push order keeps items from being compared
+        self.heap: list[tuple[int, int, int, T]] = []
+        self.order = count()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, likes: int, message_id: int, item: T):
+        """Keep `item` if its key is one of the `k` largest pushed so far"""
+        entry = (likes, message_id, next(self.order), item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif self.heap and entry[:3] > self.heap[0][:3]:
+            heapq.heapreplace(self.heap, entry)
+
+    def ranked(self) -> list[T]:
+        """Kept items, largest key first"""
+        return [
+            entry[-1]
+            for entry in sorted(self.heap, key=lambda entry: entry[:3], reverse=True)
+        ]
@@ -0,0 +1,302 @@
+"""Check that every analysis engine, whole or in chunks, gives identical results"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from py.benchmarks.synthetic_chat import SyntheticChat, write_synthetic_chat
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.data_processing.columnar_archive import convert_chat
+from py.models.analysis_config import AnalysisConfig, ChatKeywords
+from py.utils.directories import FileData
+
+HEART = "❤️"
+THUMBS_DOWN = "\U0001f44e"
+LAUGH = "\U0001f602"
+
+
+def message(  # pylint: disable=too-many-arguments
+    index: int,
+    created_at: int,
+    user_id: str,
+    name: str,
+    text: str | None,
+    favorited_by: list[str] | None = None,
+    reactions: list[dict[str, Any]] | None = None,
+    attachments: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Message as returned by the GroupMe API"""
+    return {
+        "attachments": attachments or [],
+        "created_at": created_at,
+        "favorited_by": favorited_by or [],
+        "id": str(10**17 + index),
+        "name": name,
+        "reactions": reactions,
+        "sender_id": user_id,
+        "text": text,
+        "user_id": user_id,
+    }
+
+
+def reaction(code: str, *user_ids: str) -> dict[str, Any]:
+    """Reaction of `user_ids` with emoji `code`"""
+    return {"type": "unicode", "code": code, "user_ids": list(user_ids)}
+
+
+# Messages newest first: GroupMe posts, a member who changes name, Copilot, a user who only
+# reacts, null and empty texts, image and poll attachments, reactions that are None or
+# empty and posts either side of both daylight saving time changes of America/New_York
+EDGE_MESSAGES = [
+    message(20, 1_730_617_200, "1", "Ann", "after the fall back meme", ["2", "9"]),
+    message(19, 1_730_613_600, "3", "Cy Two", "lol", ["1"], [reaction(HEART, "1")]),
+    message(18, 1_730_611_800, "2", "Bo", "one thirty the first time", [], []),
+    message(17, 1_730_610_000, "calendar", "GroupMe Calendar", "Event tomorrow"),
+    message(16, 1_710_058_200, "1", "Ann", "", ["3"], [reaction(THUMBS_DOWN, "3")]),
+    message(15, 1_710_054_600, "4", "Copilot", "Here is a meme", ["1", "2"]),
+    message(
+        14,
+        1_710_054_000,
+        "2",
+        "Bo",
+        None,
+        ["1", "3", "9"],
+        [reaction(HEART, "1", "9"), reaction(LAUGH, "3")],
+        [{"type": "image", "url": "https://i.groupme.com/14.jpeg"}],
+    ),
+    message(13, 1_710_053_400, "3", "Cy One", "just before spring forward lol lol"),
+    message(12, 1_710_050_000, "system", "GroupMe", "Bo changed the topic", ["1"]),
+    message(
+        11,
+        1_710_000_000,
+        "1",
+        "Ann",
+        "vote now",
+        ["2", "3"],
+        [reaction(HEART, "2"), reaction(THUMBS_DOWN, "3")],
+        [{"type": "poll", "poll_id": "11"}],
+    ),
+    message(10, 1_709_990_000, "2", "Bo", "a thread about twitter", ["1", "9"]),
+    message(9, 1_709_900_000, "3", "Cy One", "Twitter meme", ["1", "2", "9"]),
+    message(8, 1_709_800_000, "2", "Bo", "first", None, None),
+]
+
+
+def write_lines(messages: list[dict[str, Any]], path: Path):
+    """Write `messages` one json message per line, as `FetchChat.fetch_chat` does"""
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(json.dumps(message) + "\n" for message in messages)
+
+
+def run_analysis(
+    config: AnalysisConfig,
+    chat_path: Path,
+    engine: AnalysisEngine,
+    chunk_size: int | None = None,
+    chunk_workers: int = 1,
+) -> dict[str, Any]:
+    """Member stats of `chat_path` computed by `engine`"""
+    analysis = Analysis(
+        config, chat_path, engine, chunk_size=chunk_size, chunk_workers=chunk_workers
+    )
+    analysis.get_member_stats()
+    return analysis.results().model_dump()
+
+
+class ChatTestCase(unittest.TestCase):
+    """Analysis of chats written to a temporary directory"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def config(self, **fields: Any) -> AnalysisConfig:
+        """Analysis config writing its outputs to the temporary directory, unless
+        `fields` set them"""
+        return AnalysisConfig(
+            **{
+                "output_folder": str(self.directory / "outputs"),
+                "num_messages_rank": 3,
+                **fields,
+            }
+        )
+
+    def edge_chat(self) -> Path:
+        """Archive of `EDGE_MESSAGES`"""
+        chat_path = self.directory / "edge.json"
+        write_lines(EDGE_MESSAGES, chat_path)
+        return chat_path
+
+    def synthetic_chat(self, messages: int = 3_000) -> tuple[Path, SyntheticChat]:
+        """Archive of a synthetic chat of `messages` messages"""
+        chat = SyntheticChat(messages=messages, seed=7)
+        chat_path = self.directory / "synthetic.json"
+        write_synthetic_chat(chat, chat_path)
+        return chat_path, chat
+
+
+class EngineParityTest(ChatTestCase):
+    """Results of every engine on small edge case chats and on a synthetic chat"""
+
+    def assert_engines_agree(self, config: AnalysisConfig, chat_path: Path):
+        """Every engine gives the results of the python engine"""
+        reference = run_analysis(config, chat_path, AnalysisEngine.PYTHON)
+        for engine in AnalysisEngine:
+            with self.subTest(engine=engine.value):
+                self.assertEqual(run_analysis(config, chat_path, engine), reference)
+
+    def test_edge_chat(self):
+        config = self.config(
+            chat_keywords=[
+                ChatKeywords(aliases=["meme"]),
+                ChatKeywords(aliases=["lol", "twitter"], name="Laughs"),
+            ],
+            timezone="America/New_York",
+        )
+        self.assert_engines_agree(config, self.edge_chat())
+
+    def test_edge_chat_with_copilot(self):
+        config = self.config(exclude_copilot=False, timezone="America/New_York")
+        self.assert_engines_agree(config, self.edge_chat())
+
+    def test_edge_chat_json_array(self):
+        chat_path = self.directory / "edge_array.json"
+        chat_path.write_text(json.dumps(EDGE_MESSAGES, indent=4), encoding="utf-8")
+        config = self.config(timezone="America/New_York")
+        self.assertEqual(
+            run_analysis(config, chat_path, AnalysisEngine.PYTHON),
+            run_analysis(config, self.edge_chat(), AnalysisEngine.PYTHON),
+        )
+        self.assert_engines_agree(config, chat_path)
+
+    def test_edge_chat_unescaped_utf8(self):
+        # Byte offsets of messages the python engine reads again differ from characters
+        messages = [
+            {**message, "text": f"{message['text']} café ❤️"}
+            for message in EDGE_MESSAGES
+        ]
+        escaped = self.directory / "edge_escaped.json"
+        write_lines(messages, escaped)
+        unescaped = self.directory / "edge_utf8.json"
+        with open(unescaped, "w", encoding="utf-8") as file:
+            file.writelines(
+                json.dumps(message, ensure_ascii=False) + "\n" for message in messages
+            )
+        config = self.config(timezone="America/New_York")
+        self.assertEqual(
+            run_analysis(config, unescaped, AnalysisEngine.PYTHON),
+            run_analysis(config, escaped, AnalysisEngine.PYTHON),
+        )
+        self.assert_engines_agree(config, unescaped)
+
+    def test_chat_without_reactions_or_attachments(self):
+        # Child frames of the dataframe engine are empty
+        chat_path = self.directory / "bare.json"
+        write_lines(
+            [
+                message(3, 1_710_000_000, "1", "Ann", "meme"),
+                message(2, 1_709_000_000, "2", "Bo", None),
+                message(1, 1_708_000_000, "system", "GroupMe", "Ann joined"),
+            ],
+            chat_path,
+        )
+        config = self.config(chat_keywords=[ChatKeywords(aliases=["meme"])])
+        self.assert_engines_agree(config, chat_path)
+
+    def test_chat_without_members(self):
+        for name, messages in [
+            ("empty", []),
+            ("system", [message(1, 1_708_000_000, "system", "GroupMe", "Hi", ["1"])]),
+        ]:
+            with self.subTest(chat=name):
+                chat_path = self.directory / f"{name}.json"
+                write_lines(messages, chat_path)
+                config = self.config(chat_keywords=[ChatKeywords(aliases=["meme"])])
+                self.assert_engines_agree(config, chat_path)
+
+    def test_synthetic_chat(self):
+        chat_path, chat = self.synthetic_chat()
+        config = self.config(
+            chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+            timezone="UTC",
+        )
+        self.assert_engines_agree(config, chat_path)
+
+    def test_columnar_archive(self):
+        chat_path, chat = self.synthetic_chat()
+        archive_path = chat_path.with_suffix(FileData.columnar_suffix)
+        convert_chat(chat_path, archive_path, chunk_size=1_000)
+        config = self.config(
+            chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+            timezone="UTC",
+        )
+        self.assertEqual(
+            run_analysis(config, archive_path, AnalysisEngine.COLUMNAR),
+            run_analysis(config, chat_path, AnalysisEngine.PYTHON),
+        )
+
+    def test_columnar_archive_is_closed(self):
+        chat_path = self.edge_chat()
+        archive_path = chat_path.with_suffix(FileData.columnar_suffix)
+        convert_chat(chat_path, archive_path)
+        analysis = Analysis(self.config(), archive_path)
+        analysis.get_member_stats()
+        assert analysis.columnar_archive is not None
+        self.assertTrue(analysis.columnar_archive.map.closed)
+        self.assertTrue(analysis.columnar_archive.file.closed)
+        self.assertTrue(analysis.best_messages)
+
+
+class ChunkedAnalysisTest(ChatTestCase):
+    """Results of analyzing chats in chunks of messages and whole"""
+
+    def assert_chunks_agree(
+        self, config: AnalysisConfig, chat_path: Path, sizes: list[int]
+    ):
+        """Every engine gives the same results in chunks of each of `sizes` as whole"""
+        for engine in AnalysisEngine:
+            reference = run_analysis(config, chat_path, engine)
+            for chunk_size in sizes:
+                with self.subTest(engine=engine.value, chunk_size=chunk_size):
+                    self.assertEqual(
+                        run_analysis(config, chat_path, engine, chunk_size), reference
+                    )
+
+    def test_edge_chat_chunks(self):
+        config = self.config(
+            chat_keywords=[ChatKeywords(aliases=["meme", "lol"])],
+            timezone="America/New_York",
+        )
+        self.assert_chunks_agree(config, self.edge_chat(), [1, 2, 5, 100])
+
+    def test_synthetic_chat_chunks(self):
+        chat_path, chat = self.synthetic_chat()
+        config = self.config(
+            chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+            timezone="UTC",
+        )
+        self.assert_chunks_agree(config, chat_path, [700, 1_000])
+
+    def test_chunk_workers(self):
+        chat_path, chat = self.synthetic_chat()
+        config = self.config(
+            chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+            timezone="UTC",
+        )
+        self.assertEqual(
+            run_analysis(config, chat_path, AnalysisEngine.PYTHON, 700, chunk_workers=2),
+            run_analysis(config, chat_path, AnalysisEngine.PYTHON),
+        )
+
+    def test_empty_chat_chunks(self):
+        chat_path = self.directory / "empty.json"
+        write_lines([], chat_path)
+        config = self.config(chat_keywords=[ChatKeywords(aliases=["meme"])])
+        self.assert_chunks_agree(config, chat_path, [10])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""Check that chats fetched from the mock GroupMe API are complete and exact"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from py.benchmarks.synthetic_chat import SyntheticChat, write_synthetic_chat
+from py.data_processing.chat_reader import iter_message_dicts
+from py.groupme_api.fetch_chat import FetchChat
+from py.groupme_api.mock_server import Faults, MessageStore, MockGroupMeServer
+from py.models.analysis_config import AnalysisConfig
+from py.models.fetch_checkpoint import FetchCheckpoint
+
+# A message cut off when a fetch is killed while writing it
+PARTIAL_MESSAGE = b'{"attachments": [], "created_at": 17'
+
+
+class CrashAfter:
+    """Side effect of `FetchCheckpoint.save` that saves `saves` checkpoints, then raises
+    as if the fetch was killed before the next checkpoint was saved"""
+
+    def __init__(self, saves: int):
+        self.saves = saves
+        self.save = FetchCheckpoint.save
+
+    def __call__(self, checkpoint: FetchCheckpoint, checkpoint_file: Path):
+        if self.saves == 0:
+            raise KeyboardInterrupt
+        self.saves -= 1
+        self.save(checkpoint, checkpoint_file)
+
+
+class FetchChatTest(unittest.TestCase):
+    """Fetches of a synthetic chat from the mock GroupMe API"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        chat_path = self.directory / "synthetic.json"
+        write_synthetic_chat(SyntheticChat(messages=1_050, seed=3), chat_path)
+        self.store = MessageStore.from_archive(chat_path)
+        self.output_file = self.directory / "chat.json"
+        self.config = AnalysisConfig(
+            message_request_limit=100,
+            requests_per_second=1_000,
+            max_retries=20,
+            retry_backoff=0.01,
+            retry_backoff_max=0.1,
+        )
+
+    def fetcher(self, server: MockGroupMeServer) -> FetchChat:
+        """Fetch of the chat served by `server` to the output file"""
+        return FetchChat(
+            "test", "token", self.output_file, self.config, api_base_url=server.base_url
+        )
+
+    def fetched_ids(self) -> list[str]:
+        """Ids of the messages in the output file, in file order"""
+        return [str(message["id"]) for message in iter_message_dicts(self.output_file)]
+
+    def expected_ids(self, store: MessageStore | None = None) -> list[str]:
+        """Ids of the messages of `store`, newest first"""
+        return [str(message["id"]) for message in (store or self.store).messages]
+
+    def interrupt(self, fetch, saves: int):
+        """Run `fetch`, killing it after `saves` checkpoints with a page written but not
+        checkpointed, then leave a partly written message at the end of the output file"""
+        with mock.patch.object(
+            FetchCheckpoint, "save", autospec=True, side_effect=CrashAfter(saves)
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                fetch()
+        with open(self.output_file, "ab") as file:
+            file.write(PARTIAL_MESSAGE)
+
+    def test_fetch_with_faults(self):
+        faults = Faults(
+            jitter=0.002,
+            throttle_rate=0.15,
+            retry_after=0.0,
+            error_rate=0.15,
+            drop_rate=0.1,
+            seed=1,
+        )
+        self.config.message_request_limit = 50
+        with MockGroupMeServer(self.store, faults) as server:
+            fetcher = self.fetcher(server)
+            with self.assertLogs("py.groupme_api", "WARNING"):
+                fetcher.fetch_chat()
+        self.assertFalse(fetcher.fetch_failed)
+        self.assertEqual(self.fetched_ids(), self.expected_ids())
+        self.assertGreater(fetcher.scheduler.retries, 0)
+        for outcome in ["429", "503", "dropped"]:
+            self.assertGreater(server.responses[outcome], 0, server.responses)
+
+    def test_resume_after_failed_fetch(self):
+        self.config.max_retries = 0
+        checkpoint_file = self.output_file.with_suffix(".checkpoint")
+        failures = 0
+        with MockGroupMeServer(self.store, Faults(error_rate=0.2, seed=2)) as server:
+            for _ in range(50):
+                fetcher = self.fetcher(server)
+                with self.assertLogs("py.groupme_api", "INFO"):
+                    fetcher.fetch_chat()
+                failures += fetcher.fetch_failed
+                checkpoint = FetchCheckpoint.load(checkpoint_file)
+                if checkpoint is not None and checkpoint.complete:
+                    break
+        self.assertGreater(failures, 0)
+        self.assertEqual(self.fetched_ids(), self.expected_ids())
+
+    def test_update_pages_after_newest_message(self):
+        older = MessageStore(self.store.messages[430:])
+        with MockGroupMeServer(older) as server:
+            self.fetcher(server).fetch_chat()
+        with MockGroupMeServer(self.store) as server:
+            self.fetcher(server).update_chat()
+            size = self.output_file.stat().st_size
+            self.fetcher(server).update_chat()
+        # Pages after `after_id` are appended oldest first
+        self.assertEqual(
+            self.fetched_ids(),
+            self.expected_ids(older) + self.expected_ids()[:430][::-1],
+        )
+        self.assertEqual(self.output_file.stat().st_size, size)
+        checkpoint = FetchCheckpoint.load(self.output_file.with_suffix(".checkpoint"))
+        assert checkpoint is not None
+        self.assertEqual(checkpoint.newest_id, self.expected_ids()[0])
+
+    def test_update_json_array(self):
+        older = MessageStore(self.store.messages[430:])
+        self.output_file.write_text(json.dumps(older.messages, indent=4), "utf-8")
+        with MockGroupMeServer(self.store) as server:
+            self.fetcher(server).update_chat()
+        self.assertEqual(
+            self.fetched_ids(),
+            self.expected_ids(older) + self.expected_ids()[:430][::-1],
+        )
+
+    def test_resume_after_crash(self):
+        with MockGroupMeServer(self.store) as server:
+            self.interrupt(self.fetcher(server).fetch_chat, saves=3)
+            self.fetcher(server).fetch_chat()
+        self.assertEqual(self.fetched_ids(), self.expected_ids())
+        checkpoint = FetchCheckpoint.load(self.output_file.with_suffix(".checkpoint"))
+        self.assertIsNotNone(checkpoint)
+        assert checkpoint is not None
+        self.assertTrue(checkpoint.complete)
+        self.assertEqual(checkpoint.archive_size, self.output_file.stat().st_size)
+
+    def test_update_after_crash(self):
+        older = MessageStore(self.store.messages[430:])
+        with MockGroupMeServer(older) as server:
+            self.fetcher(server).fetch_chat()
+        with MockGroupMeServer(self.store) as server:
+            self.interrupt(self.fetcher(server).update_chat, saves=2)
+            self.fetcher(server).update_chat()
+        fetched = self.fetched_ids()
+        self.assertEqual(len(fetched), len(set(fetched)))
+        self.assertEqual(sorted(fetched, key=int, reverse=True), self.expected_ids())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""Check that incremental analysis gives the results of a full analysis"""
+
+import json
+import unittest
+from pathlib import Path
+from typing import Any
+
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.models.analysis_config import AnalysisConfig, ChatKeywords
+from tests.test_engines import (
+    EDGE_MESSAGES,
+    ChatTestCase,
+    message,
+    run_analysis,
+    write_lines,
+)
+
+LOGGER = "py.data_processing.analysis"
+FOLDED = "Folding"
+FULL = "Analyzing every message"
+
+# Messages appended to the older edge messages, from members who keep their names
+NEW_MESSAGES = [
+    message(21, 1_730_700_000, "2", "Bo", "a new meme", ["1", "3"]),
+    message(22, 1_730_800_000, "1", "Ann", "lol", ["2", "3", "9"]),
+    message(23, 1_730_900_000, "system", "GroupMe", "Ann pinned a message"),
+]
+
+
+def append_lines(messages: list[dict[str, Any]], path: Path):
+    """Append `messages` one json message per line, as `FetchChat.update_chat` does"""
+    with open(path, "a", encoding="utf-8") as file:
+        file.writelines(json.dumps(message) + "\n" for message in messages)
+
+
+class IncrementalAnalysisTest(ChatTestCase):
+    """Incremental analyses of chats appended to, rewritten or analyzed differently"""
+
+    def incremental(
+        self,
+        config: AnalysisConfig,
+        chat_path: Path,
+        engine: AnalysisEngine = AnalysisEngine.PYTHON,
+    ) -> tuple[dict[str, Any], str]:
+        """Member stats of an incremental analysis of `chat_path` and whether it folded
+        new messages or analyzed every message, its log is kept in `logs`"""
+        analysis = Analysis(config, chat_path, engine)
+        with self.assertLogs(LOGGER, "INFO") as logs:
+            analysis.get_incremental_member_stats()
+        self.logs = logs.output
+        kinds = [
+            kind for kind in [FOLDED, FULL] if any(kind in line for line in logs.output)
+        ]
+        self.assertEqual(len(kinds), 1, logs.output)
+        return analysis.results().model_dump(), kinds[0]
+
+    def older_edge_chat(self) -> Path:
+        """Archive of the edge messages before the last two, newest first"""
+        chat_path = self.directory / "edge.json"
+        write_lines(EDGE_MESSAGES[2:], chat_path)
+        return chat_path
+
+    def edge_config(self, **fields: Any) -> AnalysisConfig:
+        """Config counting keywords of the edge messages"""
+        return self.config(
+            chat_keywords=[ChatKeywords(aliases=["meme", "lol"])],
+            timezone="America/New_York",
+            **fields,
+        )
+
+    def test_appended_messages_are_folded(self):
+        for engine in AnalysisEngine:
+            with self.subTest(engine=engine.value):
+                config = self.edge_config(
+                    output_folder=str(self.directory / engine.value)
+                )
+                chat_path = self.older_edge_chat()
+                self.assertEqual(self.incremental(config, chat_path, engine)[1], FULL)
+                for new_message in NEW_MESSAGES:
+                    append_lines([new_message], chat_path)
+                    results, kind = self.incremental(config, chat_path, engine)
+                    self.assertEqual(kind, FOLDED)
+                    self.assertEqual(results, run_analysis(config, chat_path, engine))
+
+    def test_unchanged_chat_is_folded(self):
+        config = self.edge_config()
+        chat_path = self.older_edge_chat()
+        first, _ = self.incremental(config, chat_path)
+        self.assertEqual(self.incremental(config, chat_path), (first, FOLDED))
+
+    def test_synthetic_chat_is_folded(self):
+        chat_path, chat = self.synthetic_chat()
+        lines = chat_path.read_text(encoding="utf-8").splitlines(keepends=True)
+        config = self.config(
+            chat_keywords=[ChatKeywords(aliases=[keyword]) for keyword in chat.keywords],
+            timezone="UTC",
+        )
+        # Older messages first, then the newer messages oldest first
+        chat_path.write_text("".join(lines[500:]), encoding="utf-8")
+        self.incremental(config, chat_path)
+        with open(chat_path, "a", encoding="utf-8") as file:
+            file.writelines(lines[:500][::-1])
+        results, kind = self.incremental(config, chat_path)
+        self.assertEqual(kind, FOLDED)
+        self.assertEqual(results, run_analysis(config, chat_path, AnalysisEngine.PYTHON))
+
+    def test_rewritten_archive_is_analyzed_again(self):
+        config = self.edge_config()
+        chat_path = self.older_edge_chat()
+        self.incremental(config, chat_path)
+        # A like added to the last analyzed message changes the end of the archive
+        rewritten = [*EDGE_MESSAGES[2:-1], {**EDGE_MESSAGES[-1], "favorited_by": ["1"]}]
+        write_lines(rewritten + NEW_MESSAGES, chat_path)
+        results, kind = self.incremental(config, chat_path)
+        self.assertEqual(kind, FULL)
+        self.assertEqual(results, run_analysis(config, chat_path, AnalysisEngine.PYTHON))
+
+    def test_truncated_archive_is_analyzed_again(self):
+        config = self.edge_config()
+        chat_path = self.older_edge_chat()
+        self.incremental(config, chat_path)
+        write_lines(EDGE_MESSAGES[3:], chat_path)
+        results, kind = self.incremental(config, chat_path)
+        self.assertEqual(kind, FULL)
+        self.assertEqual(results, run_analysis(config, chat_path, AnalysisEngine.PYTHON))
+
+    def test_changed_config_is_analyzed_again(self):
+        chat_path = self.older_edge_chat()
+        self.incremental(self.edge_config(), chat_path)
+        append_lines(NEW_MESSAGES, chat_path)
+        config = self.edge_config(num_messages_rank=2)
+        results, kind = self.incremental(config, chat_path)
+        self.assertEqual(kind, FULL)
+        self.assertEqual(results, run_analysis(config, chat_path, AnalysisEngine.PYTHON))
+
+    def test_renamed_member_is_analyzed_again(self):
+        config = self.edge_config()
+        chat_path = self.older_edge_chat()
+        before, _ = self.incremental(config, chat_path)
+        append_lines([message(21, 1_730_700_000, "2", "Bob", "new name")], chat_path)
+        results, kind = self.incremental(config, chat_path)
+        self.assertIn("add or rename members", "\n".join(self.logs))
+        self.assertEqual(kind, FULL)
+        self.assertEqual(results, run_analysis(config, chat_path, AnalysisEngine.PYTHON))
+        self.assertIn("Bo", before["member_stats"])
+        self.assertNotIn("Bo", results["member_stats"])
+        self.assertIn("Bob", results["member_stats"])
+
+    def test_new_member_is_analyzed_again(self):
+        config = self.edge_config()
+        chat_path = self.older_edge_chat()
+        self.incremental(config, chat_path)
+        append_lines([message(21, 1_730_700_000, "5", "Dee", "hi all")], chat_path)
+        results, kind = self.incremental(config, chat_path)
+        self.assertEqual(kind, FULL)
+        self.assertIn("Dee", results["member_stats"])
+        self.assertEqual(results, run_analysis(config, chat_path, AnalysisEngine.PYTHON))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""Check keyword matching against a plain search of each alias in each message"""
+
+import random
+import re
+import unittest
+
+from py.data_processing.keyword_matcher import KeywordMatcher
+from py.models.analysis_config import ChatKeywords
+
+
+def alias_pattern(alias: str) -> str:
+    """Regex of `alias` not joined to word characters on its sides that are word
+    characters themselves"""
+    start = r"(?<!\w)" if re.match(r"\w", alias[:1]) else ""
+    end = r"(?!\w)" if re.match(r"\w", alias[-1:]) else ""
+    return start + re.escape(alias) + end
+
+
+def baseline_matches(keywords: list[ChatKeywords], text: str | None) -> set[int]:
+    """Indices of the keywords with an alias in the lowercased `text`, as the analysis
+    counted them before the automaton"""
+    if text is None:
+        return set()
+    text = text.lower()
+    return {
+        index
+        for index, keyword in enumerate(keywords)
+        for alias in keyword.aliases
+        if (
+            re.search(alias_pattern(alias), text)
+            if keyword.whole_word and alias
+            else alias in text
+        )
+    }
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    """Keywords found in messages by the automaton and by a search of each alias"""
+
+    def assert_matches(self, keywords: list[ChatKeywords], texts: list[str | None]):
+        """The matcher finds the keywords of the baseline search in each of `texts`"""
+        matcher = KeywordMatcher(keywords)
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(matcher.matches(text), baseline_matches(keywords, text))
+
+    def test_substrings(self):
+        keywords = [
+            ChatKeywords(aliases=["meme"]),
+            ChatKeywords(aliases=["LOL", "haha"]),
+            ChatKeywords(aliases=["twitter", "x.com"]),
+        ]
+        matcher = KeywordMatcher(keywords)
+        self.assertEqual(matcher.matches("Memes, LOL and lol again"), {0, 1})
+        self.assertEqual(matcher.matches("hahahaha see x.com"), {1, 2})
+        self.assertEqual(matcher.matches("nothing here"), set())
+        self.assertEqual(matcher.matches(""), set())
+        self.assertEqual(matcher.matches(None), set())
+        self.assertEqual(KeywordMatcher([]).matches("meme"), set())
+
+    def test_overlapping_and_prefix_aliases(self):
+        keywords = [
+            ChatKeywords(aliases=["he", "hers"]),
+            ChatKeywords(aliases=["she"]),
+            ChatKeywords(aliases=["his", "is"]),
+            ChatKeywords(aliases=["her", "here"], whole_word=True),
+            ChatKeywords(aliases=["aaa"]),
+            ChatKeywords(aliases=["a", "aa"], whole_word=True),
+        ]
+        self.assert_matches(
+            keywords,
+            [
+                "ushers",
+                "this is here",
+                "hers",
+                "where",
+                "aaaa",
+                "a aa",
+                "baab",
+                "here",
+                "shis",
+            ],
+        )
+
+    def test_whole_word_edges_and_punctuation(self):
+        keywords = [
+            ChatKeywords(aliases=["cat"], whole_word=True),
+            ChatKeywords(aliases=["c++", ":)"], whole_word=True),
+            ChatKeywords(aliases=["go to"], whole_word=True),
+            ChatKeywords(aliases=["_id"], whole_word=True),
+        ]
+        matcher = KeywordMatcher(keywords)
+        self.assertEqual(matcher.matches("cat"), {0})
+        self.assertEqual(matcher.matches("Cat!"), {0})
+        self.assertEqual(matcher.matches("(cat)"), {0})
+        self.assertEqual(matcher.matches("cats concatenate"), set())
+        self.assertEqual(matcher.matches("bobcat, cat's"), {0})
+        self.assertEqual(matcher.matches("cat_food"), set())
+        self.assertEqual(matcher.matches("c++x"), {1})
+        self.assertEqual(matcher.matches("xc++"), set())
+        self.assertEqual(matcher.matches("smile:)"), {1})
+        self.assertEqual(matcher.matches("go to bed"), {2})
+        self.assertEqual(matcher.matches("ergo to"), set())
+        self.assertEqual(matcher.matches("user_id"), set())
+        self.assertEqual(matcher.matches("user _id"), {3})
+        self.assert_matches(
+            keywords,
+            [
+                "cat",
+                "cat.",
+                "a cat b",
+                "cats",
+                "scat",
+                "c++",
+                "ac++",
+                ":):)",
+                "go tomorrow",
+            ],
+        )
+
+    def test_non_ascii(self):
+        keywords = [
+            ChatKeywords(aliases=["café"], whole_word=True),
+            ChatKeywords(aliases=["❤️"]),
+            ChatKeywords(aliases=["straße", "ÉTÉ"]),
+            ChatKeywords(aliases=["日本"], whole_word=True),
+        ]
+        matcher = KeywordMatcher(keywords)
+        self.assertEqual(matcher.matches("CAFÉ ❤️ time"), {0, 1})
+        self.assertEqual(matcher.matches("cafés"), set())
+        self.assertEqual(matcher.matches("Straße im Été"), {2})
+        self.assertEqual(matcher.matches("日本語"), set())
+        self.assertEqual(matcher.matches("日本 語"), {3})
+        self.assert_matches(
+            keywords,
+            ["écafé", "café❤️", "❤", "STRASSE", "été", "日本!", "東京と日本"],
+        )
+
+    def test_random_texts(self):
+        keywords = [
+            ChatKeywords(aliases=["ab", "abab"]),
+            ChatKeywords(aliases=["ba", "b a"], whole_word=True),
+            ChatKeywords(aliases=["aab", "é"]),
+            ChatKeywords(aliases=["a"], whole_word=True),
+            ChatKeywords(aliases=["bb", "b!"], whole_word=True),
+        ]
+        generator = random.Random(5)
+        texts = [
+            "".join(generator.choices("abAB é!_", k=generator.randint(0, 12)))
+            for _ in range(2_000)
+        ]
+        self.assert_matches(keywords, texts)
+
+
+if __name__ == "__main__":
+    unittest.main()
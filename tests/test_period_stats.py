@@ -0,0 +1,84 @@
+"""Check period tables of daily activity and keywords named like their columns"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from pydantic import ValidationError
+
+from py.models.analysis_config import AnalysisConfig, ChatKeywords
+from py.models.period_stats import (
+    Period,
+    PeriodStats,
+    period_table,
+    year_over_year_tables,
+)
+
+# 2024-01-30 as days since 1970-01-01
+FIRST_DAY = 19_752
+
+
+class PeriodStatsTest(unittest.TestCase):
+    """Keyword series are kept apart from the other series and the period column"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.stats = PeriodStats(
+            first_day=FIRST_DAY,
+            messages=[1, 2, 3],
+            likes=[4, 5, 6],
+            words=[7, 8, 9],
+            keywords={"likes": [1, 0, 1], "month": [0, 1, 1], "messages": [1, 1, 0]},
+        )
+
+    def test_series_keep_keywords_apart(self):
+        series = self.stats.series
+        self.assertEqual(series["likes"], [4, 5, 6])
+        self.assertEqual(series["messages"], [1, 2, 3])
+        self.assertEqual(series["keyword_likes"], [1, 0, 1])
+        self.assertEqual(series["keyword_messages"], [1, 1, 0])
+
+    def test_period_table_columns(self):
+        output_file = self.directory / "activity_by_month.csv"
+        period_table(self.stats, Period.MONTH, output_file)
+        table = pd.read_csv(output_file)
+        self.assertEqual(
+            list(table.columns),
+            [
+                "month",
+                "messages",
+                "likes",
+                "words",
+                "keyword_likes",
+                "keyword_month",
+                "keyword_messages",
+            ],
+        )
+        self.assertEqual(table["month"].tolist(), ["2024-01", "2024-02"])
+        self.assertEqual(table["likes"].tolist(), [9, 6])
+        self.assertEqual(table["keyword_month"].tolist(), [1, 1])
+
+    def test_year_over_year_tables(self):
+        yearly_file = self.directory / "year_over_year.csv"
+        monthly_file = self.directory / "messages_by_month_and_year.csv"
+        year_over_year_tables(self.stats, yearly_file, monthly_file)
+        yearly = pd.read_csv(yearly_file)
+        self.assertEqual(yearly["messages"].tolist(), [6])
+        self.assertEqual(yearly["keyword_messages"].tolist(), [2])
+        self.assertEqual(yearly["likes_per_message"].tolist(), [2.5])
+
+    def test_repeated_keyword_names_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            AnalysisConfig(
+                chat_keywords=[
+                    ChatKeywords(aliases=["lol"]),
+                    ChatKeywords(aliases=["haha"], name="lol"),
+                ]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
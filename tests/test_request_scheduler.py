@@ -0,0 +1,175 @@
+"""Check the retries, backoff and adaptive rate of GroupMe requests"""
+
+import time
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests import Response
+
+from py.groupme_api.rate_limiter import RateLimiter
+from py.groupme_api.request_scheduler import RequestScheduler
+from py.groupme_api.request_utils import (
+    GroupMeException,
+    StatusCode,
+    TransientException,
+    retry_after,
+)
+
+LOGGER = "py.groupme_api.request_scheduler"
+
+
+def response(status: int, headers: dict[str, str] | None = None) -> Response:
+    """Response with `status` and `headers` and no body"""
+    result = Response()
+    result.status_code = status
+    result.headers.update(headers or {})
+    return result
+
+
+class Responses:
+    """Request returning each of `outcomes` in turn, a response or an exception raised"""
+
+    def __init__(self, *outcomes: Response | Exception):
+        self.outcomes = list(outcomes)
+        self.sent = 0
+
+    def __call__(self) -> Response:
+        outcome = self.outcomes[self.sent]
+        self.sent += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Token bucket rate and its adaptation to throttling"""
+
+    def test_throttled_halves_rate_down_to_minimum(self):
+        limiter = RateLimiter(100)
+        limiter.throttled()
+        self.assertEqual(limiter.rate, 50)
+        for _ in range(20):
+            limiter.throttled()
+        self.assertEqual(limiter.rate, limiter.min_rate)
+        self.assertGreater(limiter.min_rate, 0)
+
+    def test_succeeded_recovers_up_to_maximum_rate(self):
+        limiter = RateLimiter(100)
+        limiter.throttled()
+        limiter.succeeded()
+        self.assertEqual(limiter.rate, 55)
+        for _ in range(20):
+            limiter.succeeded()
+        self.assertEqual(limiter.rate, limiter.max_rate)
+
+    def test_pause_delays_every_request(self):
+        limiter = RateLimiter(1_000, burst=10)
+        limiter.throttled(pause=0.1)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_rate_spaces_requests(self):
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        # The first request uses the initial token, the next five wait 1 / 50 s each
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class RequestSchedulerTest(unittest.TestCase):
+    """Retries of throttled requests, server errors and dropped connections"""
+
+    def scheduler(self, max_retries: int = 5, backoff_max: float = 1.0):
+        """Scheduler that records its sleeps instead of sleeping"""
+        self.sleeps: list[float] = []
+        return RequestScheduler(
+            RateLimiter(1_000_000, burst=100),
+            max_retries=max_retries,
+            backoff_base=0.1,
+            backoff_max=backoff_max,
+            sleep=self.sleeps.append,
+        )
+
+    def test_retries_transient_failures(self):
+        scheduler = self.scheduler()
+        request = Responses(
+            response(StatusCode.SERVICE_UNAVAILABLE.value),
+            requests.exceptions.ConnectionError("dropped"),
+            requests.exceptions.Timeout("timed out"),
+            response(StatusCode.TOO_MANY_REQUESTS.value),
+            response(StatusCode.OK.value),
+        )
+        with self.assertLogs(LOGGER, "WARNING") as logs:
+            self.assertEqual(scheduler.send(request).status_code, StatusCode.OK.value)
+        self.assertEqual(request.sent, 5)
+        self.assertEqual(scheduler.retries, 4)
+        self.assertEqual(len(self.sleeps), 4)
+        self.assertEqual(len(logs.records), 4)
+
+    def test_backoff_is_jittered_and_capped(self):
+        scheduler = self.scheduler(max_retries=8, backoff_max=0.5)
+        request = Responses(
+            *[response(StatusCode.BAD_GATEWAY.value)] * 8, response(StatusCode.OK.value)
+        )
+        with self.assertLogs(LOGGER, "WARNING"):
+            scheduler.send(request)
+        for attempt, delay in enumerate(self.sleeps):
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(0.5, 0.1 * 2**attempt))
+        self.assertGreater(len(set(self.sleeps)), 1)
+
+    def test_retry_after_is_minimum_delay(self):
+        scheduler = self.scheduler(backoff_max=0.01)
+        request = Responses(
+            response(StatusCode.ENHANCE_YOUR_CALM.value, {"Retry-After": "0.2"}),
+            response(StatusCode.OK.value),
+        )
+        start = time.monotonic()
+        with self.assertLogs(LOGGER, "WARNING"):
+            scheduler.send(request)
+        self.assertEqual(self.sleeps, [0.2])
+        # The rate limiter pauses the retry too, as it would any other request
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        self.assertLess(scheduler.rate_limiter.rate, scheduler.rate_limiter.max_rate)
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = self.scheduler(max_retries=2)
+        request = Responses(*[response(StatusCode.GATEWAY_TIMEOUT.value)] * 3)
+        with self.assertRaises(TransientException), self.assertLogs(LOGGER, "WARNING"):
+            scheduler.send(request)
+        self.assertEqual(request.sent, 3)
+        self.assertEqual(scheduler.retries, 2)
+
+    def test_does_not_retry_client_errors(self):
+        scheduler = self.scheduler()
+        request = Responses(response(StatusCode.UNAUTHORIZED.value))
+        with self.assertRaises(GroupMeException):
+            scheduler.send(request)
+        self.assertEqual(request.sent, 1)
+        self.assertEqual(self.sleeps, [])
+
+
+class RetryAfterTest(unittest.TestCase):
+    """Retry-After header in seconds or as an HTTP date"""
+
+    def test_seconds(self):
+        self.assertEqual(retry_after(response(429, {"Retry-After": "2.5"})), 2.5)
+        self.assertEqual(retry_after(response(429, {"Retry-After": "-1"})), 0.0)
+
+    def test_date(self):
+        date = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = retry_after(response(429, {"Retry-After": format_datetime(date, True)}))
+        assert delay is not None
+        self.assertAlmostEqual(delay, 30, delta=2)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(retry_after(response(429)))
+        self.assertIsNone(retry_after(response(429, {"Retry-After": "soon"})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Check keys, hits and least recently used eviction of the result cache"""
+
+import os
+import unittest
+
+from py.data_processing.analysis import Analysis, AnalysisEngine
+from py.data_processing.result_cache import ResultCache
+from py.models.analysis_config import ChatKeywords
+from py.models.analysis_results import AnalysisResults
+from tests.test_engines import ChatTestCase, run_analysis
+
+LOGGER = "py.data_processing.result_cache"
+
+
+class ResultCacheTest(ChatTestCase):
+    """Cache of the results of an edge case chat"""
+
+    def setUp(self):
+        super().setUp()
+        self.chat_path = self.edge_chat()
+        self.cache_dir = self.directory / "cache"
+
+    def cached_run(self, cache: ResultCache) -> Analysis:
+        """Analysis of the chat whose member stats are looked up in `cache`"""
+        analysis = Analysis(
+            self.config(), self.chat_path, AnalysisEngine.PYTHON, result_cache=cache
+        )
+        analysis.get_cached_member_stats()
+        return analysis
+
+    def test_key(self):
+        config = self.config()
+        key = ResultCache.key(self.chat_path, config)
+        self.assertEqual(ResultCache.key(self.chat_path, self.config()), key)
+        changed_config = self.config(chat_keywords=[ChatKeywords(aliases=["meme"])])
+        self.assertNotEqual(ResultCache.key(self.chat_path, changed_config), key)
+        archive = bytearray(self.chat_path.read_bytes())
+        archive[len(archive) // 2] ^= 1
+        self.chat_path.write_bytes(bytes(archive))
+        self.assertNotEqual(ResultCache.key(self.chat_path, config), key)
+
+    def test_cached_results_are_the_results_of_an_analysis(self):
+        cache = ResultCache(self.cache_dir, 2**20)
+        key = cache.key(self.chat_path, self.config())
+        self.assertIsNone(cache.load(key))
+        first = self.cached_run(cache).results().model_dump()
+        self.assertTrue(cache.entry(key).exists())
+        with self.assertLogs(LOGGER, "INFO") as logs:
+            second = self.cached_run(cache)
+        self.assertIn("Using cached analysis results", logs.output[0])
+        # The chat is not read when the results are cached
+        self.assertEqual(second.archive_size, 0)
+        expected = run_analysis(self.config(), self.chat_path, AnalysisEngine.PYTHON)
+        self.assertEqual(first, expected)
+        self.assertEqual(second.results().model_dump(), expected)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        results = AnalysisResults()
+        cache = ResultCache(self.cache_dir, 2**20)
+        cache.save("a", results)
+        size = cache.entry("a").stat().st_size
+        # Room for two entries
+        cache.max_bytes = 2 * size
+        cache.save("b", results)
+        for age, key in enumerate(["a", "b"]):
+            os.utime(cache.entry(key), (1_000 + age, 1_000 + age))
+        # Reading the oldest entry makes "b" the least recently used
+        self.assertEqual(cache.load("a"), results)
+        cache.save("c", results)
+        self.assertTrue(cache.entry("a").exists())
+        self.assertFalse(cache.entry("b").exists())
+        self.assertTrue(cache.entry("c").exists())
+        self.assertIsNone(cache.load("b"))
+
+        # Without reads, the oldest entry is evicted first
+        for age, key in enumerate(["c", "a"]):
+            os.utime(cache.entry(key), (2_000 + age, 2_000 + age))
+        cache.save("d", results)
+        self.assertEqual(
+            sorted(entry.stem for entry in self.cache_dir.glob("*.json")), ["a", "d"]
+        )
+
+    def test_entries_larger_than_the_cache_are_evicted(self):
+        cache = ResultCache(self.cache_dir, 1)
+        cache.save("a", AnalysisResults())
+        self.assertFalse(cache.entry("a").exists())
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
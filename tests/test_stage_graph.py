@@ -0,0 +1,63 @@
+"""Check which analysis stages are planned and how skipped outputs are logged"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from py.data_processing.stage_graph import Stage, StageGraph
+
+LOGGER = "py.data_processing.stage_graph"
+
+
+class StageGraphTest(unittest.TestCase):
+    """Plans of an aggregate stage and two output stages, one of them disabled"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.chat_path = self.directory / "chat.json"
+        self.chat_path.write_text("[]", encoding="utf-8")
+        self.summary = self.directory / "summary.csv"
+        self.graph = StageGraph(
+            [
+                Stage("member_stats", lambda: None),
+                Stage("summary", lambda: None, ["member_stats"], [self.summary]),
+                Stage(
+                    "plots",
+                    lambda: None,
+                    ["member_stats"],
+                    [self.directory / "plots.png"],
+                    enabled=False,
+                ),
+            ]
+        )
+
+    def planned(self, requested: list[str] | None) -> list[str]:
+        """Names of the stages planned to write `requested`"""
+        return [stage.name for stage in self.graph.plan(requested, [self.chat_path])]
+
+    def test_disabled_output_is_logged_as_disabled(self):
+        with self.assertLogs(LOGGER, "INFO") as logs:
+            self.assertEqual(self.planned(["plots"]), [])
+        self.assertEqual(self.graph.disabled, ["plots"])
+        self.assertIn("disabled", logs.output[0])
+        self.assertNotIn("up to date", logs.output[0])
+
+    def test_up_to_date_output_is_skipped(self):
+        self.assertEqual(self.planned(None), ["member_stats", "summary"])
+        self.summary.write_text("", encoding="utf-8")
+        with self.assertLogs(LOGGER, "INFO") as logs:
+            self.assertEqual(self.planned(None), [])
+        self.assertEqual(self.graph.disabled, ["plots"])
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("summary, its outputs are up to date", logs.output[0])
+        self.assertIn("plots, it is disabled", logs.output[1])
+
+    def test_unknown_output(self):
+        with self.assertRaises(ValueError):
+            self.planned(["member_stats"])
+
+
+if __name__ == "__main__":
+    unittest.main()
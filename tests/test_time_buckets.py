@@ -0,0 +1,97 @@
+"""Check local time buckets of timestamps against datetime conversions"""
+
+import os
+import random
+import time
+import unittest
+from datetime import date, datetime
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from py.utils.time_buckets import TimeBuckets
+
+NEW_YORK = "America/New_York"
+# 2024-03-10 2:00 EST, clocks spring forward to 3:00 EDT
+SPRING_FORWARD = 1_710_054_000
+# 2024-11-03 2:00 EDT, clocks fall back to 1:00 EST
+FALL_BACK = 1_730_613_600
+HOUR = 3_600
+EPOCH = date(1970, 1, 1)
+
+
+def expected_buckets(
+    timestamps: list[int], zone: ZoneInfo | None
+) -> dict[str, list[int]]:
+    """Hour, weekday, day and month of each of `timestamps` converted by datetime"""
+    dates = [datetime.fromtimestamp(timestamp, zone) for timestamp in timestamps]
+    return {
+        "hour": [value.hour for value in dates],
+        "weekday": [value.weekday() for value in dates],
+        "day": [(value.date() - EPOCH).days for value in dates],
+        "month": [(value.year - 1970) * 12 + value.month - 1 for value in dates],
+    }
+
+
+def around(*transitions: int) -> list[int]:
+    """Timestamps around each of `transitions`, to the second and hours either side"""
+    return [
+        transition + offset
+        for transition in transitions
+        for offset in [-3 * HOUR, -HOUR, -1, 0, 1, HOUR - 1, HOUR, 2 * HOUR, 3 * HOUR]
+    ]
+
+
+class TimeBucketsTest(unittest.TestCase):
+    """Buckets of timestamps across daylight saving time changes"""
+
+    def assert_buckets(self, timestamps: list[int], zone: ZoneInfo | None):
+        """`TimeBuckets` puts `timestamps` in the buckets datetime gives them"""
+        buckets = TimeBuckets.from_timestamps(np.array(timestamps), zone)
+        for name, expected in expected_buckets(timestamps, zone).items():
+            with self.subTest(bucket=name):
+                self.assertEqual(getattr(buckets, name).tolist(), expected)
+
+    def test_daylight_saving_changes(self):
+        self.assert_buckets(around(SPRING_FORWARD, FALL_BACK), ZoneInfo(NEW_YORK))
+
+    def test_repeated_hour(self):
+        zone = ZoneInfo(NEW_YORK)
+        # 1:30 EDT, then 1:30 EST an hour later
+        timestamps = [FALL_BACK - HOUR // 2, FALL_BACK + HOUR // 2]
+        buckets = TimeBuckets.from_timestamps(np.array(timestamps), zone)
+        self.assertEqual(buckets.hour.tolist(), [1, 1])
+        self.assertEqual(buckets.day.tolist()[0], buckets.day.tolist()[1])
+        self.assert_buckets(timestamps, zone)
+
+    def test_unsorted_timestamps(self):
+        timestamps = around(FALL_BACK, SPRING_FORWARD) + around(SPRING_FORWARD)
+        random.Random(4).shuffle(timestamps)
+        self.assert_buckets(timestamps, ZoneInfo(NEW_YORK))
+
+    def test_years_of_timestamps(self):
+        generator = random.Random(9)
+        timestamps = [
+            generator.randint(1_500_000_000, 1_760_000_000) for _ in range(2_000)
+        ]
+        for name in [NEW_YORK, "Europe/London", "Australia/Lord_Howe", "Asia/Kolkata"]:
+            with self.subTest(zone=name):
+                self.assert_buckets(timestamps, ZoneInfo(name))
+
+    def test_single_and_no_timestamps(self):
+        self.assert_buckets([FALL_BACK], ZoneInfo(NEW_YORK))
+        buckets = TimeBuckets.from_timestamps(np.array([], dtype=np.int64), None)
+        self.assertEqual(len(buckets.hour), 0)
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "the local time zone cannot be set")
+    def test_local_time_zone(self):
+        # Restore the local time zone once the environment is restored
+        self.addCleanup(time.tzset)
+        with mock.patch.dict(os.environ, {"TZ": NEW_YORK}):
+            time.tzset()
+            self.assert_buckets(around(SPRING_FORWARD, FALL_BACK), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Check top-K selection of the most liked messages and its merge"""
+
+import random
+import unittest
+from datetime import datetime, timezone
+
+from py.models.analysis_results import rerank
+from py.models.message_superlative import MessageSuperlative
+from py.utils.top_k import TopK
+
+
+def sorted_top(items: list[tuple[int, int]], k: int) -> list[tuple[int, int]]:
+    """The `k` largest (likes, message id) pairs of `items`, largest first"""
+    return sorted(items, reverse=True)[:k]
+
+
+def top_k(items: list[tuple[int, int]], k: int) -> list[tuple[int, int]]:
+    """The (likes, message id) pairs `TopK` keeps of `items`, largest first"""
+    top: TopK[tuple[int, int]] = TopK(k)
+    for likes, message_id in items:
+        top.push(likes, message_id, (likes, message_id))
+    return top.ranked()
+
+
+def superlative(likes: int, message_id: int) -> MessageSuperlative:
+    """Message with `likes` likes"""
+    return MessageSuperlative(
+        poster="Ann",
+        created_at=datetime.fromtimestamp(message_id, timezone.utc),
+        total_likes=likes,
+        message_id=message_id,
+    )
+
+
+def keys(messages: list[MessageSuperlative]) -> list[tuple[int, int]]:
+    """(likes, message id) of each of `messages`"""
+    return [(message.total_likes, message.message_id) for message in messages]
+
+
+class TopKTest(unittest.TestCase):
+    """Items kept and their order, by likes then message id"""
+
+    def test_ties_rank_higher_message_id_first(self):
+        items = [(2, 10), (5, 1), (2, 30), (2, 20), (5, 7)]
+        self.assertEqual(top_k(items, 4), [(5, 7), (5, 1), (2, 30), (2, 20)])
+        self.assertEqual(top_k(items[::-1], 4), [(5, 7), (5, 1), (2, 30), (2, 20)])
+        # Ties at the cutoff keep the higher message id whatever the push order
+        self.assertEqual(top_k([(1, 3), (1, 9), (1, 5)], 1), [(1, 9)])
+        self.assertEqual(top_k([(1, 9), (1, 3), (1, 5)], 1), [(1, 9)])
+
+    def test_k_larger_than_input(self):
+        items = [(0, 4), (3, 2), (1, 8)]
+        self.assertEqual(top_k(items, 10), [(3, 2), (1, 8), (0, 4)])
+        self.assertEqual(top_k([], 3), [])
+        self.assertEqual(len(TopK(5)), 0)
+
+    def test_k_zero(self):
+        self.assertEqual(top_k([(1, 1), (2, 2)], 0), [])
+
+    def test_random_input(self):
+        generator = random.Random(11)
+        for k in [1, 3, 10, 60]:
+            with self.subTest(k=k):
+                items = [(generator.randint(0, 5), id_) for id_ in range(50)]
+                generator.shuffle(items)
+                self.assertEqual(top_k(items, k), sorted_top(items, k))
+
+    def test_merge_matches_ranking_combined_input(self):
+        generator = random.Random(12)
+        for k in [1, 4, 40]:
+            with self.subTest(k=k):
+                items = [(generator.randint(0, 4), id_) for id_ in range(30)]
+                generator.shuffle(items)
+                # Chunks or runs are ranked apart, then their rankings are merged
+                first, second = top_k(items[:12], k), top_k(items[12:], k)
+                for ranked in [first + second, second + first]:
+                    merged = rerank([superlative(*item) for item in ranked], k)
+                    self.assertEqual(keys(merged), sorted_top(items, k))
+
+
+if __name__ == "__main__":
+    unittest.main()